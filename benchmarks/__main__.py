@@ -0,0 +1,206 @@
+"""
+Parse and request overhead benchmarks for byteforge-coinmarketcap.
+
+Runs every case against local fixtures (see benchmarks/fixtures.py) and a local stand-in
+server (benchmarks/server.py), reporting throughput and peak traced allocations. Run from
+the repository root:
+
+    python -m benchmarks                        # full size: 5000 listings x 3 converts, 10k points
+    python -m benchmarks --scale 0.1            # quick run on 10% sized payloads
+    python -m benchmarks --json before.json     # save results
+    python -m benchmarks --compare before.json  # exit 1 if a case got slower than --tolerance
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+from coinmarketcap import Market, ParsedObjectCache
+from coinmarketcap.types.quote_factory import QuoteFactory
+from coinmarketcap.types.token_state_factory import TokenStateFactory
+from coinmarketcap.v1.cryptocurrency.map import _map
+from coinmarketcap.v3.cryptocurrency.quotes.historical_v3 import _parse_quotes_historical_v3
+from coinmarketcap.v4.dex.listings.info import _parse_dex_listings_info
+
+from .fixtures import load_fixture, FIXTURES
+from .server import FixtureServer
+
+LISTINGS = 'v1/cryptocurrency/listings/latest'
+HISTORICAL = 'v3/cryptocurrency/quotes/historical'
+MAP = 'v1/cryptocurrency/map'
+DEX = 'v4/dex/listings/info'
+
+
+@dataclass
+class BenchCase:
+    name: str
+    # builds a fresh input outside of the timed section (factories mutate their input dicts)
+    setup: Callable[[], Any]
+    # the measured call, returns the number of rows it produced
+    run: Callable[[Any], int]
+
+
+class _StubMarket(object):
+    """Stands in for Market in _map so only the parse path is measured."""
+
+    def __init__(self, response):
+        self.response = response
+
+    def _request(self, endpoint, params={}, no_cache=False):
+        return self.response
+
+    def _request_parsed(self, endpoint, params, parse, no_cache=False, **parse_kwargs):
+        return parse(self.response, **parse_kwargs)
+
+
+def _parse_cases(bodies: Dict[str, bytes]) -> List[BenchCase]:
+    def listing_rows():
+        response = json.loads(bodies[LISTINGS])
+        for dct_token in response['data']:
+            dct_token['timestamp'] = 0
+        return response['data']
+
+    def quote_rows():
+        return [(currency, dct_quote)
+                for dct_token in json.loads(bodies[LISTINGS])['data']
+                for currency, dct_quote in dct_token['quote'].items()]
+
+    return [
+        BenchCase('TokenStateFactory.from_dict', listing_rows,
+                  lambda rows: len([TokenStateFactory.from_dict(row) for row in rows])),
+        BenchCase('TokenStateFactory (compact)', listing_rows,
+                  lambda rows: len([TokenStateFactory.from_dict(row, compact=True) for row in rows])),
+        BenchCase('TokenStateFactory.from_list', lambda: json.loads(bodies[LISTINGS])['data'],
+                  lambda rows: len(TokenStateFactory.from_list(rows))),
+        BenchCase('QuoteFactory.from_dict', quote_rows,
+                  lambda rows: len([QuoteFactory.from_dict(currency, dct_quote) for currency, dct_quote in rows])),
+        BenchCase('QuoteFactory (compact)', quote_rows,
+                  lambda rows: len([QuoteFactory.from_dict(currency, dct_quote, compact=True)
+                                    for currency, dct_quote in rows])),
+        BenchCase('_map (parse only)', lambda: _StubMarket(json.loads(bodies[MAP])),
+                  lambda market: len(_map(market, limit=5000))),
+        BenchCase('_parse_quotes_historical_v3', lambda: json.loads(bodies[HISTORICAL]),
+                  lambda response: len(_parse_quotes_historical_v3(response, id='1'))),
+        BenchCase('_parse_dex_listings_info', lambda: json.loads(bodies[DEX]),
+                  lambda response: len(_parse_dex_listings_info(response))),
+    ]
+
+
+def _round_trip_cases(market: Market) -> List[BenchCase]:
+    def cold_cache():
+        # every repeat must go over the wire, not to the requests_cache sqlite file
+        market.caching_session.cache.clear()
+        return market
+
+    object_cached_market = Market(api_key='benchmark', base_url=market.base_url, tempdir_cache=False,
+                                  cache_backend='memory', object_cache=ParsedObjectCache(max_bytes=256 * 2**20))
+
+    def warm_object_cache():
+        object_cached_market.listings_latest(limit=5000, convert=['USD', 'BTC', 'EUR'])
+        return object_cached_market
+
+    return [
+        BenchCase('Market.listings_latest', cold_cache,
+                  lambda m: len(m.listings_latest(limit=5000, convert=['USD', 'BTC', 'EUR']))),
+        BenchCase('listings_latest (object hit)', warm_object_cache,
+                  lambda m: len(m.listings_latest(limit=5000, convert=['USD', 'BTC', 'EUR']))),
+        BenchCase('Market.stream_listings_latest', cold_cache,
+                  lambda m: sum(1 for _ in m.stream_listings_latest(limit=5000, convert=['USD', 'BTC', 'EUR']))),
+        BenchCase('Market.quotes_historical_v3', cold_cache,
+                  lambda m: len(m.quotes_historical_v3(id='1', timestamp_start=1704067200,
+                                                       timestamp_end=1707067200, interval='5m'))),
+        BenchCase('Market.map', cold_cache, lambda m: len(m.map(limit=5000))),
+        BenchCase('Market.dex_listings_info', cold_cache,
+                  lambda m: len(m.dex_listings_info(ids=list(range(11955, 12055))))),
+    ]
+
+
+def _measure(case: BenchCase, repeat: int) -> Dict[str, float]:
+    best = None
+    rows = 0
+    for _ in range(repeat):
+        arg = case.setup()
+        started = time.perf_counter()
+        rows = case.run(arg)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    # a separate traced run, tracemalloc slows everything down too much to time under it
+    arg = case.setup()
+    tracemalloc.start()
+    case.run(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {'rows': rows, 'seconds': best, 'rows_per_sec': rows / best if best else 0.0, 'peak_mb': peak / 2**20}
+
+
+def main(argv=None) -> int:
+    argparser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.strip().splitlines()[0])
+    argparser.add_argument('--scale', type=float, default=1.0, help='payload size multiplier (default 1.0)')
+    argparser.add_argument('--repeat', type=int, default=3, help='timed runs per case, best is kept (default 3)')
+    argparser.add_argument('--json', dest='json_path', help='write results to this file')
+    argparser.add_argument('--compare', help='baseline results file written by --json')
+    argparser.add_argument('--tolerance', type=float, default=0.2,
+                           help='allowed throughput drop vs --compare before failing (default 0.2)')
+    args = argparser.parse_args(argv)
+
+    bodies = {endpoint: load_fixture(endpoint, args.scale) for endpoint in FIXTURES}
+    results = {}
+
+    print(f"{'case':<32} {'rows':>8} {'ms':>10} {'rows/s':>14} {'peak MB':>9} {'KB/row':>8}")
+    for case in _parse_cases(bodies):
+        results[case.name] = _measure(case, args.repeat)
+        _print_result(case.name, results[case.name])
+
+    with FixtureServer(bodies) as server, tempfile.TemporaryDirectory() as cache_dir:
+        market = Market(api_key='benchmark', base_url=server.base_url, tempdir_cache=False)
+        market.cache_name = os.path.join(cache_dir, 'bench_cache')
+        for case in _round_trip_cases(market):
+            results[case.name] = _measure(case, args.repeat)
+            _print_result(case.name, results[case.name])
+
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump({'scale': args.scale, 'results': results}, f, indent=2)
+
+    if args.compare:
+        return _compare(args.compare, results, args.tolerance, args.scale)
+
+    return 0
+
+
+def _print_result(name: str, result: Dict[str, float]):
+    print(f"{name:<32} {result['rows']:>8} {result['seconds'] * 1000:>10.1f} "
+          f"{result['rows_per_sec']:>14,.0f} {result['peak_mb']:>9.1f} "
+          f"{result['peak_mb'] * 1024 / result['rows'] if result['rows'] else 0.0:>8.2f}")
+
+
+def _compare(path: str, results: Dict[str, Dict[str, float]], tolerance: float, scale: float) -> int:
+    with open(path) as f:
+        baseline = json.load(f)
+
+    if baseline.get('scale') != scale:
+        print(f"warning: baseline was recorded at scale {baseline.get('scale')}, this run used {scale}")
+
+    regressions = []
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if not before or not before['rows_per_sec']:
+            continue
+        ratio = result['rows_per_sec'] / before['rows_per_sec']
+        marker = '  REGRESSION' if ratio < 1 - tolerance else ''
+        print(f'{name:<32} x{ratio:.2f} vs baseline{marker}')
+        if marker:
+            regressions.append(name)
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
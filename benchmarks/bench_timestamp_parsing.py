@@ -0,0 +1,58 @@
+"""
+Micro-benchmark: CoinMarketCap timestamp parsing, dateutil vs parse_cmc_datetime.
+
+Reports rows/sec for the bare parser and for QuoteFactory.from_dict, on a historical-like
+workload (every timestamp distinct) and a listings-like workload (a handful of shared
+'last_updated' values). Run from the repository root:
+
+    python -m benchmarks.bench_timestamp_parsing
+"""
+import time
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from dateutil import parser
+
+from coinmarketcap.types import quote_factory
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
+from coinmarketcap.types.quote_factory import QuoteFactory
+
+ROWS = 20000
+
+
+def _timestamps(distinct: int):
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [(start + timedelta(minutes=5 * (i % distinct))).strftime('%Y-%m-%dT%H:%M:%S.000Z') for i in range(ROWS)]
+
+
+def _quote(timestamp: str):
+    return {"price": 67000.5, "volume_24h": 1.5e10, "volume_change_24h": 1.2, "percent_change_1h": 0.1,
+            "percent_change_24h": 1.5, "percent_change_7d": 3.2, "percent_change_30d": 8.1,
+            "market_cap": 1.3e12, "market_cap_dominance": 52.1, "fully_diluted_market_cap": 1.4e12,
+            "last_updated": timestamp}
+
+
+def _rows_per_sec(fn, items) -> float:
+    parse_cmc_datetime.cache_clear()
+    started = time.perf_counter()
+    for item in items:
+        fn(item)
+    return len(items) / (time.perf_counter() - started)
+
+
+def main():
+    for label, distinct in (('historical (all distinct)', ROWS), ('listings (8 shared)', 8)):
+        timestamps = _timestamps(distinct)
+        before = _rows_per_sec(parser.parse, timestamps)
+        after = _rows_per_sec(parse_cmc_datetime, timestamps)
+        print(f'parser        {label:<26} dateutil {before:>12,.0f} rows/s   fast {after:>12,.0f} rows/s   x{after / before:.1f}')
+
+        quotes = [_quote(timestamp) for timestamp in timestamps]
+        with mock.patch.object(quote_factory, 'parse_cmc_datetime', parser.parse):
+            before = _rows_per_sec(lambda q: QuoteFactory.from_dict('USD', dict(q)), quotes)
+        after = _rows_per_sec(lambda q: QuoteFactory.from_dict('USD', dict(q)), quotes)
+        print(f'QuoteFactory  {label:<26} dateutil {before:>12,.0f} rows/s   fast {after:>12,.0f} rows/s   x{after / before:.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark payloads shaped like real CoinMarketCap responses.
+
+Each endpoint has one record captured from the API (trimmed of identifying values) that is
+replicated into a payload of the requested size with deterministic variation, so every run
+benchmarks exactly the same bytes without hitting the live API or shipping megabytes of JSON
+in the repository. Payloads are cached as JSON under the system temp directory.
+"""
+import copy
+import json
+import os
+import random
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+FIXTURE_DIR = os.path.join(tempfile.gettempdir(), 'coinmarketcap_bench_fixtures')
+
+# bump whenever the payload builders change so stale cached files are not reused
+FIXTURE_VERSION = 1
+
+_STATUS = {
+    "timestamp": "2024-06-01T12:00:03.214Z", "error_code": 0, "error_message": None,
+    "elapsed": 31, "credit_count": 1, "notice": None
+}
+
+_LISTING_RECORD = {
+    "id": 1027, "name": "Ethereum", "symbol": "ETH", "slug": "ethereum", "num_market_pairs": 9654,
+    "date_added": "2015-08-07T00:00:00.000Z",
+    "tags": ["pos", "smart-contracts", "ethereum-ecosystem", "coinbase-ventures-portfolio",
+             "three-arrows-capital-portfolio", "polychain-capital-portfolio", "layer-1"],
+    "max_supply": None, "circulating_supply": 120154376.11, "total_supply": 120154376.11,
+    "infinite_supply": True, "platform": None, "cmc_rank": 2,
+    "self_reported_circulating_supply": None, "self_reported_market_cap": None, "tvl_ratio": None,
+    "last_updated": "2024-06-01T12:00:00.000Z",
+    "quote": {}
+}
+
+_QUOTE_RECORD = {
+    "price": 3765.5160417455, "volume_24h": 12030458916.871, "volume_change_24h": -23.7341,
+    "percent_change_1h": 0.08718131, "percent_change_24h": 0.35021489, "percent_change_7d": -0.0732154,
+    "percent_change_30d": 24.17431223, "percent_change_60d": 20.64813101, "percent_change_90d": 4.82331456,
+    "market_cap": 452447017024.8817, "market_cap_dominance": 17.0131, "fully_diluted_market_cap": 452447017024.88,
+    "tvl": None, "last_updated": "2024-06-01T12:00:00.000Z"
+}
+
+_HISTORICAL_QUOTE_RECORD = {
+    "percent_change_1h": 0.108349283, "percent_change_24h": -0.51233018, "percent_change_7d": 2.91523314,
+    "percent_change_30d": 7.67211348, "price": 67512.8812738231, "volume_24h": 21832153019.22,
+    "market_cap": 1330429843421.23, "total_supply": 19706306, "circulating_supply": 19706306,
+    "timestamp": "2024-06-01T12:00:00.000Z"
+}
+
+_MAP_RECORD = {
+    "id": 1839, "rank": 4, "name": "BNB", "symbol": "BNB", "slug": "bnb", "is_active": 1,
+    "first_historical_data": "2017-07-25T04:30:05.000Z", "last_historical_data": "2024-06-01T11:45:00.000Z",
+    "platform": None
+}
+
+_DEX_RECORD = {
+    "id": 11955, "name": "Uniswap v4 (Ethereum)", "slug": "uniswap-v4", "status": "active",
+    "logo": "https://s2.coinmarketcap.com/static/img/exchanges/64x64/11955.png",
+    "description": None, "date_launched": None, "notice": "",
+    "urls": {"website": ["https://app.uniswap.org/swap"], "twitter": ["https://x.com/Uniswap"],
+             "blog": [""], "chat": [""], "fee": [""]}
+}
+
+
+def _jitter(rng: random.Random, value):
+    return value * rng.uniform(0.5, 1.5) if isinstance(value, float) else value
+
+
+def listings_latest_payload(rows: int = 5000, converts=('USD', 'BTC', 'EUR')) -> dict:
+    rng = random.Random(1)
+    data = []
+    for index in range(rows):
+        record = copy.deepcopy(_LISTING_RECORD)
+        record.update(id=index + 1, name=f'Token {index}', symbol=f'TK{index}', slug=f'token-{index}', cmc_rank=index + 1)
+        record['circulating_supply'] = _jitter(rng, record['circulating_supply'])
+        record['quote'] = {
+            currency: {key: _jitter(rng, value) for key, value in _QUOTE_RECORD.items()}
+            for currency in converts
+        }
+        data.append(record)
+    return {"status": dict(_STATUS, total_count=rows), "data": data}
+
+
+def quotes_historical_v3_payload(points: int = 10000, converts=('USD',)) -> dict:
+    rng = random.Random(2)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    quotes = []
+    for index in range(points):
+        timestamp = (start + timedelta(minutes=5 * index)).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+        quote = {}
+        for currency in converts:
+            dct_quote = {key: _jitter(rng, value) for key, value in _HISTORICAL_QUOTE_RECORD.items()}
+            dct_quote['timestamp'] = timestamp
+            quote[currency] = dct_quote
+        quotes.append({"timestamp": timestamp, "quote": quote})
+
+    summary = {"id": 1, "name": "Bitcoin", "symbol": "BTC", "is_active": 1, "is_fiat": 0, "quotes": quotes}
+    return {"status": dict(_STATUS, credit_count=points // 100 + 1), "data": {"1": summary}}
+
+
+def map_payload(rows: int = 5000) -> dict:
+    data = []
+    for index in range(rows):
+        record = dict(_MAP_RECORD)
+        record.update(id=index + 1, rank=index + 1, name=f'Token {index}', symbol=f'TK{index}', slug=f'token-{index}')
+        data.append(record)
+    return {"status": _STATUS, "data": data}
+
+
+def dex_info_payload(count: int = 100) -> dict:
+    data = []
+    for index in range(count):
+        record = copy.deepcopy(_DEX_RECORD)
+        record.update(id=_DEX_RECORD['id'] + index, name=f'DEX {index}', slug=f'dex-{index}')
+        data.append(record)
+    return {"status": _STATUS, "data": data}
+
+
+# endpoint path -> payload builder, at the sizes the suite is specified for
+FIXTURES = {
+    'v1/cryptocurrency/listings/latest': lambda scale: listings_latest_payload(rows=int(5000 * scale)),
+    'v3/cryptocurrency/quotes/historical': lambda scale: quotes_historical_v3_payload(points=int(10000 * scale)),
+    'v1/cryptocurrency/map': lambda scale: map_payload(rows=int(5000 * scale)),
+    'v4/dex/listings/info': lambda scale: dex_info_payload(count=max(1, int(100 * scale))),
+}
+
+
+def load_fixture(endpoint: str, scale: float = 1.0) -> bytes:
+    """Returns the serialized payload for endpoint, building and caching it on first use."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    filename = os.path.join(FIXTURE_DIR, endpoint.replace('/', '_') + f'_{scale:g}_v{FIXTURE_VERSION}.json')
+    if not os.path.exists(filename):
+        with open(filename, 'w') as f:
+            json.dump(FIXTURES[endpoint](scale), f)
+    with open(filename, 'rb') as f:
+        return f.read()
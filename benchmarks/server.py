@@ -0,0 +1,56 @@
+"""Local stand-in for the CoinMarketCap API that serves benchmark fixtures over HTTP."""
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class FixtureServer(object):
+    """
+    Serves a fixed body per endpoint path on 127.0.0.1, ignoring the query string.
+
+    Example:
+        with FixtureServer({'v1/cryptocurrency/map': body}) as server:
+            market = Market(api_key='bench', base_url=server.base_url)
+    """
+
+    def __init__(self, bodies: Dict[str, bytes]):
+        self.bodies = {'/' + path.strip('/'): body for path, body in bodies.items()}
+        self.request_count = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.request_count += 1
+                body = server.bodies.get(urlsplit(self.path).path)
+                if body is None:
+                    self.send_response(404)
+                    body = b'{"status": {"error_code": 404, "error_message": "unknown endpoint"}}'
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._httpd.shutdown()
+        self._httpd.server_close()
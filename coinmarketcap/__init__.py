@@ -7,10 +7,86 @@ __author__ = 'Jason Byteforgia'
 __repo__ = 'zhttps://github.com/jmazzahacks/byteforge-coinmarketcap'
 __license__ = 'Apache v2.0 License'
 
-from .core import Market
-from .core import ServerException
-from .core import MalformedResponseError
-from .core import SortOption
-from .core import SortDir
-from .core import FilterOptions
-from .core import AuxFields
+import importlib
+from typing import TYPE_CHECKING
+
+# Public names and the submodule defining them. They are imported on first access (PEP 562),
+# so "import coinmarketcap" stays cheap and a program only pays for the parts it uses
+_LAZY_EXPORTS = {
+    'Market': '.core',
+    'ServerException': '.core',
+    'MalformedResponseError': '.core',
+    'CircuitOpenError': '.core',
+    'SortOption': '.v1.cryptocurrency.listings.common',
+    'SortDir': '.v1.cryptocurrency.listings.common',
+    'FilterOptions': '.v1.cryptocurrency.listings.common',
+    'AuxFields': '.v1.cryptocurrency.listings.common',
+    'HistoricalQuotes': '.types.historical_quotes',
+    'HistoricalSeries': '.types.historical_series',
+    'CompactTokenState': '.types.compact',
+    'CompactQuote': '.types.compact',
+    'HistoryStore': '.history_store',
+    'CreditScheduler': '.scheduler',
+    'CreditBudgetExhausted': '.scheduler',
+    'Priority': '.scheduler',
+    'LRUMemoryCache': '.cache_backends',
+    'IMMUTABLE': '.cache_policy',
+    'NO_CACHE': '.cache_policy',
+    'ParsedObjectCache': '.object_cache',
+    'SymbolIndex': '.symbol_index',
+    'ListingsTracker': '.listings_tracker',
+    'ListingsDelta': '.listings_tracker',
+    'FieldChange': '.listings_tracker',
+    'Threshold': '.listings_tracker',
+    'Poller': '.poller',
+    'RetryPolicy': '.retry',
+    'CircuitBreaker': '.retry',
+    'RetryMetrics': '.retry',
+    'Hooks': '.instrumentation',
+    'DebugHooks': '.instrumentation',
+    'MetricsCollector': '.instrumentation',
+    'RequestEvent': '.instrumentation',
+    'SharedRateLimiter': '.shared_limiter',
+    'SharedCreditLedger': '.shared_limiter',
+    'SQLiteLimitStore': '.shared_limiter',
+    'RedisLimitStore': '.shared_limiter',
+    'ArrowExporter': '.arrow_export',
+    'AsyncMarket': '.async_core',
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    # cached on the package, later lookups do not come back here
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_EXPORTS))
+
+
+if TYPE_CHECKING:
+    from .core import Market, ServerException, MalformedResponseError, CircuitOpenError
+    from .v1.cryptocurrency.listings.common import SortOption, SortDir, FilterOptions, AuxFields
+    from .types.historical_quotes import HistoricalQuotes
+    from .types.historical_series import HistoricalSeries
+    from .types.compact import CompactTokenState, CompactQuote
+    from .history_store import HistoryStore
+    from .scheduler import CreditScheduler, CreditBudgetExhausted, Priority
+    from .cache_backends import LRUMemoryCache
+    from .cache_policy import IMMUTABLE, NO_CACHE
+    from .object_cache import ParsedObjectCache
+    from .symbol_index import SymbolIndex
+    from .listings_tracker import ListingsTracker, ListingsDelta, FieldChange, Threshold
+    from .poller import Poller
+    from .retry import RetryPolicy, CircuitBreaker, RetryMetrics
+    from .instrumentation import Hooks, DebugHooks, MetricsCollector, RequestEvent
+    from .shared_limiter import SharedRateLimiter, SharedCreditLedger, SQLiteLimitStore, RedisLimitStore
+    from .arrow_export import ArrowExporter
+    from .async_core import AsyncMarket
@@ -0,0 +1,296 @@
+import os
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
+from coinmarketcap.pagination import MAX_PAGE_SIZE
+from coinmarketcap.v1.cryptocurrency.map import ListingStatus, MapSortOption, MapAuxFields, _map_params
+from coinmarketcap.v1.cryptocurrency.listings.common import SortOption, SortDir, AuxFields, FilterOptions
+from coinmarketcap.v1.cryptocurrency.listings.latest import _listings_latest_params
+from coinmarketcap.v3.cryptocurrency.quotes.historical_v3 import _quotes_historical_v3_params, _quote_summary_meta
+
+# (column name, type, path of keys to the value in the raw JSON item). Types are spelled out
+# as strings so the schemas can be read without importing pyarrow
+Column = Tuple[str, str, Tuple[str, ...]]
+
+_PLATFORM_COLUMNS: List[Column] = [
+    ('platform_id', 'int64', ('platform', 'id')),
+    ('token_address', 'string', ('platform', 'token_address')),
+]
+
+LISTING_COLUMNS: List[Column] = [
+    ('id', 'int64', ('id',)),
+    ('name', 'string', ('name',)),
+    ('symbol', 'string', ('symbol',)),
+    ('slug', 'string', ('slug',)),
+    ('cmc_rank', 'int64', ('cmc_rank',)),
+    ('num_market_pairs', 'int64', ('num_market_pairs',)),
+    ('circulating_supply', 'float64', ('circulating_supply',)),
+    ('total_supply', 'float64', ('total_supply',)),
+    ('max_supply', 'float64', ('max_supply',)),
+    ('infinite_supply', 'bool', ('infinite_supply',)),
+    ('date_added', 'timestamp', ('date_added',)),
+    ('last_updated', 'timestamp', ('last_updated',)),
+    ('tags', 'list<string>', ('tags',)),
+] + _PLATFORM_COLUMNS
+
+MAP_COLUMNS: List[Column] = [
+    ('id', 'int64', ('id',)),
+    ('rank', 'int64', ('rank',)),
+    ('name', 'string', ('name',)),
+    ('symbol', 'string', ('symbol',)),
+    ('slug', 'string', ('slug',)),
+    ('is_active', 'bool', ('is_active',)),
+    ('first_historical_data', 'timestamp', ('first_historical_data',)),
+    ('last_historical_data', 'timestamp', ('last_historical_data',)),
+] + _PLATFORM_COLUMNS
+
+# the id, name and symbol of historical rows come from the quote summary, not the quote block
+HISTORICAL_COLUMNS: List[Column] = [
+    ('id', 'int64', ()),
+    ('name', 'string', ()),
+    ('symbol', 'string', ()),
+    ('timestamp', 'timestamp', ('timestamp',)),
+]
+
+# Per convert currency, flattened into '<currency>_<field>' columns, e.g. 'usd_price'
+QUOTE_FIELDS: List[Tuple[str, str]] = [
+    ('price', 'float64'),
+    ('volume_24h', 'float64'),
+    ('volume_change_24h', 'float64'),
+    ('market_cap', 'float64'),
+    ('market_cap_dominance', 'float64'),
+    ('fully_diluted_market_cap', 'float64'),
+    ('percent_change_1h', 'float64'),
+    ('percent_change_24h', 'float64'),
+    ('percent_change_7d', 'float64'),
+    ('percent_change_30d', 'float64'),
+    ('last_updated', 'timestamp'),
+]
+
+ARROW_FORMATS = ('parquet', 'feather')
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError('Arrow export requires pyarrow. Install it with: pip install byteforge-coinmarketcap[arrow]')
+    return pyarrow
+
+
+def _quote_columns(convert: Sequence[str]) -> List[Column]:
+    return [(f'{currency.lower()}_{field}', type, ('quote', currency, field))
+            for currency in convert for field, type in QUOTE_FIELDS]
+
+
+def _timestamp_ms(value) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value * 1000)
+    return int(parse_cmc_datetime(value).timestamp() * 1000)
+
+
+_CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    'int64': int,
+    'float64': float,
+    'string': str,
+    'bool': bool,
+    'timestamp': _timestamp_ms,
+    'list<string>': list,
+}
+
+
+class _ColumnBuffer(object):
+    """
+    Collects raw JSON items straight into per-column Python lists, the only copy made
+    before the Arrow arrays, and turns them into RecordBatches.
+    """
+
+    def __init__(self, columns: List[Column]):
+        self.columns = columns
+        self._getters = [(path, _CONVERTERS[type]) for _, type, path in columns]
+        self._values: List[list] = [[] for _ in columns]
+        self.schema = None
+
+    def __len__(self) -> int:
+        return len(self._values[0])
+
+    def append(self, item: Dict, prefix: Sequence[Any] = ()):
+        """Adds one row. prefix gives the values of the first columns, the ones with an empty path."""
+        for index, value in enumerate(prefix):
+            self._values[index].append(value)
+        for values, (path, convert) in zip(self._values[len(prefix):], self._getters[len(prefix):]):
+            value = item
+            for key in path:
+                value = value.get(key) if isinstance(value, dict) else None
+                if value is None:
+                    break
+            values.append(None if value is None else convert(value))
+
+    def to_record_batch(self):
+        """The buffered rows as a RecordBatch, emptying the buffer."""
+        pa = _pyarrow()
+        if self.schema is None:
+            self.schema = arrow_schema(self.columns)
+        arrays = [pa.array(values, type=field.type) for values, field in zip(self._values, self.schema)]
+        self._values = [[] for _ in self.columns]
+        return pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+
+
+def arrow_schema(columns: List[Column]):
+    """The pyarrow schema of a column list, e.g. LISTING_COLUMNS + _quote_columns(['USD'])."""
+    pa = _pyarrow()
+    types = {
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'string': pa.string(),
+        'bool': pa.bool_(),
+        'timestamp': pa.timestamp('ms', tz='UTC'),
+        'list<string>': pa.list_(pa.string()),
+    }
+    return pa.schema([pa.field(name, types[type]) for name, type, _ in columns])
+
+
+class ArrowExporter(object):
+    """
+    Streams listings_latest, map and historical v3 responses into Arrow RecordBatches and
+    Parquet or Feather files, without building TokenState or TokenInfo objects.
+
+    Responses are decoded as they arrive (like the stream_* methods) and each item is copied
+    once, into per-column lists, then into Arrow arrays. Quotes are flattened into one column
+    per convert currency and field ('usd_price', 'eur_market_cap', ...), so the schema only
+    depends on the convert list. write() appends every batch as a Parquet row group (or Feather
+    record batch) as soon as it is ready, memory stays bounded by one page.
+
+    Example:
+        exporter = ArrowExporter(market)
+        exporter.write(exporter.listings_latest(convert=['USD', 'BTC']), 'listings.parquet')
+        exporter.write(exporter.quotes_historical_v3([1, 1027], timestamp_start=start), 'history.feather')
+    """
+
+    def __init__(self, market):
+        self.market = market
+
+    def listings_latest(self,
+                        sort_by: SortOption = SortOption.MARKET_CAP,
+                        sort_dir: SortDir = SortDir.DESC,
+                        convert: List[str] = ['USD'],
+                        aux_fields: AuxFields = None,
+                        filters: FilterOptions = None,
+                        page_size: int = MAX_PAGE_SIZE,
+                        max_items: Optional[int] = None) -> Iterator:
+        """Yields the listings page by page, one RecordBatch per page of page_size assets."""
+        columns = LISTING_COLUMNS + _quote_columns(convert)
+
+        def params(start: int, limit: int) -> Dict:
+            return _listings_latest_params(sort_by, sort_dir, start, limit, convert, aux_fields, filters)
+
+        return self._paginated('v1/cryptocurrency/listings/latest', params, columns, page_size, max_items)
+
+    def map(self,
+            listing_status: ListingStatus = ListingStatus.ACTIVE,
+            sort: MapSortOption = MapSortOption.ID,
+            aux_fields: List[MapAuxFields] = None,
+            page_size: int = MAX_PAGE_SIZE,
+            max_items: Optional[int] = None) -> Iterator:
+        """Yields the id map page by page, one RecordBatch per page of page_size assets."""
+
+        def params(start: int, limit: int) -> Dict:
+            return _map_params(listing_status, start, limit, None, sort, aux_fields)
+
+        return self._paginated('v1/cryptocurrency/map', params, MAP_COLUMNS, page_size, max_items)
+
+    def quotes_historical_v3(self,
+                             ids: Iterable[int],
+                             timestamp_start: Optional[int] = None,
+                             timestamp_end: Optional[int] = None,
+                             interval: str = 'hourly',
+                             convert: List[str] = ['USD']) -> Iterator:
+        """Yields the historical quotes of each id, one RecordBatch per id."""
+        if timestamp_end is None:
+            timestamp_end = int(time.time())
+        if timestamp_start is None:
+            timestamp_start = timestamp_end - 60*60*24
+
+        columns = HISTORICAL_COLUMNS + _quote_columns(convert)
+        buffer = _ColumnBuffer(columns)
+
+        for id in ids:
+            id = str(id)
+            params = _quotes_historical_v3_params(id, None, timestamp_start, timestamp_end, interval, convert)
+            stream = self.market._request_stream('v3/cryptocurrency/quotes/historical', params=params,
+                                                 path=['data', id, 'quotes'])
+            lst_pending = []
+            meta = None
+            for dct_quote_block in stream:
+                if meta is None:
+                    meta = _quote_summary_meta(stream.siblings, id)
+                if meta is None:
+                    # the summary fields come after 'quotes' in this response, hold blocks until they are read
+                    lst_pending.append(dct_quote_block)
+                else:
+                    buffer.append(dct_quote_block, (int(id), meta[1], meta[2]))
+            if lst_pending:
+                meta = _quote_summary_meta(stream.finish(), id, required=True)
+                for dct_quote_block in lst_pending:
+                    buffer.append(dct_quote_block, (int(id), meta[1], meta[2]))
+
+            if len(buffer):
+                yield buffer.to_record_batch()
+
+    def write(self, batches: Iterable, path: str, format: Optional[str] = None, compression: str = 'zstd') -> int:
+        """
+        Writes batches to path as they come, each as its own Parquet row group or Feather
+        record batch, and returns the number of rows written. The format is taken from the
+        extension (.parquet/.pq, .feather/.arrow) unless given.
+
+        Raises:
+            ValueError: If the format is unknown, or batches is empty.
+        """
+        if format is None:
+            extension = os.path.splitext(path)[1].lower()
+            format = 'parquet' if extension in ('.parquet', '.pq') else 'feather' if extension in ('.feather', '.arrow') else None
+        if format not in ARROW_FORMATS:
+            raise ValueError(f"Unsupported format '{format}', expected one of: {', '.join(ARROW_FORMATS)}")
+
+        pa = _pyarrow()
+        writer = None
+        rows = 0
+        try:
+            for batch in batches:
+                if writer is None:
+                    if format == 'parquet':
+                        import pyarrow.parquet as pq
+                        writer = pq.ParquetWriter(path, batch.schema, compression=compression)
+                    else:
+                        writer = pa.ipc.new_file(path, batch.schema,
+                                                 options=pa.ipc.IpcWriteOptions(compression=compression))
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if writer is None:
+            raise ValueError('No rows to write')
+        return rows
+
+    def _paginated(self, endpoint: str, params: Callable[[int, int], Dict], columns: List[Column],
+                   page_size: int, max_items: Optional[int]) -> Iterator:
+        if page_size < 1 or page_size > MAX_PAGE_SIZE:
+            raise ValueError(f'page_size must be between 1 and {MAX_PAGE_SIZE}')
+
+        buffer = _ColumnBuffer(columns)
+        start = 1
+        while max_items is None or start <= max_items:
+            limit = page_size if max_items is None else min(page_size, max_items - start + 1)
+            for item in self.market._request_stream(endpoint, params=params(start, limit), path=['data']):
+                buffer.append(item)
+            received = len(buffer)
+            if received:
+                yield buffer.to_record_batch()
+            if received < limit:
+                break
+            start += limit
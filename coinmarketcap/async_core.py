@@ -0,0 +1,346 @@
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Optional, List, Dict, Union
+
+try:
+	import httpx
+except ImportError:  # pragma: no cover - optional dependency
+	httpx = None
+
+from .core import ServerException, MalformedResponseError, CircuitOpenError
+from .retry import RetryPolicy, CircuitBreaker
+from .instrumentation import Hooks, DebugHooks, _request_event, _call_hooks
+from .shared_limiter import SharedRateLimiter
+from .singleflight import _flight_key
+from .convert_fanout import _convert_fanout_params, _merge_convert_responses
+from .v1.cryptocurrency.map import ListingStatus, MapSortOption, MapAuxFields, _map_params, _parse_map
+from .v1.cryptocurrency.listings.common import SortOption, AuxFields, SortDir, FilterOptions
+from .v1.cryptocurrency.listings.latest import _listings_latest_params, _parse_listings_latest
+from .v2.cryptocurrency.quotes.historical import _quotes_historical_v2_params, _parse_quotes_historical_v2
+from .v3.cryptocurrency.quotes.historical_v3 import _quotes_historical_v3_params, _parse_quotes_historical_v3
+from .v1.key.info import _parse_safe_daily_call_limit
+from .v4.dex.listings.info import _dex_listings_info_params, _parse_dex_listings_info, DexAuxFields
+from .types.dex_info import DexInfo
+from crypto_commons.types.token_state import TokenState
+from crypto_commons.types.token_info import TokenInfo
+
+
+class _AsyncRateLimiter(object):
+	"""Sliding one-minute window limiter shared by all coroutines of an AsyncMarket."""
+
+	def __init__(self, per_minute: int):
+		self.per_minute = per_minute
+		self._sent = deque()
+		self._lock = None
+
+	async def acquire(self):
+		if not self._lock:
+			self._lock = asyncio.Lock()
+
+		async with self._lock:
+			while True:
+				now = time.monotonic()
+				while self._sent and now - self._sent[0] >= 60:
+					self._sent.popleft()
+
+				if len(self._sent) < self.per_minute:
+					self._sent.append(now)
+					return
+
+				await asyncio.sleep(60 - (now - self._sent[0]))
+
+
+class _SharedAsyncRateLimiter(object):
+	"""Waits for a SharedRateLimiter, coordinating with the other processes using its store."""
+
+	def __init__(self, limiter: SharedRateLimiter):
+		self.limiter = limiter
+
+	async def acquire(self):
+		await self.limiter.acquire_async()
+
+
+class AsyncMarket(object):
+	"""
+	asyncio counterpart of Market.
+
+	Requests go through a single pooled httpx.AsyncClient (HTTP/2 when requested and the
+	'h2' package is installed) and at most max_concurrency of them are in flight at once.
+	Responses are parsed by the same helpers and factories as the synchronous client, so
+	both return identical objects. There is no HTTP response cache on this client.
+
+	Example:
+		async with AsyncMarket(api_key=API_KEY, max_concurrency=20) as market:
+			pages = await asyncio.gather(*[market.map(start=s, limit=500) for s in range(1, 5001, 500)])
+	"""
+
+	_client = None
+	_debug_mode = False
+	_api_key = None
+	_limiter = None
+	_semaphore = None
+	_inflight = None
+	_retry_policy = None
+	_circuit_breaker = None
+	_hooks = ()
+	__DEFAULT_BASE_URL = 'https://pro-api.coinmarketcap.com/'
+	__DEFAULT_TIMEOUT = 30
+	__DEFAULT_MAX_CONCURRENCY = 10
+
+	def __init__(self, api_key = None,
+			  base_url = __DEFAULT_BASE_URL,
+			  request_timeout = __DEFAULT_TIMEOUT,
+			  max_concurrency = __DEFAULT_MAX_CONCURRENCY,
+			  http2 = False,
+			  rate_limit_per_minute = -1,
+			  debug_mode = False,
+			  transport = None,
+			  coalesce_requests = True,
+			  retry_policy: Optional[RetryPolicy] = None,
+			  circuit_breaker: Optional[CircuitBreaker] = None,
+			  hooks: Optional[List[Hooks]] = None,
+			  rate_limiter: Optional[SharedRateLimiter] = None):
+
+		if httpx is None:
+			raise ImportError('AsyncMarket requires httpx. Install it with: pip install byteforge-coinmarketcap[async]')
+
+		self._api_key = api_key
+		self.base_url = base_url
+		self.request_timeout = request_timeout
+		self.max_concurrency = max_concurrency
+		self.http2 = http2
+		self._debug_mode = debug_mode
+		self._transport = transport
+
+		if not self._api_key:
+			raise ValueError('An API key is required for using the coinmarketcap API. Please visit https://pro.coinmarketcap.com/signup/ for more information.')
+
+		if max_concurrency < 1:
+			raise ValueError('max_concurrency must be at least 1')
+
+		if rate_limit_per_minute > 0 and rate_limiter is not None:
+			raise ValueError('Pass either rate_limit_per_minute or rate_limiter, not both')
+
+		if rate_limit_per_minute > 0:
+			self._limiter = _AsyncRateLimiter(rate_limit_per_minute)
+		elif rate_limiter is not None:
+			self._limiter = _SharedAsyncRateLimiter(rate_limiter)
+
+		if coalesce_requests:
+			self._inflight = {}
+
+		self._retry_policy = retry_policy
+		self._circuit_breaker = circuit_breaker
+		self._hooks = tuple(hooks or ()) + ((DebugHooks(),) if debug_mode else ())
+
+	@property
+	def client(self):
+		if not self._client:
+			self._client = httpx.AsyncClient(
+				http2=self.http2,
+				timeout=self.request_timeout,
+				transport=self._transport,
+				limits=httpx.Limits(max_connections=self.max_concurrency,
+									max_keepalive_connections=self.max_concurrency),
+				headers={
+					'Accept': 'application/json',
+					'X-CMC_PRO_API_KEY': self._api_key,
+				})
+
+		return self._client
+
+	async def aclose(self):
+		if self._client:
+			await self._client.aclose()
+			self._client = None
+
+	async def __aenter__(self):
+		return self
+
+	async def __aexit__(self, exc_type, exc, tb):
+		await self.aclose()
+
+	async def _request(self, endpoint, params = {}, no_cache = False):
+		# no_cache is accepted for signature parity with Market._request, every call goes to the network
+		lst_params = _convert_fanout_params(endpoint, params)
+		if lst_params:
+			# more than 3 convert currencies, one request per group of 3, all in flight together
+			lst_responses = await asyncio.gather(*(self._request(endpoint, params=group_params) for group_params in lst_params))
+			return _merge_convert_responses(endpoint, list(lst_responses))
+
+		url = self.base_url.rstrip('/') + '/' + endpoint.lstrip('/')
+
+		hooks = self._hooks
+		if hooks:
+			_call_hooks(hooks, 'on_request', endpoint, url, params)
+			started = time.perf_counter()
+
+		shared = False
+		if self._inflight is not None:
+			# identical concurrent calls await one shared round-trip, each caller decodes its own copy
+			flight_key = _flight_key(endpoint, params, no_cache)
+			task = self._inflight.get(flight_key)
+			shared = task is not None
+			if not shared:
+				task = asyncio.ensure_future(self._send(url, endpoint, params))
+				self._inflight[flight_key] = task
+				task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+			# a cancelled caller must not cancel the round-trip the others are waiting on
+			response_object = await asyncio.shield(task)
+		else:
+			response_object = await self._send(url, endpoint, params)
+
+		if response_object.status_code != 200:
+			if hooks:
+				_call_hooks(hooks, 'on_response', _request_event(endpoint, response_object, shared, started, time.perf_counter(), None, 0), None)
+			raise ServerException(response_object.status_code, response_object.text)
+
+		if hooks:
+			received = time.perf_counter()
+
+		try:
+			response_json = response_object.json()
+		except (json.JSONDecodeError, ValueError):
+			logging.error("Non-JSON response from %s: %s", endpoint, response_object.text[:500])
+			raise MalformedResponseError(endpoint, "Response is not valid JSON", response_object.text[:500])
+
+		if hooks:
+			credit_count = 0 if shared else (response_json.get('status') or {}).get('credit_count')
+			event = _request_event(endpoint, response_object, shared, started, received, time.perf_counter() - received, credit_count)
+			_call_hooks(hooks, 'on_response', event, response_json)
+
+		if 'data' not in response_json:
+			logging.warning("Response from %s missing 'data' key: %s", endpoint, json.dumps(response_json)[:500])
+
+		return response_json
+
+	async def _request_parsed(self, endpoint, params, parse, no_cache = False, **parse_kwargs):
+		# parsing is timed for the on_parse hook, like Market._request_parsed
+		response = await self._request(endpoint, params=params, no_cache=no_cache)
+		if not self._hooks:
+			return parse(response, **parse_kwargs)
+
+		started = time.perf_counter()
+		result = parse(response, **parse_kwargs)
+		_call_hooks(self._hooks, 'on_parse', endpoint, time.perf_counter() - started, len(result) if hasattr(result, '__len__') else None)
+		return result
+
+	async def _send(self, url, endpoint, params):
+		# same retry and circuit breaker rules as Market._send_with_retries, waiting with asyncio.sleep
+		# outside the semaphore so a backing-off request does not hold a connection slot
+		attempt = 0
+		while True:
+			probe = False
+			if self._circuit_breaker:
+				admission = self._circuit_breaker.admit()
+				if admission is None:
+					if self._retry_policy:
+						self._retry_policy.metrics._count('circuit_rejections')
+					raise CircuitOpenError(endpoint, self._circuit_breaker.retry_after())
+				# only the request holding the probe may give it back
+				probe = admission == CircuitBreaker.HALF_OPEN
+
+			try:
+				response_object = await self._send_once(url, params)
+			except httpx.HTTPError as e:
+				if self._circuit_breaker:
+					self._circuit_breaker.record_failure()
+				delay = self._retry_policy.next_delay(attempt, exception=e) if self._retry_policy else None
+				if delay is None:
+					raise
+				if self._hooks:
+					_call_hooks(self._hooks, 'on_retry', endpoint, attempt + 1, delay, self._retry_policy.retry_reason(exception=e))
+			except BaseException:
+				# cancelled, or failed without a transport error, let the next request probe
+				if probe:
+					self._circuit_breaker.release_probe()
+				raise
+			else:
+				if self._circuit_breaker:
+					self._circuit_breaker.record_response(response_object.status_code)
+				delay = None
+				if self._retry_policy and response_object.status_code != 200:
+					delay = self._retry_policy.next_delay(attempt, response=response_object)
+				if delay is None:
+					if attempt and response_object.status_code == 200:
+						self._retry_policy.metrics._count('recovered')
+					return response_object
+				if self._hooks:
+					_call_hooks(self._hooks, 'on_retry', endpoint, attempt + 1, delay, self._retry_policy.retry_reason(response=response_object))
+
+			await asyncio.sleep(delay)
+			attempt += 1
+
+	async def _send_once(self, url, params):
+		# created lazily so the semaphore belongs to the running event loop
+		if not self._semaphore:
+			self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+		async with self._semaphore:
+			if self._limiter:
+				await self._limiter.acquire()
+			return await self.client.get(url, params=params)
+
+	async def fear_and_greed_historical(self, start: int, limit: int) -> List[Dict[str, Union[str, int]]]:
+		"""Async version of Market.fear_and_greed_historical."""
+		response = await self._request('v3/fear-and-greed/historical', params={'start': start, 'limit': limit})
+		return response.get('data', [])
+
+	async def map(self,
+			listing_status: ListingStatus = ListingStatus.ACTIVE,
+			start: int = 1,
+			limit: int = 100,
+			symbols: List[str] = None,
+			sort: MapSortOption = MapSortOption.ID,
+			aux_fields: List[MapAuxFields] = None) -> List[TokenInfo]:
+		"""Async version of Market.map."""
+		params = _map_params(listing_status, start, limit, symbols, sort, aux_fields)
+		return await self._request_parsed('v1/cryptocurrency/map', params, _parse_map)
+
+	async def quotes_historical(self,
+						  id: Optional[str] = None,
+						  ticker: Optional[str] = None,
+						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
+						  timestamp_end: Optional[int] = int(time.time()),
+						  interval: str = 'hourly',
+						  convert: List[str] = ['USD']) -> List[TokenState]:
+		"""Async version of Market.quotes_historical."""
+		params = _quotes_historical_v2_params(id, ticker, timestamp_start, timestamp_end, interval, convert)
+		return await self._request_parsed('v2/cryptocurrency/quotes/historical', params, _parse_quotes_historical_v2, id=id, ticker=ticker)
+
+	async def quotes_historical_v3(self,
+						  id: Optional[str] = None,
+						  ticker: Optional[str] = None,
+						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
+						  timestamp_end: Optional[int] = int(time.time()),
+						  interval: str = 'hourly',
+						  convert: List[str] = ['USD']) -> List[TokenState]:
+		"""Async version of Market.quotes_historical_v3."""
+		params = _quotes_historical_v3_params(id, ticker, timestamp_start, timestamp_end, interval, convert)
+		return await self._request_parsed('v3/cryptocurrency/quotes/historical', params, _parse_quotes_historical_v3, id=id, ticker=ticker)
+
+	async def listings_latest(self, sort_by: SortOption = SortOption.MARKET_CAP,
+					sort_dir: SortDir = SortDir.DESC,
+					start: int = 1,
+					limit: int = 100,
+					convert: List[str] = ['USD'],
+					aux_fields: AuxFields = None,
+					filters: FilterOptions = None) -> List[TokenState]:
+		"""Async version of Market.listings_latest."""
+		params = _listings_latest_params(sort_by, sort_dir, start, limit, convert, aux_fields, filters)
+		return await self._request_parsed('v1/cryptocurrency/listings/latest', params, _parse_listings_latest, no_cache=True)
+
+	async def safe_daily_call_limit(self) -> int:
+		"""Async version of Market.safe_daily_call_limit."""
+		response = await self._request('v1/key/info', no_cache=True)
+		return _parse_safe_daily_call_limit(response['data'])
+
+	async def dex_listings_info(self,
+						 ids: Union[int, List[int]],
+						 aux_fields: Optional[List[DexAuxFields]] = None) -> List[DexInfo]:
+		"""Async version of Market.dex_listings_info."""
+		params = _dex_listings_info_params(ids, aux_fields)
+		return await self._request_parsed('v4/dex/listings/info', params, _parse_dex_listings_info, no_cache=True)
@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+import requests_cache
+from requests_cache import BaseCache, DictStorage
+
+from coinmarketcap.cache_policy import CACHE_BACKENDS
+
+
+class _LRUStorage(DictStorage):
+    """DictStorage holding at most max_entries items, dropping the least recently used first."""
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.data = OrderedDict()
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            item = super().__getitem__(key)
+            self.data.move_to_end(key)
+            return item
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.max_entries:
+                self.data.popitem(last=False)
+
+    def __delitem__(self, key):
+        with self._lock:
+            del self.data[key]
+
+
+class LRUMemoryCache(BaseCache):
+    """
+    In-process requests_cache backend keeping the max_entries most recently used responses.
+
+    Nothing is written to disk and the cache is not shared between processes, use the
+    'sqlite' backend (one host) or 'redis' (many hosts) for that.
+    """
+
+    def __init__(self, cache_name: str = 'coinmarketcap_cache', max_entries: int = 1024, **kwargs):
+        if max_entries < 1:
+            raise ValueError('max_entries must be at least 1')
+        super().__init__(cache_name=cache_name, **kwargs)
+        self.responses = _LRUStorage(max_entries)
+        self.redirects = _LRUStorage(max_entries)
+
+
+def _create_cache_backend(backend: Union[str, BaseCache], cache_name: str, cache_options: Optional[Dict] = None) -> BaseCache:
+    """
+    Builds the requests_cache backend Market's caching session stores responses in.
+
+    Parameters:
+        backend (Union[str, BaseCache]): 'sqlite', 'memory' (LRU), 'filesystem', 'redis', or a
+                                         ready made requests_cache backend instance.
+        cache_name (str): Database path, directory or key namespace, depending on the backend.
+        cache_options (Optional[Dict]): Extra backend arguments, e.g. {'max_entries': 5000} for
+                                        'memory' or {'host': 'cache', 'port': 6379} for 'redis'.
+
+    Raises:
+        ValueError: If the backend name is not supported.
+        ImportError: If 'redis' is requested without the redis package installed.
+    """
+    if isinstance(backend, BaseCache):
+        return backend
+
+    cache_options = cache_options or {}
+
+    if backend == 'memory':
+        return LRUMemoryCache(cache_name, **cache_options)
+
+    if backend == 'redis':
+        try:
+            import redis  # noqa: F401
+        except ImportError:
+            raise ImportError('The redis cache backend requires redis. Install it with: pip install byteforge-coinmarketcap[redis]')
+
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"Unsupported cache backend '{backend}', expected one of: {', '.join(CACHE_BACKENDS)}")
+
+    return requests_cache.init_backend(cache_name, backend, **cache_options)
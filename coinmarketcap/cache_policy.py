@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+from typing import Dict, Optional, Union
+
+from coinmarketcap.v1.cryptocurrency.listings.common import _interval_seconds
+
+# Expiration values understood by cache_ttls, besides seconds and timedeltas. They are
+# requests_cache's NEVER_EXPIRE and DO_NOT_CACHE, spelled out so the policy can be read
+# without importing requests_cache
+IMMUTABLE = -1
+NO_CACHE = 3674576450094852
+
+ExpireAfter = Union[int, float, timedelta]
+
+HISTORICAL_ENDPOINTS = ('v2/cryptocurrency/quotes/historical', 'v3/cryptocurrency/quotes/historical')
+
+# How long each endpoint's responses stay fresh, by how often CoinMarketCap updates them.
+# Historical quotes whose range has closed never change and are cached with IMMUTABLE.
+DEFAULT_CACHE_TTLS: Dict[str, ExpireAfter] = {
+    'v1/key/info': NO_CACHE,
+    'v1/cryptocurrency/listings/latest': 60,
+    'v1/cryptocurrency/map': 24*60*60,
+    'v2/cryptocurrency/quotes/historical': 5*60,
+    'v3/cryptocurrency/quotes/historical': 5*60,
+    'v3/fear-and-greed/historical': 60*60,
+    'v4/dex/listings/info': 24*60*60,
+}
+
+# Used for endpoints missing from the policy, the original blanket TTL
+DEFAULT_EXPIRE_AFTER = 120
+
+CACHE_BACKENDS = ('sqlite', 'memory', 'filesystem', 'redis')
+
+
+def _is_closed_range(params: Dict, now: Optional[float] = None) -> bool:
+    """True when the newest point of a historical range is already final."""
+    time_end = params.get('time_end')
+    if time_end is None:
+        return False
+    try:
+        # the longest step, a month or year is final only once its longest possible length has passed
+        step = _interval_seconds(params.get('interval', 'hourly'), longest=True)
+    except ValueError:
+        return False
+    now = time.time() if now is None else now
+    return int(time_end) + step <= now
+
+
+def _cache_expire_after(endpoint: str, params: Dict, cache_ttls: Dict[str, ExpireAfter]) -> ExpireAfter:
+    """Returns the expiration to store a response of endpoint with, following cache_ttls."""
+    endpoint = endpoint.strip('/')
+    if endpoint in HISTORICAL_ENDPOINTS and cache_ttls.get(endpoint) != NO_CACHE and _is_closed_range(params or {}):
+        return IMMUTABLE
+    return cache_ttls.get(endpoint, DEFAULT_EXPIRE_AFTER)
@@ -0,0 +1,103 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from crypto_commons.types.token_state import TokenState
+from coinmarketcap.types.historical_quotes import HistoricalQuotes
+from coinmarketcap.v1.cryptocurrency.listings.common import _interval_seconds
+from coinmarketcap.scheduler import _with_current_context
+
+# Maximum number of data points the historical quotes endpoints return for one call
+MAX_POINTS_PER_CALL = 10000
+
+# Points requested per chunk when the caller doesn't choose, keeps each payload reasonably small
+DEFAULT_POINTS_PER_CHUNK = 2000
+
+
+def _split_time_range(timestamp_start: int,
+                      timestamp_end: int,
+                      interval: str,
+                      points_per_chunk: int = DEFAULT_POINTS_PER_CHUNK) -> List[Tuple[int, int]]:
+    """
+    Splits [timestamp_start, timestamp_end] into consecutive windows holding at most
+    points_per_chunk points of the given interval.
+
+    Consecutive windows share their boundary timestamp, so a point sitting exactly on a
+    boundary may come back twice; _stitch_token_states drops the duplicate.
+
+    Raises:
+        ValueError: If points_per_chunk is outside 1..MAX_POINTS_PER_CALL or the interval is invalid.
+    """
+    if points_per_chunk < 1 or points_per_chunk > MAX_POINTS_PER_CALL:
+        raise ValueError(f'points_per_chunk must be between 1 and {MAX_POINTS_PER_CALL}')
+
+    span = _interval_seconds(interval) * points_per_chunk
+
+    lst_windows = []
+    window_start = timestamp_start
+    while True:
+        window_end = min(window_start + span, timestamp_end)
+        lst_windows.append((window_start, window_end))
+        if window_end >= timestamp_end:
+            break
+        window_start = window_end
+
+    return lst_windows
+
+
+def _stitch_token_states(lst_chunks: List[List[TokenState]]) -> List[TokenState]:
+    """Merges per-chunk results into one list ordered by timestamp, keeping the first of any duplicates."""
+    dct_by_timestamp = {}
+    for lst_token_states in lst_chunks:
+        for token_state in lst_token_states:
+            dct_by_timestamp.setdefault(token_state.timestamp, token_state)
+
+    return [dct_by_timestamp[timestamp] for timestamp in sorted(dct_by_timestamp)]
+
+
+def _fetch_historical_chunked(market,
+                              endpoint: str,
+                              params_fn: Callable[..., Dict],
+                              parse_fn: Callable[..., List[TokenState]],
+                              id: Optional[str],
+                              ticker: Optional[str],
+                              timestamp_start: int,
+                              timestamp_end: int,
+                              interval: str,
+                              convert: List[str],
+                              points_per_chunk: int = DEFAULT_POINTS_PER_CHUNK,
+                              max_workers: int = 4) -> HistoricalQuotes:
+    """
+    Fetches a historical quotes range as several interval-aware chunks, concurrently.
+
+    params_fn and parse_fn are the params builder and response parser of the historical
+    endpoint being chunked (e.g. _quotes_historical_v3_params / _parse_quotes_historical_v3).
+
+    Returns:
+        HistoricalQuotes: The stitched, timestamp ordered TokenState list, with the number of
+                          chunks and the credits they consumed.
+    """
+    if max_workers < 1:
+        raise ValueError('max_workers must be at least 1')
+
+    # validates all arguments before anything is sent
+    params_fn(id, ticker, timestamp_start, timestamp_end, interval, convert)
+
+    lst_windows = _split_time_range(timestamp_start, timestamp_end, interval, points_per_chunk)
+
+    def fetch_window(window: Tuple[int, int]) -> Tuple[List[TokenState], int]:
+        params = params_fn(id, ticker, window[0], window[1], interval, convert)
+        # a chunk served from the cache cost nothing this time
+        response, credits = market._request_charged(endpoint, params=params)
+        return parse_fn(response, id=id, ticker=ticker), credits
+
+    if len(lst_windows) == 1:
+        lst_results = [fetch_window(lst_windows[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(lst_windows))) as executor:
+            lst_results = list(executor.map(_with_current_context(fetch_window), lst_windows))
+
+    lst_token_states = _stitch_token_states([token_states for token_states, _ in lst_results])
+
+    return HistoricalQuotes(lst_token_states,
+                            chunks=len(lst_windows),
+                            credits_used=sum(credits for _, credits in lst_results))
@@ -0,0 +1,96 @@
+from typing import Callable, Dict, Iterator, List, Optional
+
+# The listings and historical quotes endpoints accept at most this many convert currencies per call
+MAX_CONVERTS_PER_CALL = 3
+
+# Maximum convert groups fetched at once by Market, AsyncMarket sends them all together
+MAX_FANOUT_WORKERS = 4
+
+
+def _merge_listings(dct_merged: Dict, dct_other: Dict):
+    # assets are matched by id, an asset only the first response has keeps the currencies it came with
+    dct_by_id = {item['id']: item for item in dct_merged.get('data') or [] if 'id' in item}
+    for item in dct_other.get('data') or []:
+        target = dct_by_id.get(item.get('id'))
+        if target is not None:
+            target.setdefault('quote', {}).update(item.get('quote') or {})
+
+
+def _quote_summaries(data) -> Iterator[Dict]:
+    # v2 by id has the summary as 'data', v3 keys it by id, and by ticker both wrap it in a list
+    if isinstance(data, list):
+        for item in data:
+            yield from _quote_summaries(item)
+    elif isinstance(data, dict):
+        if 'quotes' in data:
+            yield data
+        else:
+            for value in data.values():
+                yield from _quote_summaries(value)
+
+
+def _merge_historical(dct_merged: Dict, dct_other: Dict):
+    # summaries are matched by id and quote blocks by timestamp
+    dct_summaries = {summary.get('id'): summary for summary in _quote_summaries(dct_merged.get('data'))}
+    for summary in _quote_summaries(dct_other.get('data')):
+        target = dct_summaries.get(summary.get('id'))
+        if target is None:
+            continue
+        dct_blocks = {block.get('timestamp'): block for block in target['quotes'] or []}
+        for block in summary['quotes'] or []:
+            target_block = dct_blocks.get(block.get('timestamp'))
+            if target_block is not None:
+                target_block.setdefault('quote', {}).update(block.get('quote') or {})
+
+
+_CONVERT_MERGERS: Dict[str, Callable[[Dict, Dict], None]] = {
+    'v1/cryptocurrency/listings/latest': _merge_listings,
+    'v2/cryptocurrency/quotes/historical': _merge_historical,
+    'v3/cryptocurrency/quotes/historical': _merge_historical,
+}
+
+
+def _convert_fanout_params(endpoint: str, params: Dict) -> Optional[List[Dict]]:
+    """
+    The params of one request per group of MAX_CONVERTS_PER_CALL convert currencies, or None
+    when the request fits in a single call (or the endpoint's quotes cannot be merged).
+    """
+    convert = params.get('convert') if params else None
+    if not convert or endpoint.lstrip('/') not in _CONVERT_MERGERS:
+        return None
+
+    lst_convert = list(dict.fromkeys(currency.strip() for currency in str(convert).split(',') if currency.strip()))
+    if len(lst_convert) <= MAX_CONVERTS_PER_CALL:
+        return None
+
+    return [dict(params, convert=','.join(lst_convert[i:i + MAX_CONVERTS_PER_CALL]))
+            for i in range(0, len(lst_convert), MAX_CONVERTS_PER_CALL)]
+
+
+def _merge_convert_responses(endpoint: str, lst_responses: List[Dict]) -> Dict:
+    """
+    Merges the quotes of the responses of _convert_fanout_params' requests into the first one,
+    so each asset (or point) carries every currency in one quote map, in the caller's order.
+    Only the assets and points of the first response are kept.
+    """
+    merge = _CONVERT_MERGERS[endpoint.lstrip('/')]
+    dct_merged = lst_responses[0]
+    for dct_other in lst_responses[1:]:
+        merge(dct_merged, dct_other)
+
+    # report what the whole fan-out cost
+    lst_credits = [(response.get('status') or {}).get('credit_count') for response in lst_responses]
+    if isinstance(dct_merged.get('status'), dict) and all(isinstance(credits, int) for credits in lst_credits):
+        dct_merged['status']['credit_count'] = sum(lst_credits)
+
+    return dct_merged
+
+
+def _check_stream_convert(endpoint: str, params: Dict):
+    """
+    Raises:
+        ValueError: If the request would need several convert groups, a stream cannot merge them.
+    """
+    if _convert_fanout_params(endpoint, params):
+        raise ValueError(f'Streaming requests accept at most {MAX_CONVERTS_PER_CALL} convert currencies, '
+                         'use the non-streaming method for more')
@@ -5,24 +5,33 @@ import logging
 import requests
 import tempfile
 import time
-import requests_cache
-from typing import Optional, List, Dict, Union
+import functools
+from typing import Optional, List, Dict, Union, Iterator, TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
 
-from requests_ratelimiter import LimiterAdapter
-
-from .v1.cryptocurrency.map import ListingStatus
 from crypto_commons.types.token_state import TokenState
 from crypto_commons.types.token_info import TokenInfo
-from .v2.cryptocurrency.quotes.historical import _quotes_historical_v2
-from .v3.cryptocurrency.quotes.historical_v3 import _quotes_historical_v3
-from .v1.cryptocurrency.listings.latest import _listings_latest
+from .chunking import _fetch_historical_chunked, DEFAULT_POINTS_PER_CHUNK
+from .types.historical_quotes import HistoricalQuotes
+from .types.historical_series import HistoricalSeries
+# only the option types the signatures need, the endpoint modules are imported by the methods using them
 from .v1.cryptocurrency.listings.common import SortOption, AuxFields, SortDir, FilterOptions
-from .v1.key.info import _key_info
-from .v1.key.info import _safe_daily_call_limit
-from .v1.cryptocurrency.map import _map, MapSortOption, MapAuxFields
-from .v3.fear_and_greed.historical import _fear_and_greed_historical
-from .v4.dex.listings.info import _dex_listings_info, DexAuxFields
+from .v1.cryptocurrency.map_common import ListingStatus, MapSortOption, MapAuxFields
+from .v4.dex.listings.common import DexAuxFields, DEX_MAX_BATCH_IDS, DEX_RECORD_TTL
 from .types.dex_info import DexInfo, DexUrls
+from .streaming import _JsonArrayStream
+from .scheduler import CreditScheduler, Priority, request_priority, _estimate_credits, _with_current_context
+from .singleflight import _SingleFlight, _flight_key
+from .object_cache import ParsedObjectCache
+from .retry import RetryPolicy, CircuitBreaker
+from .convert_fanout import MAX_FANOUT_WORKERS, _convert_fanout_params, _merge_convert_responses, _check_stream_convert
+from .cache_policy import DEFAULT_CACHE_TTLS, DEFAULT_EXPIRE_AFTER, NO_CACHE, _cache_expire_after
+
+if TYPE_CHECKING:
+	# these pull in sqlite3, asyncio and http.server, they are imported when the matching option is used
+	from .symbol_index import SymbolIndex
+	from .instrumentation import Hooks
+	from .shared_limiter import SharedRateLimiter
 
 class ServerException(Exception):
     def __init__(self, status_code: int, message: str):
@@ -31,6 +40,14 @@ class ServerException(Exception):
         super().__init__(f"Server returned {status_code} - {message}")
 
 
+class CircuitOpenError(ServerException):
+    """Raised without sending the request while the circuit breaker considers the API down."""
+    def __init__(self, endpoint: str, retry_after: float):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__(503, f"Circuit open, {endpoint} not requested (next attempt in {retry_after:.1f}s)")
+
+
 class MalformedResponseError(Exception):
     def __init__(self, endpoint: str, message: str, raw_body: str = ""):
         self.endpoint = endpoint
@@ -45,16 +62,36 @@ class Market(object):
 	_debug_mode = False
 	_api_key = None
 	_limiter = None
+	_credit_scheduler = None
+	_inflight = None
+	_object_cache = None
+	_record_cache = None
+	_symbol_index = None
+	_retry_policy = None
+	_circuit_breaker = None
+	_hooks = ()
 	__DEFAULT_BASE_URL = 'https://pro-api.coinmarketcap.com/'
 	__DEFAULT_TIMEOUT = 30
 	__TEMPDIR_CACHE = True
+	__STREAM_CHUNK_SIZE = 64 * 1024
 
 	def __init__(self, api_key = None, 
 			  base_url = __DEFAULT_BASE_URL, 
 			  request_timeout = __DEFAULT_TIMEOUT, 
 			  tempdir_cache = __TEMPDIR_CACHE,
 			  rate_limit_per_minute = -1,
-			  debug_mode = False):
+			  debug_mode = False,
+			  credit_scheduler: Optional[CreditScheduler] = None,
+			  coalesce_requests = True,
+			  cache_backend = 'sqlite',
+			  cache_ttls: Optional[Dict] = None,
+			  cache_options: Optional[Dict] = None,
+			  object_cache: Optional[ParsedObjectCache] = None,
+			  symbol_index: Optional['SymbolIndex'] = None,
+			  retry_policy: Optional[RetryPolicy] = None,
+			  circuit_breaker: Optional[CircuitBreaker] = None,
+			  hooks: Optional[List['Hooks']] = None,
+			  rate_limiter: Optional['SharedRateLimiter'] = None):
 		
 		self._api_key = api_key
 		self.base_url = base_url
@@ -62,21 +99,117 @@ class Market(object):
 		self._debug_mode = debug_mode
 		self.cache_filename = 'coinmarketcap_cache'
 		self.cache_name = os.path.join(tempfile.gettempdir(), self.cache_filename) if tempdir_cache else self.cache_filename
+		self.cache_backend = cache_backend
+		self.cache_options = cache_options
+		# per-endpoint expiration, the caller's entries override the defaults
+		self.cache_ttls = {**DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
 		
 		if not self._api_key:
 			raise ValueError('An API key is required for using the coinmarketcap API. Please visit https://pro.coinmarketcap.com/signup/ for more information.')
 		
+		if rate_limit_per_minute > 0 and rate_limiter is not None:
+			raise ValueError('Pass either rate_limit_per_minute or rate_limiter, not both')
+
 		if rate_limit_per_minute > 0:
+			from requests_ratelimiter import LimiterAdapter
 			self._limiter = LimiterAdapter(per_minute=rate_limit_per_minute)
+		elif rate_limiter is not None:
+			# limits every process using the same store, mounted on both sessions like LimiterAdapter
+			from .shared_limiter import SharedLimiterAdapter
+			self._limiter = SharedLimiterAdapter(rate_limiter)
+
+		self._credit_scheduler = credit_scheduler
+
+		if coalesce_requests:
+			self._inflight = _SingleFlight()
+
+		self._object_cache = object_cache
+		self._symbol_index = symbol_index
+		self._retry_policy = retry_policy
+		self._circuit_breaker = circuit_breaker
+
+		# debug_mode is one more hook, without hooks the request path skips all the timing
+		self._hooks = tuple(hooks or ())
+		if debug_mode:
+			from .instrumentation import DebugHooks
+			self._hooks += (DebugHooks(),)
+
+	@property
+	def hooks(self) -> List['Hooks']:
+		return list(self._hooks)
+
+	def add_hook(self, hook: 'Hooks'):
+		self._hooks = self._hooks + (hook,)
+
+	@property
+	def retry_policy(self) -> Optional[RetryPolicy]:
+		return self._retry_policy
+
+	@property
+	def circuit_breaker(self) -> Optional[CircuitBreaker]:
+		return self._circuit_breaker
+
+	@property
+	def symbol_index(self) -> Optional['SymbolIndex']:
+		return self._symbol_index
+
+	@property
+	def record_cache(self) -> ParsedObjectCache:
+		"""Where bulk lookups cache individual records: the object cache when set, else a small private one."""
+		if self._object_cache is not None:
+			return self._object_cache
+		if self._record_cache is None:
+			self._record_cache = ParsedObjectCache(max_bytes=16 * 2**20)
+		return self._record_cache
+
+	def _resolve_ticker(self, id, ticker):
+		"""
+		Turns a ticker into an id through the symbol index, when one is set, so the request is
+		not left to the API's ambiguous symbol matching. Returns the (id, ticker) to send.
+		"""
+		if id or not ticker or self._symbol_index is None:
+			return id, ticker
+		return str(self._symbol_index.resolve(ticker, self)), None
+
+	@property
+	def credit_scheduler(self) -> Optional[CreditScheduler]:
+		return self._credit_scheduler
+
+	def priority(self, priority: Priority):
+		"""
+		Context manager running every request made inside it at the given scheduling priority,
+		including the requests chunked and batched calls make from worker threads.
+
+		Example:
+			with market.priority(Priority.BACKFILL):
+				market.quotes_historical_v3(id='1', timestamp_start=start, chunked=True)
+		"""
+		return request_priority(priority)
+
+	def _schedule(self, endpoint, params):
+		"""Waits for the credit scheduler, if any, and returns the credits charged for the request."""
+		if not self._credit_scheduler:
+			return 0
+
+		if self._credit_scheduler.needs_refresh():
+			from .v1.key.info import _key_info
+			self._credit_scheduler.refresh(lambda: _key_info(self))
+
+		credits = _estimate_credits(endpoint, params)
+		self._credit_scheduler.acquire(credits)
+		return credits
 
 	@property
 	def caching_session(self):
 		if not self._caching_session:
+			# requests_cache is imported here rather than with the module, it is the heaviest import by far
+			import requests_cache
+			from .cache_backends import _create_cache_backend
+
 			# define a a session with caching
 			self._caching_session = requests_cache.CachedSession(
-			 	cache_name=self.cache_name,
-			 	backend='sqlite', 
-			 	expire_after=120)
+			 	backend=_create_cache_backend(self.cache_backend, self.cache_name, self.cache_options),
+			 	expire_after=DEFAULT_EXPIRE_AFTER)
 			
 			if self._limiter:
 				self._caching_session.mount('https://', self._limiter)
@@ -107,39 +240,242 @@ class Market(object):
 	
 
 	def _request(self, endpoint, params = {}, no_cache = False):
-		url = self.base_url.rstrip('/') + '/' + endpoint.lstrip('/')
+		return self._request_charged(endpoint, params, no_cache)[0]
+
+	def _request_charged(self, endpoint, params = {}, no_cache = False):
+		"""
+		Sends the request like _request, returns (response, credits charged). Responses served
+		from the cache or shared with an identical in-flight request are charged 0.
+		"""
+		lst_params = _convert_fanout_params(endpoint, params)
+		if lst_params:
+			return self._request_fanned_out(endpoint, lst_params, no_cache)
 
-		if self._debug_mode:
-			print('Request URL: ' + url)
-			if params:
-				print("Request Payload:\n" + json.dumps(params, indent=4))
+		url = self.base_url.rstrip('/') + '/' + endpoint.lstrip('/')
 
-		if no_cache:
-			response_object = self.session.get(url, params=params, timeout=self.request_timeout)
+		hooks = self._hooks
+		if hooks:
+			# loaded along with the hooks themselves, only the import lookup is paid here
+			from .instrumentation import _call_hooks, _request_event
+			_call_hooks(hooks, 'on_request', endpoint, url, params)
+			started = time.perf_counter()
+
+		if self._inflight:
+			# identical concurrent calls share one HTTP round-trip, each caller still decodes its own
+			# copy of the body below since the parsers modify the dicts they are given
+			flight_key = _flight_key(endpoint, params, no_cache)
+			(response_object, credits), shared = self._inflight.do(flight_key, lambda: self._send(url, endpoint, params, no_cache))
 		else:
-			response_object = self.caching_session.get(url, params=params, timeout=self.request_timeout)
+			(response_object, credits), shared = self._send(url, endpoint, params, no_cache), False
 
-		if self._debug_mode:
-			print('Response Code: ' + str(response_object.status_code))
-			if hasattr(response_object, 'from_cache'):
-				print('From Cache?: ' + str(response_object.from_cache))
+		# only the caller that sent the request settles its credits
+		if shared:
+			credits = 0
 
 		if response_object.status_code != requests.codes.ok:
+			if credits:
+				self._credit_scheduler.settle(credits, 0)
+			if hooks:
+				_call_hooks(hooks, 'on_response', _request_event(endpoint, response_object, shared, started, time.perf_counter(), None, 0), None)
 			raise ServerException(response_object.status_code, response_object.text)
 
+		if hooks:
+			received = time.perf_counter()
+
 		try:
 			response_json = response_object.json()
 		except (json.JSONDecodeError, ValueError):
 			logging.error("Non-JSON response from %s: %s", endpoint, response_object.text[:500])
 			raise MalformedResponseError(endpoint, "Response is not valid JSON", response_object.text[:500])
 
-		if self._debug_mode:
-			print("Response Payload:\n" + json.dumps(response_json, indent=4))
+		charged = 0 if shared or getattr(response_object, 'from_cache', False) else (response_json.get('status') or {}).get('credit_count')
+
+		if hooks:
+			event = _request_event(endpoint, response_object, shared, started, received, time.perf_counter() - received, charged)
+			_call_hooks(hooks, 'on_response', event, response_json)
 
 		if 'data' not in response_json:
 			logging.warning("Response from %s missing 'data' key: %s", endpoint, json.dumps(response_json)[:500])
 
-		return response_json
+		if credits:
+			if getattr(response_object, 'from_cache', False):
+				self._credit_scheduler.settle(credits, 0)
+			else:
+				credit_count = (response_json.get('status') or {}).get('credit_count')
+				if isinstance(credit_count, int):
+					self._credit_scheduler.settle(credits, credit_count)
+
+		return response_json, charged if isinstance(charged, int) else 0
+
+	def _request_fanned_out(self, endpoint, lst_params, no_cache):
+		"""
+		Sends one request per group of up to 3 convert currencies, concurrently, and merges
+		their quotes into one response. Each group is cached, scheduled and charged on its own.
+		Returns (merged response, credits charged).
+		"""
+		fetch = _with_current_context(lambda params: self._request_charged(endpoint, params=params, no_cache=no_cache))
+		with ThreadPoolExecutor(max_workers=min(MAX_FANOUT_WORKERS, len(lst_params))) as executor:
+			lst_results = list(executor.map(fetch, lst_params))
+		return (_merge_convert_responses(endpoint, [response for response, _ in lst_results]),
+				sum(charged for _, charged in lst_results))
+
+	def _request_parsed(self, endpoint, params, parse, no_cache = False, **parse_kwargs):
+		"""
+		Requests endpoint and returns parse(response, **parse_kwargs). When an object cache is set,
+		parsed results are kept there for the endpoint's cache TTL, so hits skip both the JSON
+		decoding and the factories.
+		"""
+		# the key names the parser itself, not the timing wrapper hooks put around it
+		key_parse = parse
+		if self._hooks:
+			parse = functools.partial(self._timed_parse, endpoint, parse)
+
+		if self._object_cache is None or no_cache:
+			return parse(self._request(endpoint, params=params, no_cache=no_cache), **parse_kwargs)
+
+		key = (self.base_url, key_parse.__module__, key_parse.__qualname__, tuple(sorted(parse_kwargs.items())),
+			   _flight_key(endpoint, params, False))
+		ttl = _cache_expire_after(endpoint, params, self.cache_ttls)
+
+		return self._object_cache.get_or_create(
+			key, lambda: parse(self._request(endpoint, params=params), **parse_kwargs), ttl)
+
+	def _timed_parse(self, endpoint, parse, response, **parse_kwargs):
+		from .instrumentation import _call_hooks
+		started = time.perf_counter()
+		result = parse(response, **parse_kwargs)
+		_call_hooks(self._hooks, 'on_parse', endpoint, time.perf_counter() - started,
+			len(result) if hasattr(result, '__len__') else None)
+		return result
+
+	def _send(self, url, endpoint, params, no_cache):
+		"""Sends the request through the scheduler and the right session, returns (response, credits charged)."""
+		expire_after = _cache_expire_after(endpoint, params, self.cache_ttls)
+		if expire_after == NO_CACHE:
+			no_cache = True
+
+		response_object = None
+		if self._credit_scheduler and not no_cache:
+			# a cache hit costs no credits, it should not wait for the scheduler
+			response_object = self.caching_session.get(url, params=params, timeout=self.request_timeout, only_if_cached=True)
+			if response_object.status_code != requests.codes.ok:
+				response_object = None
+
+		if response_object is not None:
+			return response_object, 0
+
+		if no_cache:
+			return self._send_with_retries(endpoint, params,
+				lambda: self.session.get(url, params=params, timeout=self.request_timeout))
+		return self._send_with_retries(endpoint, params,
+			lambda: self.caching_session.get(url, params=params, timeout=self.request_timeout, expire_after=expire_after))
+
+	def _send_with_retries(self, endpoint, params, get):
+		"""
+		Calls get() until it returns a response that is not retryable, within the retry policy and
+		circuit breaker, if set. Each attempt is scheduled on its own and a failed attempt's credits
+		are refunded. Returns (response, credits charged for the returned attempt).
+		"""
+		attempt = 0
+		while True:
+			probe = False
+			if self._circuit_breaker:
+				admission = self._circuit_breaker.admit()
+				if admission is None:
+					if self._retry_policy:
+						self._retry_policy.metrics._count('circuit_rejections')
+					raise CircuitOpenError(endpoint, self._circuit_breaker.retry_after())
+				# only the request holding the probe may give it back
+				probe = admission == CircuitBreaker.HALF_OPEN
+
+			try:
+				credits = self._schedule(endpoint, params)
+			except BaseException:
+				if probe:
+					self._circuit_breaker.release_probe()
+				raise
+
+			try:
+				response_object = get()
+			except requests.RequestException as e:
+				if credits:
+					self._credit_scheduler.settle(credits, 0)
+				if self._circuit_breaker:
+					self._circuit_breaker.record_failure()
+				delay = self._retry_policy.next_delay(attempt, exception=e) if self._retry_policy else None
+				if delay is None:
+					raise
+				if self._hooks:
+					from .instrumentation import _call_hooks
+					_call_hooks(self._hooks, 'on_retry', endpoint, attempt + 1, delay, self._retry_policy.retry_reason(exception=e))
+			except BaseException:
+				# no outcome to record, refund the attempt and let the next request probe
+				if credits:
+					self._credit_scheduler.settle(credits, 0)
+				if probe:
+					self._circuit_breaker.release_probe()
+				raise
+			else:
+				if self._circuit_breaker:
+					self._circuit_breaker.record_response(response_object.status_code)
+				delay = None
+				if self._retry_policy and response_object.status_code != requests.codes.ok:
+					delay = self._retry_policy.next_delay(attempt, response=response_object)
+				if delay is None:
+					if attempt and response_object.status_code == requests.codes.ok:
+						self._retry_policy.metrics._count('recovered')
+					return response_object, credits
+				if credits:
+					self._credit_scheduler.settle(credits, 0)
+				if self._hooks:
+					from .instrumentation import _call_hooks
+					_call_hooks(self._hooks, 'on_retry', endpoint, attempt + 1, delay, self._retry_policy.retry_reason(response=response_object))
+				response_object.close()
+
+			self._retry_policy.sleep(delay)
+			attempt += 1
+
+	def _request_stream(self, endpoint, params = {}, path = ('data',)):
+		"""
+		Sends the request like _request, but instead of decoding the whole body returns a
+		_JsonArrayStream that decodes the items of the array at path as the body arrives.
+		Always goes through the non-caching session, a cached body would be fully buffered.
+		"""
+		_check_stream_convert(endpoint, params)
+
+		url = self.base_url.rstrip('/') + '/' + endpoint.lstrip('/')
+
+		hooks = self._hooks
+		if hooks:
+			from .instrumentation import _call_hooks, _request_event
+			_call_hooks(hooks, 'on_request', endpoint, url, params)
+			started = time.perf_counter()
+
+		# the real credit_count sits in 'status', which is not decoded when streaming, so the estimate stands.
+		# Only getting the response is retried, once the body is being consumed a failure is final
+		response_object, credits = self._send_with_retries(endpoint, params,
+			lambda: self.session.get(url, params=params, timeout=self.request_timeout, stream=True))
+
+		if hooks:
+			# only the headers are in, the body is read and decoded as the caller iterates
+			_call_hooks(hooks, 'on_response', _request_event(endpoint, response_object, False, started, None, None, credits), None)
+
+		if response_object.status_code != requests.codes.ok:
+			if credits:
+				self._credit_scheduler.settle(credits, 0)
+			try:
+				raise ServerException(response_object.status_code, response_object.text)
+			finally:
+				response_object.close()
+
+		def chunks():
+			try:
+				for chunk in response_object.iter_content(chunk_size=self.__STREAM_CHUNK_SIZE):
+					yield chunk
+			finally:
+				response_object.close()
+
+		return _JsonArrayStream(chunks(), path)
 
 	def fear_and_greed_historical(self, start: int, limit: int) -> List[Dict[str, Union[str, int]]]:
 		"""
@@ -151,6 +487,7 @@ class Market(object):
 				- value (int): The fear and greed index value (0-100)
 				- value_classification (str): Classification of the value (e.g., 'Greed', 'Fear', etc.)
 		"""
+		from .v3.fear_and_greed.historical import _fear_and_greed_historical
 		return _fear_and_greed_historical(self, start, limit)
 
 	def map(self, 
@@ -186,16 +523,87 @@ class Market(object):
 			ServerException: If the API request fails.
 		"""
 		
+		from .v1.cryptocurrency.map import _map
 		return _map(self, listing_status, start, limit, symbols, sort, aux_fields)
 
+	def stream_map(self,
+			listing_status: ListingStatus = ListingStatus.ACTIVE,
+			start: int = 1,
+			limit: int = 100,
+			symbols: List[str] = None,
+			sort: MapSortOption = MapSortOption.ID,
+			aux_fields: List[MapAuxFields] = None) -> Iterator[TokenInfo]:
+		"""Same as map, but yields TokenInfo objects while the response body is still arriving.
+
+		The body is decoded incrementally, one 'data' entry at a time, so the full document is
+		never held in memory. Streaming requests bypass the response cache.
+		"""
+		from .v1.cryptocurrency.map import _stream_map
+		return _stream_map(self, listing_status, start, limit, symbols, sort, aux_fields)
+
+	def iter_map(self,
+			listing_status: ListingStatus = ListingStatus.ACTIVE,
+			start: int = 1,
+			page_size: int = 1000,
+			max_items: Optional[int] = None,
+			symbols: List[str] = None,
+			sort: MapSortOption = MapSortOption.ID,
+			aux_fields: List[MapAuxFields] = None,
+			prefetch: bool = False) -> Iterator[TokenInfo]:
+		"""Lazily iterates over the whole map universe, one page of page_size entries per API call.
+
+		Pages are only requested as the caller consumes the iterator, so memory stays bounded
+		by a single page (two with prefetch) regardless of how many assets exist.
+
+		Args:
+			listing_status (ListingStatus, optional): Filter by listing status. Defaults to ACTIVE.
+			start (int, optional): 1-based offset to start from. Defaults to 1.
+			page_size (int, optional): Entries fetched per call, at most 5000. Defaults to 1000.
+			max_items (int, optional): Stop after this many entries. Defaults to None (no limit).
+			symbols (List[str], optional): Cryptocurrency symbols to filter by. Defaults to None.
+			sort (MapSortOption, optional): Field to sort results by. Defaults to ID.
+			aux_fields (List[MapAuxFields], optional): Additional fields to include. Defaults to None.
+			prefetch (bool, optional): Fetch the next page on a background thread while the
+				current one is consumed. Defaults to False.
+
+		Returns:
+			Iterator[TokenInfo]: TokenInfo objects in API order.
+
+		Raises:
+			ValueError: If page_size or start are out of range.
+			ServerException: If an API request fails.
+
+		Example:
+			for token_info in market.iter_map(page_size=5000, prefetch=True):
+				print(token_info.id, token_info.symbol)
+		"""
+		from .v1.cryptocurrency.map import _iter_map
+		return _iter_map(self, listing_status, start, page_size, max_items, symbols, sort, aux_fields, prefetch)
+
 	def quotes_historical(self,
 						  id: Optional[str] = None,
 						  ticker: Optional[str] = None,
 						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
 						  timestamp_end: Optional[int] = int(time.time()),
 						  interval: str = 'hourly',
-						  convert: List[str] = ['USD']) -> List[TokenState]:
-		
+						  convert: List[str] = ['USD'],
+						  chunked: bool = False,
+						  points_per_chunk: int = DEFAULT_POINTS_PER_CHUNK,
+						  max_workers: int = 4) -> List[TokenState]:
+		"""
+		Retrieves v2 historical quotes for one cryptocurrency. See quotes_historical_v3 for
+		the meaning of chunked, points_per_chunk and max_workers.
+		"""
+		from .v2.cryptocurrency.quotes.historical import _quotes_historical_v2, _quotes_historical_v2_params, _parse_quotes_historical_v2
+
+		id, ticker = self._resolve_ticker(id, ticker)
+
+		if chunked:
+			return _fetch_historical_chunked(self, 'v2/cryptocurrency/quotes/historical',
+									_quotes_historical_v2_params, _parse_quotes_historical_v2,
+									id, ticker, timestamp_start, timestamp_end, interval, convert,
+									points_per_chunk, max_workers)
+
 		return _quotes_historical_v2(self,
 							   id=id,
 							   ticker=ticker,
@@ -211,15 +619,136 @@ class Market(object):
 						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
 						  timestamp_end: Optional[int] = int(time.time()),
 						  interval: str = 'hourly',
-						  convert: List[str] = ['USD']) -> List[TokenState]:
-		
+						  convert: List[str] = ['USD'],
+						  chunked: bool = False,
+						  points_per_chunk: int = DEFAULT_POINTS_PER_CHUNK,
+						  max_workers: int = 4,
+						  compact: bool = False) -> List[TokenState]:
+		"""
+		Retrieves v3 historical quotes for one cryptocurrency, by id or ticker.
+
+		With chunked=True the time range is split into interval-aware windows of at most
+		points_per_chunk points, the windows are fetched concurrently on up to max_workers
+		threads and the results are stitched back in timestamp order, dropping the duplicate
+		points where windows meet. This keeps long fine-grained ranges (e.g. months at '5m')
+		under the API's per-call point cap.
+
+		Args:
+			id (str, optional): CoinMarketCap id (either id or ticker must be provided).
+			ticker (str, optional): Ticker symbol (either id or ticker must be provided). Resolved to an id
+				through the symbol index when the market has one.
+			timestamp_start (int, optional): Start of the range. Defaults to 24 hours ago.
+			timestamp_end (int, optional): End of the range. Defaults to now.
+			interval (str, optional): Interval between points. Defaults to 'hourly'.
+			convert (List[str], optional): Conversion currencies, more than 3 are fetched in concurrent groups of 3. Defaults to ['USD'].
+			chunked (bool, optional): Split the range into concurrent chunks. Defaults to False.
+			points_per_chunk (int, optional): Maximum points per chunk, at most 10000. Defaults to 2000.
+			max_workers (int, optional): Maximum chunks fetched at once. Defaults to 4.
+			compact (bool, optional): Return read-only CompactTokenState objects. Defaults to False.
+
+		Returns:
+			List[TokenState]: One TokenState per point. When chunked, a HistoricalQuotes list
+				which also reports the number of chunks and credits_used.
+
+		Example:
+			history = market.quotes_historical_v3(id='1', timestamp_start=start, timestamp_end=end,
+												  interval='5m', chunked=True)
+			print(len(history), history.chunks, history.credits_used)
+		"""
+		from .v3.cryptocurrency.quotes.historical_v3 import _quotes_historical_v3, _quotes_historical_v3_params, _parse_quotes_historical_v3
+
+		id, ticker = self._resolve_ticker(id, ticker)
+
+		if chunked:
+			parse_fn = functools.partial(_parse_quotes_historical_v3, compact=True) if compact else _parse_quotes_historical_v3
+			return _fetch_historical_chunked(self, 'v3/cryptocurrency/quotes/historical',
+									_quotes_historical_v3_params, parse_fn,
+									id, ticker, timestamp_start, timestamp_end, interval, convert,
+									points_per_chunk, max_workers)
+
 		return _quotes_historical_v3(self,
 							   id=id,
 							   ticker=ticker,
 							   timestamp_start=timestamp_start,
 							   timestamp_end=timestamp_end,
 							   interval=interval,
-							   convert=convert)
+							   convert=convert,
+							   compact=compact)
+
+	def stream_quotes_historical_v3(self,
+						  id: Optional[str] = None,
+						  ticker: Optional[str] = None,
+						  timestamp_start: Optional[int] = None,
+						  timestamp_end: Optional[int] = None,
+						  interval: str = 'hourly',
+						  convert: List[str] = ['USD'],
+						  compact: bool = False) -> Iterator[TokenState]:
+		"""Same as quotes_historical_v3, but yields one TokenState per point while the body is still arriving.
+
+		Streaming requests bypass the response cache and take at most 3 convert currencies.
+		"""
+		id, ticker = self._resolve_ticker(id, ticker)
+		from .v3.cryptocurrency.quotes.historical_v3 import _stream_quotes_historical_v3
+		return _stream_quotes_historical_v3(self, id, ticker, timestamp_start, timestamp_end, interval, convert, compact)
+
+	def quotes_historical_v3_columnar(self,
+						  id: Optional[str] = None,
+						  ticker: Optional[str] = None,
+						  timestamp_start: Optional[int] = None,
+						  timestamp_end: Optional[int] = None,
+						  interval: str = 'hourly',
+						  convert: List[str] = ['USD']) -> HistoricalSeries:
+		"""
+		Retrieves v3 historical quotes as one struct-of-arrays HistoricalSeries.
+
+		Takes the same arguments as quotes_historical_v3. Instead of a TokenState and a Quote
+		per point and currency, the response is parsed straight into NumPy arrays: an int64
+		timestamp array plus, per convert currency, float64 arrays for price, volume_24h,
+		market_cap and the percent changes. Requires numpy; HistoricalSeries.to_dataframe()
+		additionally requires pandas.
+
+		Example:
+			series = market.quotes_historical_v3_columnar(id='1', interval='5m')
+			print(series.quotes['USD']['price'].mean())
+			df = series.to_dataframe()
+		"""
+		id, ticker = self._resolve_ticker(id, ticker)
+		from .v3.cryptocurrency.quotes.historical_v3 import _quotes_historical_v3_columnar
+		return _quotes_historical_v3_columnar(self, id, ticker, timestamp_start, timestamp_end, interval, convert)
+
+	def quotes_historical_many(self,
+							   ids: List[Union[int, str]],
+							   timestamp_start: Optional[int] = None,
+							   timestamp_end: Optional[int] = None,
+							   interval: str = 'hourly',
+							   convert: List[str] = ['USD'],
+							   batch_size: int = 100,
+							   max_workers: int = 4) -> Dict[int, List[TokenState]]:
+		"""
+		Retrieves v3 historical quotes for many cryptocurrencies at once.
+
+		Ids are packed batch_size at a time into the v3 endpoint's comma separated id
+		parameter and the batches are fetched concurrently on up to max_workers threads,
+		all sharing this Market's rate limit.
+
+		Args:
+			ids (List[Union[int, str]]): CoinMarketCap ids to fetch.
+			timestamp_start (int, optional): Start of the range. Defaults to 24 hours ago.
+			timestamp_end (int, optional): End of the range. Defaults to now.
+			interval (str, optional): Interval between points. Defaults to 'hourly'.
+			convert (List[str], optional): Conversion currencies, more than 3 are fetched in concurrent groups of 3. Defaults to ['USD'].
+			batch_size (int, optional): Maximum ids per API call. Defaults to 100.
+			max_workers (int, optional): Maximum concurrent API calls. Defaults to 4.
+
+		Returns:
+			Dict[int, List[TokenState]]: TokenState lists keyed by id.
+
+		Example:
+			history = market.quotes_historical_many(ids=[1, 1027, 5426], interval='daily')
+			print(history[1027][-1].quote_map['USD'].price)
+		"""
+		from .v3.cryptocurrency.quotes.historical_v3 import _quotes_historical_many
+		return _quotes_historical_many(self, ids, timestamp_start, timestamp_end, interval, convert, batch_size, max_workers)
 
 	def listings_latest(self, sort_by: SortOption = SortOption.MARKET_CAP, 
 					sort_dir: SortDir = SortDir.DESC, 
@@ -227,9 +756,65 @@ class Market(object):
 					limit: int = 100, 
 					convert: List[str] = ['USD'],
 					aux_fields: AuxFields = None, 
-					filters: FilterOptions = None) -> List[TokenState]:
-		
-		return _listings_latest(self, sort_by, sort_dir, start, limit, convert, aux_fields, filters)
+					filters: FilterOptions = None,
+					compact: bool = False) -> List[TokenState]:
+		"""
+		Retrieves the latest market data for a page of cryptocurrencies.
+
+		With compact=True the results are read-only CompactTokenState/CompactQuote objects.
+		They have the same attributes but use slots instead of a per-instance __dict__, which
+		takes far less memory when holding thousands of rows.
+
+		The API takes at most 3 convert currencies per call. Longer convert lists are split into
+		groups of 3 fetched concurrently, and each TokenState's quote_map holds every currency.
+		"""
+		from .v1.cryptocurrency.listings.latest import _listings_latest
+		return _listings_latest(self, sort_by, sort_dir, start, limit, convert, aux_fields, filters, compact)
+
+	def stream_listings_latest(self, sort_by: SortOption = SortOption.MARKET_CAP,
+					sort_dir: SortDir = SortDir.DESC,
+					start: int = 1,
+					limit: int = 100,
+					convert: List[str] = ['USD'],
+					aux_fields: AuxFields = None,
+					filters: FilterOptions = None,
+					compact: bool = False) -> Iterator[TokenState]:
+		"""Same as listings_latest, but yields TokenState objects while the response body is still arriving.
+
+		Each 'data' entry is decoded from the body and handed to TokenStateFactory as soon as it
+		is complete, so peak memory is one entry plus one 64KB read buffer instead of the whole
+		multi-megabyte document and its parsed copy. At most 3 convert currencies, a stream
+		cannot merge the quotes of several calls.
+
+		Example:
+			for token_state in market.stream_listings_latest(limit=5000, convert=['USD', 'BTC', 'EUR']):
+				store(token_state)
+		"""
+		from .v1.cryptocurrency.listings.latest import _stream_listings_latest
+		return _stream_listings_latest(self, sort_by, sort_dir, start, limit, convert, aux_fields, filters, compact)
+
+	def iter_listings_latest(self, sort_by: SortOption = SortOption.MARKET_CAP,
+					sort_dir: SortDir = SortDir.DESC,
+					start: int = 1,
+					page_size: int = 1000,
+					max_items: Optional[int] = None,
+					convert: List[str] = ['USD'],
+					aux_fields: AuxFields = None,
+					filters: FilterOptions = None,
+					prefetch: bool = False,
+					compact: bool = False) -> Iterator[TokenState]:
+		"""Lazily iterates over the latest listings, one page of page_size tokens per API call.
+
+		Takes the same sorting, convert, aux and filter options as listings_latest. Iteration
+		stops at the end of the listing or after max_items tokens. With prefetch=True the next
+		page is requested on a background thread while the current one is being consumed.
+
+		Example:
+			for token_state in market.iter_listings_latest(page_size=5000, prefetch=True):
+				print(token_state.symbol, token_state.quote_map['USD'].price)
+		"""
+		from .v1.cryptocurrency.listings.latest import _iter_listings_latest
+		return _iter_listings_latest(self, sort_by, sort_dir, start, page_size, max_items, convert, aux_fields, filters, prefetch, compact)
 	
 
 	def safe_daily_call_limit(self):
@@ -247,6 +832,7 @@ class Market(object):
 			int: Approximate number of API calls left for the current day, based on daily usage 
 				till the reset date and a monthly limit.
 		"""		
+		from .v1.key.info import _safe_daily_call_limit
 		return _safe_daily_call_limit(self)
 
 	def dex_listings_info(self,
@@ -284,4 +870,40 @@ class Market(object):
 			# Get info for multiple DEXs
 			dex_info = market.dex_listings_info(ids=[11955, 12345])
 		"""
+		from .v4.dex.listings.info import _dex_listings_info
 		return _dex_listings_info(self, ids, aux_fields)
+
+	def dex_listings_info_bulk(self,
+							   ids: List[int],
+							   aux_fields: Optional[List[DexAuxFields]] = None,
+							   batch_size: int = DEX_MAX_BATCH_IDS,
+							   max_workers: int = 4,
+							   ttl: float = DEX_RECORD_TTL) -> Dict[int, DexInfo]:
+		"""
+		Retrieves information about any number of DEXs, keyed by id.
+
+		Each DexInfo is cached on its own (in record_cache) for ttl seconds, and only the ids
+		not cached yet are requested. Those are split into batches short enough for the URL
+		and fetched concurrently on up to max_workers threads.
+
+		Args:
+			ids (List[int]): DEX ids to retrieve, in any number.
+			aux_fields (List[DexAuxFields], optional): Additional fields to include in response.
+			batch_size (int, optional): Maximum ids per API call. Defaults to 100.
+			max_workers (int, optional): Maximum concurrent API calls. Defaults to 4.
+			ttl (float, optional): Seconds each record stays cached. Defaults to 7 days.
+
+		Returns:
+			Dict[int, DexInfo]: DexInfo keyed by id, in the order of ids. Ids the API does not
+				know are left out.
+
+		Raises:
+			ValueError: If no IDs are provided.
+			ServerException: If an API request fails.
+
+		Example:
+			dct_dex_info = market.dex_listings_info_bulk(pair_dex_ids, aux_fields=[DexAuxFields.URLS])
+			print(dct_dex_info[11955].name)
+		"""
+		from .v4.dex.listings.info import _dex_listings_info_bulk
+		return _dex_listings_info_bulk(self, ids, aux_fields, batch_size, max_workers, ttl)
@@ -0,0 +1,251 @@
+import json
+import time
+import threading
+import dataclasses
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from crypto_commons.types.token_state import TokenState
+from crypto_commons.types.quote import Quote
+from coinmarketcap.chunking import _fetch_historical_chunked, DEFAULT_POINTS_PER_CHUNK
+from coinmarketcap.v1.cryptocurrency.listings.common import _validate_interval
+from coinmarketcap.v3.cryptocurrency.quotes.historical_v3 import _quotes_historical_v3_params, _parse_quotes_historical_v3
+
+# Quote fields stored in their own columns, everything else goes to the 'extra' JSON column
+_QUOTE_COLUMNS = ('price', 'volume_24h', 'market_cap', 'percent_change_1h',
+                  'percent_change_24h', 'percent_change_7d', 'percent_change_30d')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS tokens (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    symbol TEXT,
+    is_active INTEGER,
+    is_fiat INTEGER
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER NOT NULL,
+    interval TEXT NOT NULL,
+    convert TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    last_updated INTEGER,
+    price REAL,
+    volume_24h REAL,
+    market_cap REAL,
+    percent_change_1h REAL,
+    percent_change_24h REAL,
+    percent_change_7d REAL,
+    percent_change_30d REAL,
+    extra TEXT,
+    PRIMARY KEY (id, interval, convert, timestamp)
+);
+CREATE TABLE IF NOT EXISTS coverage (
+    id INTEGER NOT NULL,
+    interval TEXT NOT NULL,
+    convert TEXT NOT NULL,
+    range_start INTEGER NOT NULL,
+    range_end INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_key ON coverage (id, interval, convert);
+'''
+
+
+def _merge_ranges(lst_ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merges overlapping or touching [start, end] ranges into a sorted, disjoint list."""
+    lst_merged = []
+    for range_start, range_end in sorted(lst_ranges):
+        if lst_merged and range_start <= lst_merged[-1][1]:
+            lst_merged[-1] = (lst_merged[-1][0], max(lst_merged[-1][1], range_end))
+        else:
+            lst_merged.append((range_start, range_end))
+    return lst_merged
+
+
+def _missing_ranges(lst_covered: List[Tuple[int, int]], timestamp_start: int, timestamp_end: int) -> List[Tuple[int, int]]:
+    """Returns the parts of [timestamp_start, timestamp_end] not covered by the sorted, disjoint lst_covered."""
+    lst_missing = []
+    cursor = timestamp_start
+    for range_start, range_end in lst_covered:
+        if range_end < cursor:
+            continue
+        if range_start > timestamp_end:
+            break
+        if range_start > cursor:
+            lst_missing.append((cursor, range_start))
+        cursor = max(cursor, range_end)
+        if cursor >= timestamp_end:
+            break
+
+    if cursor < timestamp_end:
+        lst_missing.append((cursor, timestamp_end))
+
+    return lst_missing
+
+
+class HistoryStore(object):
+    """
+    Local SQLite store of v3 historical quotes that only downloads what it doesn't hold yet.
+
+    Quotes are keyed by (id, interval, convert, timestamp). Alongside them the store records,
+    per (id, interval, convert), which time ranges have already been fetched, so a later sync
+    over an overlapping range only requests the missing gaps. Ranges are never recorded past
+    the moment they were fetched, so the still-open end of a series is fetched again next time.
+
+    Example:
+        store = HistoryStore('/var/lib/cmc/history.sqlite')
+        token_states = store.sync(market, id=1, timestamp_start=start, timestamp_end=end, interval='5m')
+    """
+
+    def __init__(self, path: str = 'coinmarketcap_history.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        # imported with the first store, so importing the package does not load sqlite3
+        import sqlite3
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def covered_ranges(self, id: int, interval: str, convert: str) -> List[Tuple[int, int]]:
+        """Returns the sorted, disjoint [start, end] ranges already held for one series."""
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT range_start, range_end FROM coverage WHERE id = ? AND interval = ? AND convert = ?',
+                (int(id), interval, convert)).fetchall()
+        return _merge_ranges(rows)
+
+    def missing_ranges(self, id: int, timestamp_start: int, timestamp_end: int,
+                       interval: str = 'hourly', convert: str = 'USD') -> List[Tuple[int, int]]:
+        """Returns the parts of [timestamp_start, timestamp_end] not held yet for one series."""
+        return _missing_ranges(self.covered_ranges(id, interval, convert), timestamp_start, timestamp_end)
+
+    def sync(self,
+             market,
+             id: int,
+             timestamp_start: int,
+             timestamp_end: Optional[int] = None,
+             interval: str = 'hourly',
+             convert: List[str] = ['USD'],
+             points_per_chunk: int = DEFAULT_POINTS_PER_CHUNK,
+             max_workers: int = 4) -> List[TokenState]:
+        """
+        Fetches whatever part of the range is missing from the store, then returns the full range.
+
+        Gaps shared by several convert currencies are fetched in a single call. Each gap is
+        fetched with the chunked v3 historical path, so long gaps are split and run concurrently.
+
+        Parameters:
+            market: The CoinMarketCap API market client instance
+            id (int): CoinMarketCap id of the cryptocurrency
+            timestamp_start (int): Unix timestamp for the start of the range
+            timestamp_end (Optional[int]): Unix timestamp for the end of the range (default: now)
+            interval (str): Time interval between data points. See _validate_interval for supported values.
+            convert (List[str]): List of currencies to convert values to. More than 3 are fetched in concurrent calls of 3 and merged. Default is ['USD'].
+            points_per_chunk (int): Maximum points per API call when filling a gap.
+            max_workers (int): Maximum concurrent API calls when filling a gap.
+
+        Returns:
+            List[TokenState]: The stored points of the range, ordered by timestamp.
+        """
+        fetched_at = int(time.time())
+        if timestamp_end is None:
+            timestamp_end = fetched_at
+
+        _quotes_historical_v3_params(str(id), None, timestamp_start, timestamp_end, interval, convert)
+
+        # gap -> currencies missing it, identical gaps across currencies collapse into one call
+        dct_gaps: Dict[Tuple[int, int], List[str]] = {}
+        for currency in convert:
+            for gap in self.missing_ranges(id, timestamp_start, timestamp_end, interval, currency):
+                dct_gaps.setdefault(gap, []).append(currency)
+
+        for (gap_start, gap_end), lst_currencies in dct_gaps.items():
+            lst_token_states = _fetch_historical_chunked(market, 'v3/cryptocurrency/quotes/historical',
+                                                         _quotes_historical_v3_params, _parse_quotes_historical_v3,
+                                                         str(id), None, gap_start, gap_end, interval, lst_currencies,
+                                                         points_per_chunk, max_workers)
+            self._save(id, interval, lst_currencies, lst_token_states, gap_start, min(gap_end, fetched_at))
+
+        return self.load(id, timestamp_start, timestamp_end, interval, convert)
+
+    def load(self, id: int, timestamp_start: int, timestamp_end: int,
+             interval: str = 'hourly', convert: List[str] = ['USD']) -> List[TokenState]:
+        """Returns the stored points of [timestamp_start, timestamp_end] without touching the network."""
+        _validate_interval(interval)
+
+        with self._lock:
+            token_row = self._connection.execute(
+                'SELECT name, symbol, is_active, is_fiat FROM tokens WHERE id = ?', (int(id),)).fetchone()
+            if token_row is None:
+                return []
+
+            placeholders = ','.join('?' * len(convert))
+            rows = self._connection.execute(
+                f'SELECT timestamp, convert, last_updated, {", ".join(_QUOTE_COLUMNS)}, extra FROM quotes '
+                f'WHERE id = ? AND interval = ? AND timestamp BETWEEN ? AND ? AND convert IN ({placeholders}) '
+                'ORDER BY timestamp',
+                (int(id), interval, timestamp_start, timestamp_end, *convert)).fetchall()
+
+        name, symbol, is_active, is_fiat = token_row
+        dct_states: Dict[int, TokenState] = {}
+        for row in rows:
+            timestamp, currency, last_updated = row[0], row[1], row[2]
+            token_state = dct_states.get(timestamp)
+            if token_state is None:
+                timestamp_dt = datetime.fromtimestamp(timestamp, tz=timezone.utc)
+                token_state = TokenState(id=int(id), name=name, symbol=symbol, last_updated=timestamp_dt,
+                                         timestamp=timestamp, is_active=bool(is_active), quote_map={},
+                                         is_fiat=bool(is_fiat))
+                dct_states[timestamp] = token_state
+
+            dct_quote = dict(zip(_QUOTE_COLUMNS, row[3:3 + len(_QUOTE_COLUMNS)]))
+            dct_quote.update(json.loads(row[-1]) if row[-1] else {})
+            token_state.quote_map[currency] = Quote(base_currency=currency,
+                                                    last_updated=datetime.fromtimestamp(last_updated, tz=timezone.utc),
+                                                    **dct_quote)
+
+        return list(dct_states.values())
+
+    def _save(self, id: int, interval: str, lst_currencies: List[str], lst_token_states: List[TokenState],
+              covered_start: int, covered_end: int):
+        lst_rows = []
+        for token_state in lst_token_states:
+            for currency, quote in token_state.quote_map.items():
+                dct_quote = dataclasses.asdict(quote)
+                dct_quote.pop('base_currency')
+                last_updated = dct_quote.pop('last_updated')
+                dct_columns = {column: dct_quote.pop(column) for column in _QUOTE_COLUMNS}
+                lst_rows.append((int(id), interval, currency, token_state.timestamp,
+                                 int(last_updated.timestamp()) if isinstance(last_updated, datetime) else last_updated,
+                                 *dct_columns.values(), json.dumps(dct_quote)))
+
+        with self._lock, self._connection:
+            if lst_token_states:
+                token_state = lst_token_states[0]
+                self._connection.execute('INSERT OR REPLACE INTO tokens VALUES (?, ?, ?, ?, ?)',
+                                         (int(id), token_state.name, token_state.symbol,
+                                          int(bool(token_state.is_active)), int(bool(token_state.is_fiat))))
+
+            self._connection.executemany(
+                f'INSERT OR REPLACE INTO quotes VALUES ({",".join("?" * (5 + len(_QUOTE_COLUMNS) + 1))})', lst_rows)
+
+            if covered_end >= covered_start:
+                for currency in lst_currencies:
+                    lst_covered = self._connection.execute(
+                        'SELECT range_start, range_end FROM coverage WHERE id = ? AND interval = ? AND convert = ?',
+                        (int(id), interval, currency)).fetchall()
+                    lst_merged = _merge_ranges(lst_covered + [(covered_start, covered_end)])
+                    self._connection.execute('DELETE FROM coverage WHERE id = ? AND interval = ? AND convert = ?',
+                                             (int(id), interval, currency))
+                    self._connection.executemany('INSERT INTO coverage VALUES (?, ?, ?, ?, ?)',
+                                                 [(int(id), interval, currency, range_start, range_end)
+                                                  for range_start, range_end in lst_merged])
@@ -0,0 +1,290 @@
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# upper bounds of the latency histogram buckets, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """
+    One request as seen by Market, handed to Hooks.on_response.
+
+    The phases are in seconds: connect from sending the request until the response headers
+    arrived (connection, TLS and server time), transfer until the body was read, decode the
+    JSON decoding. A phase that was not measured, e.g. the body of a streamed response, is None.
+    """
+    endpoint: str
+    status_code: int
+    from_cache: bool
+    shared: bool
+    connect: float
+    transfer: Optional[float]
+    decode: Optional[float]
+    bytes: Optional[int]
+    credits: Optional[int]
+
+
+class Hooks(object):
+    """
+    Receives instrumentation events from Market and AsyncMarket. Subclass it and override the
+    events you need, every method is a no-op here. Hooks are called on the requesting thread
+    (or event loop) and should return quickly, an exception they raise is logged and ignored.
+    """
+
+    def on_request(self, endpoint: str, url: str, params: Dict):
+        """Before the request is sent."""
+
+    def on_retry(self, endpoint: str, attempt: int, delay: float, reason: Optional[str]):
+        """Before waiting delay seconds to send attempt (1 for the first retry) again."""
+
+    def on_response(self, event: RequestEvent, response_json: Optional[Dict]):
+        """After the response was received and decoded. response_json is None for errors and streams."""
+
+    def on_parse(self, endpoint: str, seconds: float, rows: Optional[int]):
+        """After a response was turned into result objects by the endpoint's parser."""
+
+
+class DebugHooks(Hooks):
+    """Prints every request and response, what Market(debug_mode=True) installs."""
+
+    def on_request(self, endpoint, url, params):
+        print('Request URL: ' + url)
+        if params:
+            print("Request Payload:\n" + json.dumps(params, indent=4))
+
+    def on_retry(self, endpoint, attempt, delay, reason):
+        print(f'Retrying {endpoint} in {delay:.2f}s (attempt {attempt}, {reason})')
+
+    def on_response(self, event, response_json):
+        print('Response Code: ' + str(event.status_code))
+        print('From Cache?: ' + str(event.from_cache))
+        if event.shared:
+            print('Shared with a concurrent identical request')
+        if response_json is not None:
+            print("Response Payload:\n" + json.dumps(response_json, indent=4))
+
+
+class _Histogram(object):
+    __slots__ = ('counts', 'sum', 'count')
+
+    def __init__(self, num_buckets: int):
+        # one count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (num_buckets + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsCollector(Hooks):
+    """
+    Aggregates the events into per-endpoint metrics: latency histograms for the connect,
+    transfer, decode and parse phases, request counts by status, cache hits and misses, bytes
+    received, credits charged and retries.
+
+    to_prometheus() renders them in the Prometheus text exposition format, which the
+    OpenTelemetry collector's prometheus receiver reads too, and serve() exposes that on a
+    /metrics HTTP endpoint.
+
+    Example:
+        metrics = MetricsCollector()
+        market = Market(api_key=key, hooks=[metrics])
+        ...
+        print(metrics.cache_hit_ratio('v1/cryptocurrency/listings/latest'))
+        metrics.serve(port=9464)
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, namespace: str = 'coinmarketcap'):
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str], _Histogram] = {}
+        self._requests: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._cache_hits: Dict[str, int] = defaultdict(int)
+        self._cache_misses: Dict[str, int] = defaultdict(int)
+        self._bytes: Dict[str, int] = defaultdict(int)
+        self._credits: Dict[str, int] = defaultdict(int)
+        self._retries: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._rows: Dict[str, int] = defaultdict(int)
+
+    # --- hooks ----------------------------------------------------------------------------
+
+    def on_retry(self, endpoint, attempt, delay, reason):
+        with self._lock:
+            self._retries[endpoint, reason or 'unknown'] += 1
+
+    def on_response(self, event, response_json):
+        with self._lock:
+            self._requests[event.endpoint, event.status_code] += 1
+            if event.from_cache:
+                self._cache_hits[event.endpoint] += 1
+            else:
+                self._cache_misses[event.endpoint] += 1
+            if event.bytes:
+                self._bytes[event.endpoint] += event.bytes
+            if event.credits:
+                self._credits[event.endpoint] += event.credits
+            for phase in ('connect', 'transfer', 'decode'):
+                seconds = getattr(event, phase)
+                if seconds is not None:
+                    self._observe(event.endpoint, phase, seconds)
+
+    def on_parse(self, endpoint, seconds, rows):
+        with self._lock:
+            self._observe(endpoint, 'parse', seconds)
+            if rows:
+                self._rows[endpoint] += rows
+
+    def _observe(self, endpoint: str, phase: str, seconds: float):
+        histogram = self._histograms.get((endpoint, phase))
+        if histogram is None:
+            histogram = self._histograms[endpoint, phase] = _Histogram(len(self.buckets))
+        histogram.counts[bisect_left(self.buckets, seconds)] += 1
+        histogram.sum += seconds
+        histogram.count += 1
+
+    # --- reading --------------------------------------------------------------------------
+
+    def cache_hit_ratio(self, endpoint: Optional[str] = None) -> Optional[float]:
+        """Share of responses served from the response cache, None before the first response."""
+        with self._lock:
+            if endpoint is None:
+                hits, misses = sum(self._cache_hits.values()), sum(self._cache_misses.values())
+            else:
+                hits, misses = self._cache_hits.get(endpoint, 0), self._cache_misses.get(endpoint, 0)
+        return hits / (hits + misses) if hits + misses else None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint totals: requests, cache_hits, bytes, credits, retries, rows and {phase: (count, sum)}."""
+        with self._lock:
+            dct_endpoints: Dict[str, Dict[str, Any]] = defaultdict(lambda: {
+                'requests': 0, 'cache_hits': 0, 'bytes': 0, 'credits': 0, 'retries': 0, 'rows': 0, 'phases': {}})
+            for (endpoint, _), count in self._requests.items():
+                dct_endpoints[endpoint]['requests'] += count
+            for name, counter in (('cache_hits', self._cache_hits), ('bytes', self._bytes),
+                                  ('credits', self._credits), ('rows', self._rows)):
+                for endpoint, value in counter.items():
+                    dct_endpoints[endpoint][name] += value
+            for (endpoint, _), count in self._retries.items():
+                dct_endpoints[endpoint]['retries'] += count
+            for (endpoint, phase), histogram in self._histograms.items():
+                dct_endpoints[endpoint]['phases'][phase] = (histogram.count, histogram.sum)
+            return dict(dct_endpoints)
+
+    def to_prometheus(self) -> str:
+        """The metrics in the Prometheus text exposition format (version 0.0.4)."""
+        ns = self.namespace
+        lst_lines: List[str] = []
+
+        def counter(name: str, help: str, items: Iterable[Tuple[Dict[str, Any], float]]):
+            lst_lines.append(f'# HELP {ns}_{name} {help}')
+            lst_lines.append(f'# TYPE {ns}_{name} counter')
+            for labels, value in items:
+                lst_lines.append(f'{ns}_{name}{_labels(labels)} {_number(value)}')
+
+        with self._lock:
+            counter('requests_total', 'Responses received, by endpoint and HTTP status.',
+                    (({'endpoint': endpoint, 'status': status}, count) for (endpoint, status), count in sorted(self._requests.items())))
+            counter('cache_hits_total', 'Responses served from the response cache.',
+                    (({'endpoint': endpoint}, count) for endpoint, count in sorted(self._cache_hits.items())))
+            counter('cache_misses_total', 'Responses fetched from the API.',
+                    (({'endpoint': endpoint}, count) for endpoint, count in sorted(self._cache_misses.items())))
+            counter('response_bytes_total', 'Response body bytes received.',
+                    (({'endpoint': endpoint}, count) for endpoint, count in sorted(self._bytes.items())))
+            counter('credits_total', 'API credits charged.',
+                    (({'endpoint': endpoint}, count) for endpoint, count in sorted(self._credits.items())))
+            counter('retries_total', 'Requests sent again, by endpoint and reason.',
+                    (({'endpoint': endpoint, 'reason': reason}, count) for (endpoint, reason), count in sorted(self._retries.items())))
+            counter('parsed_rows_total', 'Result objects built from responses.',
+                    (({'endpoint': endpoint}, count) for endpoint, count in sorted(self._rows.items())))
+
+            name = f'{ns}_request_phase_seconds'
+            lst_lines.append(f'# HELP {name} Time spent per request phase (connect, transfer, decode, parse).')
+            lst_lines.append(f'# TYPE {name} histogram')
+            for (endpoint, phase), histogram in sorted(self._histograms.items()):
+                labels = {'endpoint': endpoint, 'phase': phase}
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    lst_lines.append(f'{name}_bucket{_labels(dict(labels, le=_number(bound)))} {cumulative}')
+                lst_lines.append(f'{name}_sum{_labels(labels)} {_number(histogram.sum)}')
+                lst_lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+        return '\n'.join(lst_lines) + '\n'
+
+    def serve(self, port: int = 9464, addr: str = '') -> 'ThreadingHTTPServer':
+        """
+        Serves to_prometheus() on http://addr:port/metrics from a daemon thread. Returns the
+        server, call its shutdown() to stop it.
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        collector = self
+
+        class _MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = collector.to_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((addr, port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='coinmarketcap-metrics', daemon=True).start()
+        return server
+
+
+def _labels(labels: Dict[str, Any]) -> str:
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in labels.values())
+    return '{' + ','.join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + '}'
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _request_event(endpoint: str, response_object, shared: bool, started: float, received: Optional[float],
+                   decode: Optional[float], credits) -> RequestEvent:
+    # received is None while the body has not been read, for streamed responses
+    from_cache = bool(getattr(response_object, 'from_cache', False))
+    elapsed = getattr(response_object, 'elapsed', None)
+    if from_cache:
+        # a cached response keeps the elapsed of the request that stored it, reading it is all transfer
+        connect = 0.0
+    else:
+        connect = elapsed.total_seconds() if elapsed is not None else (received or time.perf_counter()) - started
+    transfer = size = None
+    if received is not None:
+        transfer = max(received - started - connect, 0.0)
+        content = getattr(response_object, 'content', None)
+        size = len(content) if content is not None else None
+    return RequestEvent(endpoint=endpoint,
+                        status_code=response_object.status_code,
+                        from_cache=from_cache,
+                        shared=shared,
+                        connect=connect,
+                        transfer=transfer,
+                        decode=decode,
+                        bytes=size,
+                        credits=credits if isinstance(credits, int) else None)
+
+
+def _call_hooks(hooks: Tuple[Hooks, ...], method: str, *args):
+    for hook in hooks:
+        try:
+            getattr(hook, method)(*args)
+        except Exception:
+            logging.exception('Instrumentation hook %r failed in %s', hook, method)
@@ -0,0 +1,213 @@
+import time
+import threading
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from crypto_commons.types.quote import Quote
+from crypto_commons.types.token_state import TokenState
+from coinmarketcap.v1.cryptocurrency.listings.common import SortOption, SortDir, AuxFields, FilterOptions
+from coinmarketcap.v1.cryptocurrency.listings.latest import _listings_latest
+
+_NUMERIC_TYPES = (int, float, Optional[int], Optional[float])
+
+# timestamps move with every refresh, a threshold on them would report every asset on every poll
+_TIMESTAMP_FIELDS = frozenset({'timestamp', 'last_updated', 'creation_date'})
+
+
+def _numeric_fields(cls) -> frozenset:
+    return frozenset(f.name for f in dataclasses.fields(cls)
+                     if f.type in _NUMERIC_TYPES and f.name not in _TIMESTAMP_FIELDS)
+
+
+# only numeric fields can take a threshold, names, tags, platforms and flags have no magnitude
+_QUOTE_FIELDS = _numeric_fields(Quote)
+_TOKEN_STATE_FIELDS = _numeric_fields(TokenState) - {'id'}
+
+
+@dataclass(frozen=True)
+class Threshold:
+    """
+    Minimum change of a field worth reporting: relative (a fraction of the last reported value,
+    0.01 = 1%) or absolute. When both are set, a change exceeding either is reported. A field
+    going to or from None is always reported.
+    """
+    relative: Optional[float] = None
+    absolute: Optional[float] = None
+
+    def exceeded(self, old, new) -> bool:
+        if old is None or new is None:
+            return old is not new
+        delta = abs(new - old)
+        if self.absolute is not None and delta >= self.absolute:
+            return True
+        if self.relative is not None:
+            return delta > 0 if old == 0 else delta / abs(old) >= self.relative
+        return False
+
+
+# price moves of 0.5% or more and any rank change
+DEFAULT_THRESHOLDS: Dict[str, Threshold] = {
+    'price': Threshold(relative=0.005),
+    'cmc_rank': Threshold(absolute=1),
+}
+
+
+@dataclass(frozen=True)
+class FieldChange:
+    """One tracked field of one asset that moved past its threshold. convert is set for quote fields."""
+    id: int
+    symbol: str
+    field: str
+    old: Any
+    new: Any
+    convert: Optional[str] = None
+
+
+@dataclass
+class ListingsDelta:
+    """
+    What changed between two listings snapshots.
+
+    added holds the full TokenState of assets seen for the first time, removed the last known
+    TokenState of assets missing from the new snapshot (delisted, or out of the requested
+    window), and changes one FieldChange per tracked field that moved past its threshold.
+    """
+    timestamp: int
+    added: List[TokenState] = field(default_factory=list)
+    removed: List[TokenState] = field(default_factory=list)
+    changes: List[FieldChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changes)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed) + len(self.changes)
+
+
+class ListingsTracker(object):
+    """
+    Turns repeated listings_latest snapshots into compact deltas.
+
+    The tracker keeps the latest snapshot keyed by id, together with the last reported value
+    of every tracked field. Each poll (or update with a snapshot fetched elsewhere) returns a
+    ListingsDelta of the new and removed assets and the fields that moved past their threshold.
+    Thresholds are measured against the value last reported, not the previous poll, so a slow
+    drift is reported once it adds up.
+
+    thresholds maps numeric field names to a Threshold, or to a number meaning a relative threshold.
+    Quote fields ('price', 'volume_24h', 'market_cap', ...) are tracked per convert currency,
+    other TokenState fields ('cmc_rank', 'circulating_supply', ...) per asset.
+
+    The first snapshot reports every asset as added.
+
+    Example:
+        tracker = ListingsTracker(market, limit=5000, thresholds={'price': 0.01, 'cmc_rank': Threshold(absolute=5)})
+        while True:
+            delta = tracker.poll()
+            for change in delta.changes:
+                print(change.symbol, change.field, change.old, '->', change.new)
+            time.sleep(60)
+    """
+
+    def __init__(self,
+                 market=None,
+                 thresholds: Optional[Dict[str, Union[Threshold, float]]] = None,
+                 sort_by: SortOption = SortOption.MARKET_CAP,
+                 sort_dir: SortDir = SortDir.DESC,
+                 start: int = 1,
+                 limit: int = 5000,
+                 convert: List[str] = ['USD'],
+                 aux_fields: AuxFields = None,
+                 filters: FilterOptions = None,
+                 compact: bool = False):
+        thresholds = DEFAULT_THRESHOLDS if thresholds is None else thresholds
+        for name in thresholds:
+            if name not in _QUOTE_FIELDS and name not in _TOKEN_STATE_FIELDS:
+                raise ValueError(f"Unknown field '{name}', expected a numeric Quote or TokenState field")
+
+        self.market = market
+        self.thresholds: Dict[str, Threshold] = {
+            name: threshold if isinstance(threshold, Threshold) else Threshold(relative=threshold)
+            for name, threshold in thresholds.items()}
+        self._listings_args = (sort_by, sort_dir, start, limit, convert, aux_fields, filters, compact)
+
+        self._quote_thresholds = [(name, threshold) for name, threshold in self.thresholds.items() if name in _QUOTE_FIELDS]
+        self._token_thresholds = [(name, threshold) for name, threshold in self.thresholds.items() if name not in _QUOTE_FIELDS]
+
+        self._lock = threading.Lock()
+        self._snapshot: Dict[int, TokenState] = {}
+        # id -> (field, convert) -> value last reported
+        self._reported: Dict[int, Dict[Tuple[str, Optional[str]], Any]] = {}
+
+    @property
+    def snapshot(self) -> Dict[int, TokenState]:
+        """The latest TokenState of every tracked asset, by id."""
+        return dict(self._snapshot)
+
+    def poll(self) -> ListingsDelta:
+        """Fetches a fresh listings_latest snapshot and returns what changed since the last one."""
+        if self.market is None:
+            raise ValueError('poll needs a market, pass one to the constructor or call update with a snapshot')
+        return self.update(_listings_latest(self.market, *self._listings_args))
+
+    def update(self, token_states: Iterable[TokenState], timestamp: Optional[int] = None) -> ListingsDelta:
+        """Replaces the snapshot with token_states and returns what changed."""
+        with self._lock:
+            lst_token_states = list(token_states)
+            if timestamp is None:
+                timestamp = lst_token_states[0].timestamp if lst_token_states else int(time.time())
+            delta = ListingsDelta(timestamp=timestamp)
+
+            dct_snapshot = {}
+            for token_state in lst_token_states:
+                dct_snapshot[token_state.id] = token_state
+                dct_reported = self._reported.get(token_state.id)
+                if dct_reported is None:
+                    delta.added.append(token_state)
+                    self._reported[token_state.id] = self._tracked_values(token_state)
+                else:
+                    self._compare(token_state, dct_reported, delta.changes)
+
+            for id, token_state in self._snapshot.items():
+                if id not in dct_snapshot:
+                    delta.removed.append(token_state)
+                    del self._reported[id]
+
+            self._snapshot = dct_snapshot
+            return delta
+
+    def reset(self):
+        """Forgets the snapshot, the next update reports every asset as added again."""
+        with self._lock:
+            self._snapshot = {}
+            self._reported = {}
+
+    def _tracked_values(self, token_state: TokenState) -> Dict[Tuple[str, Optional[str]], Any]:
+        dct_values = {(name, None): getattr(token_state, name) for name, _ in self._token_thresholds}
+        for currency, quote in token_state.quote_map.items():
+            for name, _ in self._quote_thresholds:
+                dct_values[(name, currency)] = getattr(quote, name)
+        return dct_values
+
+    def _compare(self, token_state: TokenState, dct_reported: Dict, lst_changes: List[FieldChange]):
+        for name, threshold in self._token_thresholds:
+            self._check(token_state, dct_reported, name, None, getattr(token_state, name), threshold, lst_changes)
+
+        for currency, quote in token_state.quote_map.items():
+            for name, threshold in self._quote_thresholds:
+                self._check(token_state, dct_reported, name, currency, getattr(quote, name), threshold, lst_changes)
+
+    @staticmethod
+    def _check(token_state: TokenState, dct_reported: Dict, name: str, currency: Optional[str], new, threshold: Threshold,
+               lst_changes: List[FieldChange]):
+        key = (name, currency)
+        if key not in dct_reported:
+            # a convert currency that was not in the previous snapshot
+            dct_reported[key] = new
+            return
+
+        old = dct_reported[key]
+        if threshold.exceeded(old, new):
+            lst_changes.append(FieldChange(token_state.id, token_state.symbol, name, old, new, currency))
+            dct_reported[key] = new
@@ -0,0 +1,111 @@
+import time
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+from coinmarketcap.cache_policy import IMMUTABLE, NO_CACHE
+
+_MISSING = object()
+
+
+class ParsedObjectCache(object):
+    """
+    Memory-bounded LRU of parsed results (TokenState, TokenInfo, ... lists) with per-entry TTL.
+
+    Entries are kept pickled: the pickle size is what counts against max_bytes, and every
+    hit unpickles a private copy, so callers may modify what they get back without
+    corrupting the cache or each other. Unpickling is several times cheaper than decoding
+    the JSON body and running the factories again.
+
+    One instance may be shared by several Market instances and threads.
+
+    Parameters:
+        max_bytes (int): Total pickled size kept, least recently used entries are evicted first.
+        clock (Callable[[], float]): Monotonic clock, injectable for tests.
+
+    Example:
+        market = Market(api_key=key, object_cache=ParsedObjectCache(max_bytes=256 * 2**20))
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20, clock: Callable[[], float] = time.monotonic):
+        if max_bytes < 1:
+            raise ValueError('max_bytes must be at least 1')
+
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (pickled value, expires at or None)
+        self._entries: 'OrderedDict[Hashable, Tuple[bytes, Optional[float]]]' = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Returns a fresh copy of the value stored under key, or default if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] is not None and entry[1] <= self._clock():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            blob = entry[0]
+
+        return pickle.loads(blob)
+
+    def set(self, key: Hashable, value: Any, ttl=IMMUTABLE):
+        """
+        Stores value under key for ttl seconds (IMMUTABLE keeps it until evicted, NO_CACHE or 0
+        skips storing). Values larger than max_bytes are not stored.
+        """
+        if ttl == NO_CACHE:
+            return
+
+        if hasattr(ttl, 'total_seconds'):
+            ttl = ttl.total_seconds()
+
+        # an entry expiring on arrival would only evict live ones
+        if ttl != IMMUTABLE and ttl <= 0:
+            return
+
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            expires = None if ttl == IMMUTABLE else self._clock() + ttl
+            self._entries[key] = (blob, expires)
+            self.current_bytes += len(blob)
+
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def get_or_create(self, key: Hashable, create: Callable[[], Any], ttl=IMMUTABLE) -> Any:
+        """Returns the cached value of key, or calls create, stores its result and returns it."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        value = create()
+        self.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def _remove(self, key: Hashable):
+        blob, _ = self._entries.pop(key)
+        self.current_bytes -= len(blob)
@@ -0,0 +1,85 @@
+from typing import Callable, Iterator, List, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+
+from coinmarketcap.scheduler import _with_current_context
+
+T = TypeVar('T')
+
+# Largest 'limit' accepted by the paginated v1 endpoints (map, listings/latest)
+MAX_PAGE_SIZE = 5000
+
+
+def _iter_pages(fetch_page: Callable[[int, int], List[T]],
+                start: int = 1,
+                page_size: int = 1000,
+                max_items: Optional[int] = None,
+                prefetch: bool = False) -> Iterator[T]:
+    """
+    Lazily walks a start/limit paginated endpoint and yields its items one by one.
+
+    Iteration stops when a page comes back shorter than requested (the end of the
+    listing) or once max_items items have been yielded.
+
+    Parameters:
+        fetch_page (Callable[[int, int], List[T]]): Called as fetch_page(start, limit), returns one page of items.
+        start (int): 1-based offset of the first item to fetch. Default is 1.
+        page_size (int): Number of items requested per call (1 to MAX_PAGE_SIZE). Default is 1000.
+        max_items (Optional[int]): Stop after this many items. None (default) walks to the end.
+        prefetch (bool): When True, the next page is fetched on a background thread while the
+                         caller consumes the current one. Default is False.
+
+    Raises:
+        ValueError: If page_size is outside 1..MAX_PAGE_SIZE or start is lower than 1.
+    """
+    if page_size < 1 or page_size > MAX_PAGE_SIZE:
+        raise ValueError(f'page_size must be between 1 and {MAX_PAGE_SIZE}')
+
+    if start < 1:
+        raise ValueError('start must be 1 or greater')
+
+    # validation above runs eagerly, paging only starts on the first next()
+    return _page_items(fetch_page, start, page_size, max_items, prefetch)
+
+
+def _page_items(fetch_page: Callable[[int, int], List[T]],
+                start: int,
+                page_size: int,
+                max_items: Optional[int],
+                prefetch: bool) -> Iterator[T]:
+
+    def page_limit(offset: int) -> int:
+        if max_items is None:
+            return page_size
+        return min(page_size, max_items - (offset - start))
+
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    pending = None
+
+    try:
+        offset = start
+        limit = page_limit(offset)
+        page = fetch_page(offset, limit) if limit > 0 else []
+
+        while page:
+            next_offset = offset + limit
+            next_limit = page_limit(next_offset)
+            has_more = len(page) >= limit and next_limit > 0
+
+            if has_more and executor:
+                pending = executor.submit(_with_current_context(fetch_page), next_offset, next_limit)
+
+            for item in page:
+                yield item
+
+            if not has_more:
+                break
+
+            page = pending.result() if pending else fetch_page(next_offset, next_limit)
+            pending = None
+            offset, limit = next_offset, next_limit
+    finally:
+        # the consumer may abandon the generator early, don't leave a fetch running for nothing
+        if pending:
+            pending.cancel()
+        if executor:
+            executor.shutdown(wait=False)
@@ -0,0 +1,338 @@
+import time
+import pickle
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from coinmarketcap.scheduler import _estimate_credits
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
+from coinmarketcap.v1.key.info import _key_info
+from coinmarketcap.v1.cryptocurrency.listings.common import SortOption, SortDir, AuxFields, FilterOptions
+from coinmarketcap.v1.cryptocurrency.listings.latest import _listings_latest, _listings_latest_params
+from coinmarketcap.v3.fear_and_greed.historical import _fear_and_greed_historical
+
+
+def _default_digest(result: Any) -> Hashable:
+    return hashlib.sha256(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)).digest()
+
+
+def _listings_digest(lst_token_states) -> Hashable:
+    # TokenState.timestamp is the parse time, unchanged data is recognised by CoinMarketCap's own last_updated
+    return tuple((token_state.id, token_state.cmc_rank, token_state.last_updated,
+                  tuple((currency, quote.price, quote.last_updated) for currency, quote in token_state.quote_map.items()))
+                 for token_state in lst_token_states)
+
+
+class _PollJob(object):
+    def __init__(self, name: str, fetch: Callable[[], Any], interval: float, credits: int,
+                 max_interval: Optional[float], digest: Optional[Callable[[Any], Hashable]]):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.credits = credits
+        self.max_interval = max_interval
+        self.digest = digest
+        self.current_interval = interval
+        self.next_run = 0.0
+        self.last_digest = None
+        self.runs = 0
+        self.published = 0
+
+
+class Poller(object):
+    """
+    Refreshes endpoints on independent intervals and publishes new results to subscribers.
+
+    Each job is a fetch function with its own interval. Results that did not change since the
+    previous run (by digest) are dropped, the rest go to every subscriber of the job: plain
+    callbacks, called on the polling thread, or asyncio queues, fed thread-safely on the loop
+    they belong to.
+
+    Intervals adapt to the credit budget: every key_info_interval seconds the remaining credits
+    and reset date are read from v1/key/info (or from the market's CreditScheduler, when it
+    has one) and, when the jobs together would spend credits faster than budget_fraction of
+    that pace allows, every interval is stretched by the same factor (never past a job's
+    max_interval). With budget to spare, jobs run at their configured interval.
+
+    Run it on its own thread with start()/stop() (or as a context manager), or call
+    run_pending() from an existing loop.
+
+    Example:
+        poller = Poller(market)
+        poller.add_listings_latest(interval=60, limit=5000)
+        poller.add_fear_and_greed(interval=3600)
+        poller.subscribe('listings_latest', lambda name, token_states: print(len(token_states)))
+        with poller:
+            ...
+    """
+
+    def __init__(self,
+                 market,
+                 budget_fraction: float = 1.0,
+                 key_info_interval: float = 60*60,
+                 clock: Callable[[], float] = time.monotonic):
+        if not 0 < budget_fraction <= 1:
+            raise ValueError('budget_fraction must be in (0, 1]')
+
+        self.market = market
+        self.budget_fraction = budget_fraction
+        self.key_info_interval = key_info_interval
+        self._clock = clock
+
+        self._lock = threading.RLock()
+        self._jobs: Dict[str, _PollJob] = {}
+        self._subscribers: Dict[str, List[Callable[[str, Any], None]]] = {}
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # credits per second the budget allows, None until known
+        self.credits_per_second: Optional[float] = None
+        self._budget_checked_at: Optional[float] = None
+
+    # --- jobs -----------------------------------------------------------------------------
+
+    def add(self,
+            name: str,
+            fetch: Callable[[], Any],
+            interval: float,
+            credits: int = 1,
+            max_interval: Optional[float] = None,
+            digest: Optional[Callable[[Any], Hashable]] = _default_digest) -> str:
+        """
+        Registers a job calling fetch every interval seconds.
+
+        Parameters:
+            name (str): Name subscribers use to refer to the job.
+            fetch (Callable[[], Any]): Performs the request(s) and returns the result to publish.
+            interval (float): Seconds between two runs when the budget allows it.
+            credits (int): Credits one run costs, used to adapt the interval to the budget.
+            max_interval (Optional[float]): Longest interval the budget may stretch the job to.
+            digest (Optional[Callable]): Maps a result to a hashable digest, results with the same
+                digest as the previous run are not published. None publishes every result.
+
+        Returns:
+            str: name
+        """
+        if interval <= 0:
+            raise ValueError('interval must be positive')
+
+        with self._lock:
+            if name in self._jobs:
+                raise ValueError(f"A job named '{name}' already exists")
+            self._jobs[name] = _PollJob(name, fetch, interval, credits, max_interval, digest)
+            self._rescale()
+        self._wakeup.set()
+        return name
+
+    def add_listings_latest(self,
+                            interval: float = 60,
+                            name: str = 'listings_latest',
+                            sort_by: SortOption = SortOption.MARKET_CAP,
+                            sort_dir: SortDir = SortDir.DESC,
+                            start: int = 1,
+                            limit: int = 100,
+                            convert: List[str] = ['USD'],
+                            aux_fields: AuxFields = None,
+                            filters: FilterOptions = None,
+                            compact: bool = False,
+                            max_interval: Optional[float] = None) -> str:
+        """Polls listings_latest. A result is new when any asset's rank, price or last_updated changed."""
+        params = _listings_latest_params(sort_by, sort_dir, start, limit, convert, aux_fields, filters)
+        return self.add(name,
+                        lambda: _listings_latest(self.market, sort_by, sort_dir, start, limit, convert,
+                                                 aux_fields, filters, compact),
+                        interval, _estimate_credits('v1/cryptocurrency/listings/latest', params),
+                        max_interval, _listings_digest)
+
+    def add_fear_and_greed(self,
+                           interval: float = 60*60,
+                           name: str = 'fear_and_greed',
+                           start: int = 1,
+                           limit: int = 1,
+                           max_interval: Optional[float] = None) -> str:
+        """Polls fear_and_greed_historical, by default just the latest value."""
+        return self.add(name, lambda: _fear_and_greed_historical(self.market, start, limit), interval, 1, max_interval)
+
+    def remove(self, name: str):
+        with self._lock:
+            del self._jobs[name]
+            self._rescale()
+
+    def interval(self, name: str) -> float:
+        """The interval the job currently runs at, after adapting to the budget."""
+        with self._lock:
+            return self._jobs[name].current_interval
+
+    # --- subscribers ----------------------------------------------------------------------
+
+    def subscribe(self, name: str, callback: Optional[Callable[[str, Any], None]] = None,
+                  queue=None, loop=None) -> Callable[[], None]:
+        """
+        Registers a subscriber for the job name: a callback(name, result), or an asyncio.Queue
+        receiving (name, result) tuples. A queue is fed on loop, which defaults to the running
+        loop, so call subscribe from a coroutine or pass the loop.
+
+        Returns:
+            Callable[[], None]: Unsubscribes when called.
+        """
+        if (callback is None) == (queue is None):
+            raise ValueError('Pass either a callback or a queue')
+
+        if queue is not None:
+            if loop is None:
+                import asyncio
+                loop = asyncio.get_running_loop()
+
+            def callback(name, result, queue=queue, loop=loop):
+                loop.call_soon_threadsafe(queue.put_nowait, (name, result))
+
+        with self._lock:
+            self._subscribers.setdefault(name, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                if callback in self._subscribers.get(name, []):
+                    self._subscribers[name].remove(callback)
+
+        return unsubscribe
+
+    # --- running --------------------------------------------------------------------------
+
+    def run_pending(self) -> float:
+        """
+        Runs every job that is due, publishes the results that changed, and returns the
+        seconds until the next job is due.
+        """
+        self._check_budget()
+
+        with self._lock:
+            now = self._clock()
+            lst_due = [job for job in self._jobs.values() if job.next_run <= now]
+            for job in lst_due:
+                job.next_run = now + job.current_interval
+
+        for job in lst_due:
+            self._run(job)
+
+        with self._lock:
+            if not self._jobs:
+                return self.key_info_interval
+            return max(min(job.next_run for job in self._jobs.values()) - self._clock(), 0.0)
+
+    def start(self):
+        """Starts polling on a daemon thread."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._loop, name='coinmarketcap-poller', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        """Stops the polling thread, after the job currently running (if any) completes."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        thread.join(timeout)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            wait = self.run_pending()
+            self._wakeup.wait(wait)
+            self._wakeup.clear()
+
+    def _run(self, job: _PollJob):
+        try:
+            result = job.fetch()
+        except Exception:
+            logging.exception("Poll job '%s' failed, retrying in %.0fs", job.name, job.current_interval)
+            return
+
+        job.runs += 1
+        if job.digest is not None:
+            digest = job.digest(result)
+            if digest == job.last_digest:
+                return
+            job.last_digest = digest
+
+        job.published += 1
+        with self._lock:
+            lst_callbacks = list(self._subscribers.get(job.name, []))
+        for callback in lst_callbacks:
+            try:
+                callback(job.name, result)
+            except Exception:
+                logging.exception("Subscriber of poll job '%s' failed", job.name)
+
+    # --- budget ---------------------------------------------------------------------------
+
+    def _check_budget(self):
+        now = self._clock()
+        if self._budget_checked_at is not None and now - self._budget_checked_at < self.key_info_interval:
+            return
+        self._budget_checked_at = now
+
+        try:
+            credits_per_second = self._read_budget()
+        except Exception:
+            logging.exception('Could not read the credit budget from v1/key/info')
+            return
+
+        with self._lock:
+            self.credits_per_second = credits_per_second
+            self._rescale()
+
+    def _read_budget(self) -> float:
+        scheduler = getattr(self.market, 'credit_scheduler', None)
+        if scheduler is not None:
+            if scheduler.needs_refresh():
+                scheduler.refresh(lambda: _key_info(self.market))
+            return scheduler.credits_per_second
+
+        dct_key_info = _key_info(self.market)
+        quota_reset = parse_cmc_datetime(dct_key_info['plan']['credit_limit_monthly_reset_timestamp'])
+        credits_left = int(dct_key_info['usage']['current_month']['credits_left'])
+        seconds_left = max((quota_reset - datetime.now(timezone.utc)).total_seconds(), 1.0)
+        return credits_left / seconds_left
+
+    def _rescale(self):
+        # stretch every interval by the factor bringing the combined pace within the budget. A
+        # job hitting its max_interval keeps spending at that pace, the others share what is left
+        dct_intervals = {name: job.interval for name, job in self._jobs.items()}
+        if self.credits_per_second is not None:
+            allowed = self.credits_per_second * self.budget_fraction
+            lst_free = list(self._jobs.values())
+            while lst_free:
+                demand = sum(job.credits / job.interval for job in lst_free)
+                capped = sum(job.credits / dct_intervals[name] for name, job in self._jobs.items() if job not in lst_free)
+                # with nothing left to spend, jobs wait for a budget check to find credits again
+                scale = max(1.0, demand / max(allowed - capped, 1e-9)) if demand > 0 else 1.0
+                lst_capped = [job for job in lst_free
+                              if job.max_interval is not None and job.interval * scale > job.max_interval]
+                for job in lst_free:
+                    dct_intervals[job.name] = job.interval * scale
+                for job in lst_capped:
+                    dct_intervals[job.name] = max(job.max_interval, job.interval)
+                    lst_free.remove(job)
+                if not lst_capped:
+                    break
+
+        for job in self._jobs.values():
+            current_interval = dct_intervals[job.name]
+            if job.next_run:
+                # move an already scheduled run along with its interval
+                job.next_run += current_interval - job.current_interval
+            job.current_interval = current_interval
@@ -0,0 +1,276 @@
+import sys
+import time
+import random
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, FrozenSet, Iterable, Optional
+
+import requests
+
+# CoinMarketCap status.error_code values worth waiting out: the per-minute key rate limit and
+# the IP rate limit. 1009/1010 (daily/monthly limit) will not clear by retrying
+RATE_LIMIT_ERROR_CODES = frozenset({1008, 1011})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+
+class RetryMetrics(object):
+    """Counters of what a RetryPolicy did, shared by every client using the policy."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.gave_up = 0
+        self.recovered = 0
+        self.circuit_rejections = 0
+        self.by_reason: Counter = Counter()
+
+    def _count(self, name: str, reason: Optional[str] = None):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+            if reason is not None:
+                self.by_reason[reason] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {'retries': self.retries, 'gave_up': self.gave_up, 'recovered': self.recovered,
+                    'circuit_rejections': self.circuit_rejections, 'by_reason': dict(self.by_reason)}
+
+
+class RetryPolicy(object):
+    """
+    When and how long to wait before sending a failed request again.
+
+    Retried: responses with a status in retry_statuses (429 and transient 5xx by default) or
+    whose body carries a CoinMarketCap error_code in retry_error_codes (1008 minute rate limit,
+    1011 IP rate limit), connect errors, and, for idempotent methods only, timeouts and
+    connections dropped after the request was sent. A 429 for the daily or monthly limit
+    (1009/1010) is not retried, it will not clear in time.
+
+    The delay is exponential with full jitter, random(0, min(backoff_max, backoff_base * 2**n)),
+    and never less than the Retry-After header. When Retry-After asks for more than
+    max_retry_after the request is not retried.
+
+    Parameters:
+        max_retries (int): Retries after the first attempt.
+        backoff_base (float): Upper bound of the first delay, in seconds.
+        backoff_max (float): Upper bound of any backoff delay, in seconds.
+        jitter (bool): Randomize delays, so clients that failed together do not retry together.
+        retry_statuses (Iterable[int]): HTTP statuses retried.
+        retry_error_codes (Iterable[int]): CoinMarketCap error codes retried, whatever the status.
+        max_retry_after (float): Longest Retry-After honoured, in seconds.
+        sleep (Callable[[float], None]): Sleep function, injectable for tests.
+
+    Example:
+        market = Market(api_key=key, retry_policy=RetryPolicy(max_retries=5), circuit_breaker=CircuitBreaker())
+        ...
+        print(market.retry_policy.metrics.snapshot())
+    """
+
+    def __init__(self,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 30.0,
+                 jitter: bool = True,
+                 retry_statuses: Iterable[int] = RETRY_STATUSES,
+                 retry_error_codes: Iterable[int] = RATE_LIMIT_ERROR_CODES,
+                 max_retry_after: float = 120.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        if max_retries < 0:
+            raise ValueError('max_retries must not be negative')
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_statuses: FrozenSet[int] = frozenset(retry_statuses)
+        self.retry_error_codes: FrozenSet[int] = frozenset(retry_error_codes)
+        self.max_retry_after = max_retry_after
+        self.sleep = sleep
+        self.metrics = RetryMetrics()
+
+    def next_delay(self, attempt: int, method: str = 'GET', response=None, exception: Exception = None) -> Optional[float]:
+        """
+        Seconds to wait before retrying after the given failed attempt (0 for the first), or
+        None when the failure is not retryable or the retries are spent. Counts the decision
+        in metrics.
+        """
+        reason = self.retry_reason(method, response, exception)
+        if reason is None:
+            return None
+
+        if attempt >= self.max_retries:
+            self.metrics._count('gave_up', reason)
+            return None
+
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        if self.jitter:
+            backoff = random.uniform(0, backoff)
+
+        retry_after = _retry_after_seconds(response) if response is not None else None
+        if retry_after is not None and retry_after > self.max_retry_after:
+            self.metrics._count('gave_up', reason)
+            return None
+
+        self.metrics._count('retries', reason)
+        return max(backoff, retry_after or 0.0)
+
+    def retry_reason(self, method: str = 'GET', response=None, exception: Exception = None) -> Optional[str]:
+        """A short label of why the failure is retryable ('http_503', 'cmc_1008', 'timeout', ...), or None."""
+        if exception is not None:
+            kind = _exception_kind(exception)
+            if kind in ('connect_timeout', 'connect_error'):
+                # the connection was never made, nothing reached the server
+                return kind
+            return kind if method.upper() in IDEMPOTENT_METHODS else None
+
+        error_code = _cmc_error_code(response)
+        if error_code in self.retry_error_codes:
+            return f'cmc_{error_code}'
+        if response.status_code == 429 and error_code is not None:
+            # a rate limit that is not in retry_error_codes, e.g. the daily or monthly quota
+            return None
+        if response.status_code in self.retry_statuses:
+            return f'http_{response.status_code}'
+        return None
+
+
+class CircuitBreaker(object):
+    """
+    Fails requests fast while the API looks down.
+
+    After failure_threshold consecutive failures (5xx responses, connection errors and
+    timeouts; 4xx responses are the caller's problem and count as successes) the circuit opens
+    and requests are rejected without being sent. After recovery_timeout seconds one probe
+    request is let through: its success closes the circuit, its failure opens it again.
+
+    One breaker may be shared by several clients of the same API. Clients must report each
+    admitted request through record_response/record_failure, and the owner of the probe must call
+    release_probe when it ended without a result, otherwise a half-open breaker would wait for
+    its probe forever.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        if failure_threshold < 1:
+            raise ValueError('failure_threshold must be at least 1')
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return self.CLOSED
+            if self._probing or self._clock() - self._opened_at >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return self.OPEN
+
+    def admit(self) -> Optional[str]:
+        """
+        Admits a request: CLOSED when the circuit is closed, HALF_OPEN when the caller got the
+        recovery probe (and owns it until it reports an outcome or calls release_probe), None
+        when the request must not be sent.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return self.CLOSED
+            if self._probing or self._clock() - self._opened_at < self.recovery_timeout:
+                return None
+            self._probing = True
+            return self.HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """True when a request may be sent: the circuit is closed, or this is the recovery probe."""
+        return self.admit() is not None
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe may be sent, 0 when the circuit is closed."""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(self.recovery_timeout - (self._clock() - self._opened_at), 0.0)
+
+    def release_probe(self):
+        """
+        Gives the recovery probe back when it ended without an outcome (the request was never
+        sent, or failed with something other than a transport error), so the next request can probe.
+        Only the request admit() gave the probe to may call it.
+        """
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = self._clock()
+            self._probing = False
+
+    def record_response(self, status_code: int):
+        if status_code >= 500:
+            self.record_failure()
+        else:
+            self.record_success()
+
+
+def _exception_kind(exception: Exception) -> Optional[str]:
+    if isinstance(exception, requests.ConnectTimeout):
+        return 'connect_timeout'
+    if isinstance(exception, requests.Timeout):
+        return 'timeout'
+    if isinstance(exception, requests.ConnectionError):
+        return 'connection_error'
+
+    # AsyncMarket's exceptions, httpx is only imported when it is in use
+    httpx = sys.modules.get('httpx')
+    if httpx is not None:
+        if isinstance(exception, httpx.ConnectTimeout):
+            return 'connect_timeout'
+        if isinstance(exception, httpx.ConnectError):
+            return 'connect_error'
+        if isinstance(exception, httpx.TimeoutException):
+            return 'timeout'
+        if isinstance(exception, httpx.TransportError):
+            return 'connection_error'
+    return None
+
+
+def _cmc_error_code(response) -> Optional[int]:
+    try:
+        error_code = (response.json().get('status') or {}).get('error_code')
+    except (ValueError, AttributeError):
+        return None
+    return error_code if isinstance(error_code, int) and error_code != 0 else None
+
+
+def _retry_after_seconds(response) -> Optional[float]:
+    value = (getattr(response, 'headers', None) or {}).get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,273 @@
+import math
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from enum import IntEnum
+from typing import Callable, Dict, Optional
+
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
+from coinmarketcap.v1.cryptocurrency.listings.common import _interval_seconds
+
+
+class Priority(IntEnum):
+    """Scheduling priority of a request, lower values are served first."""
+    CRITICAL = 0
+    NORMAL = 1
+    BACKFILL = 2
+
+
+class CreditBudgetExhausted(Exception):
+    def __init__(self, credits_needed: int, credits_left: int):
+        self.credits_needed = credits_needed
+        self.credits_left = credits_left
+        super().__init__(f"Request needs {credits_needed} credits but only {credits_left} are available "
+                         "until the monthly quota resets")
+
+
+_current_priority: contextvars.ContextVar = contextvars.ContextVar('coinmarketcap_priority', default=Priority.NORMAL)
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """Runs every request made inside the block (in this thread or task) at the given priority."""
+    token = _current_priority.set(Priority(priority))
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def _with_current_context(fn: Callable) -> Callable:
+    """
+    Wraps fn so worker threads run it in a copy of the caller's context, carrying the
+    request priority into ThreadPoolExecutor workers.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # a Context can only be entered by one thread at a time, each call gets its own copy
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def _count_csv(value) -> int:
+    return len(str(value).split(',')) if value else 1
+
+
+def _historical_credits(params: Dict) -> int:
+    interval = params.get('interval', 'hourly')
+    try:
+        step = _interval_seconds(interval)
+    except ValueError:
+        step = 60*60
+    span = max(0, int(params.get('time_end', 0)) - int(params.get('time_start', 0)))
+    points = (span // step + 1) * _count_csv(params.get('id') or params.get('symbol'))
+    return math.ceil(points / 100) + _count_csv(params.get('convert')) - 1
+
+
+# CoinMarketCap's published call credit rules, keyed by endpoint
+_CREDIT_RULES: Dict[str, Callable[[Dict], int]] = {
+    'v1/key/info': lambda params: 0,
+    'v1/cryptocurrency/map': lambda params: 1,
+    'v1/cryptocurrency/listings/latest':
+        lambda params: math.ceil(int(params.get('limit', 100)) / 200) + _count_csv(params.get('convert')) - 1,
+    'v2/cryptocurrency/quotes/historical': _historical_credits,
+    'v3/cryptocurrency/quotes/historical': _historical_credits,
+    'v3/fear-and-greed/historical': lambda params: 1,
+    'v4/dex/listings/info': lambda params: 1,
+}
+
+
+def _estimate_credits(endpoint: str, params: Dict) -> int:
+    """Returns the number of call credits CoinMarketCap will charge for a request (1 when unknown)."""
+    rule = _CREDIT_RULES.get(endpoint.strip('/'))
+    return max(0, rule(params or {})) if rule else 1
+
+
+class CreditScheduler(object):
+    """
+    Spreads the monthly call credit quota evenly over the billing period.
+
+    Remaining credits and the reset date are read from v1/key/info (refreshed every
+    refresh_interval seconds) and turned into a pace of credits per second. Requests draw
+    their estimated credit cost from a bucket that refills at that pace and holds at most
+    burst_seconds worth of credits. When the bucket is empty requests wait in priority
+    order: CRITICAL requests never wait (they are charged and may overdraw the bucket),
+    NORMAL requests are served before BACKFILL ones, FIFO within a priority.
+
+    Estimates are reconciled with the status.credit_count CoinMarketCap returns, and
+    responses served from the local cache are refunded.
+
+    With a SharedCreditLedger the bucket lives in the ledger's store, and every scheduler on
+    the host (e.g. one per worker process) draws from the same one.
+
+    Parameters:
+        refresh_interval (float): Seconds between two v1/key/info refreshes.
+        burst_seconds (float): Size of the bucket, in seconds of pace.
+        reserve (int): Credits only CRITICAL requests may spend.
+        clock (Callable[[], float]): Monotonic clock, injectable for tests.
+        ledger (Optional[SharedCreditLedger]): Shared bucket to draw credits from.
+
+    Example:
+        market = Market(api_key=key, credit_scheduler=CreditScheduler(reserve=500))
+        with market.priority(Priority.BACKFILL):
+            store.sync(market, id=1, timestamp_start=start)
+    """
+
+    def __init__(self,
+                 refresh_interval: float = 60*60,
+                 burst_seconds: float = 15*60,
+                 reserve: int = 0,
+                 clock: Callable[[], float] = time.monotonic,
+                 ledger=None):
+        if refresh_interval <= 0 or burst_seconds <= 0:
+            raise ValueError('refresh_interval and burst_seconds must be positive')
+
+        self.refresh_interval = refresh_interval
+        self.burst_seconds = burst_seconds
+        self.reserve = reserve
+        self._clock = clock
+        self.ledger = ledger
+
+        self._condition = threading.Condition()
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._refreshing = False
+
+        self.credits_left: Optional[int] = None
+        self.credits_per_second = 0.0
+        self.quota_reset: Optional[datetime] = None
+        self._tokens = 0.0
+        self._refilled_at = None
+        self._refreshed_at = None
+
+    @property
+    def capacity(self) -> float:
+        return self.credits_per_second * self.burst_seconds
+
+    def update(self, dct_key_info: Dict):
+        """Resets the budget from the 'data' section of a v1/key/info response."""
+        quota_reset = parse_cmc_datetime(dct_key_info['plan']['credit_limit_monthly_reset_timestamp'])
+        credits_left = int(dct_key_info['usage']['current_month']['credits_left'])
+        seconds_left = max((quota_reset - datetime.now(timezone.utc)).total_seconds(), 1.0)
+
+        with self._condition:
+            self._refill()
+            first_update = self._refreshed_at is None
+            self.credits_left = credits_left
+            self.quota_reset = quota_reset
+            self.credits_per_second = credits_left / seconds_left
+            # start with a full bucket, afterwards keep what was saved up but never more than it holds
+            self._tokens = self.capacity if first_update else min(self._tokens, self.capacity)
+            self._refreshed_at = self._refilled_at = self._clock()
+            self._condition.notify_all()
+
+    def needs_refresh(self) -> bool:
+        with self._condition:
+            if self._refreshing:
+                return False
+            return self._refreshed_at is None or self._clock() - self._refreshed_at >= self.refresh_interval
+
+    def refresh(self, fetch_key_info: Callable[[], Dict]):
+        """Refreshes the budget with fetch_key_info, unless another thread already is."""
+        with self._condition:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        try:
+            self.update(fetch_key_info())
+        finally:
+            with self._condition:
+                self._refreshing = False
+                self._condition.notify_all()
+
+    def acquire(self, credits: int, priority: Optional[Priority] = None, timeout: Optional[float] = None):
+        """
+        Blocks until credits may be spent, then charges them.
+
+        Parameters:
+            credits (int): Estimated credit cost of the request.
+            priority (Optional[Priority]): Defaults to the priority set with request_priority.
+            timeout (Optional[float]): Maximum seconds to wait, None waits as long as needed.
+
+        Raises:
+            CreditBudgetExhausted: If the quota (less the reserve, for non CRITICAL requests) cannot
+                                   cover the request before the reset, or the timeout expires.
+        """
+        priority = Priority(_current_priority.get() if priority is None else priority)
+
+        with self._condition:
+            if self.credits_left is None or credits <= 0:
+                return
+            self._check_quota(credits, priority)
+
+            if priority == Priority.CRITICAL:
+                self._take(credits, None)
+                return
+
+            deadline = None if timeout is None else self._clock() + timeout
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    # a request costing more than the bucket holds goes through once the bucket is full
+                    needed = min(credits, self.capacity)
+                    if self._waiters[0] == ticket and self._take(credits, needed):
+                        return
+
+                    wait = None
+                    if self._waiters[0] == ticket and self.credits_per_second > 0:
+                        wait = (needed - self._tokens) / self.credits_per_second
+                    if deadline is not None:
+                        remaining = deadline - self._clock()
+                        if remaining <= 0:
+                            raise CreditBudgetExhausted(credits, self.credits_left)
+                        wait = remaining if wait is None else min(wait, remaining)
+
+                    self._condition.wait(wait)
+                    self._check_quota(credits, priority)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def settle(self, estimated: int, actual: int):
+        """Corrects a charge once the real cost is known, e.g. 0 for a cached response."""
+        with self._condition:
+            if self.credits_left is None or actual == estimated:
+                return
+            if self.ledger is not None:
+                self.ledger.take(actual - estimated, self.credits_per_second, self.capacity)
+            else:
+                self._tokens += estimated - actual
+            self.credits_left += estimated - actual
+            self._condition.notify_all()
+
+    def _check_quota(self, credits: int, priority: Priority):
+        available = self.credits_left - (0 if priority == Priority.CRITICAL else self.reserve)
+        if credits > available:
+            raise CreditBudgetExhausted(credits, max(available, 0))
+
+    def _take(self, credits: int, needed: Optional[float]) -> bool:
+        # charges credits when the bucket holds needed, or unconditionally when needed is None
+        if self.ledger is not None:
+            taken, self._tokens = self.ledger.take(credits, self.credits_per_second, self.capacity, needed)
+        else:
+            self._refill()
+            taken = needed is None or self._tokens >= needed
+            if taken:
+                self._tokens -= credits
+        if taken:
+            self.credits_left -= credits
+        return taken
+
+    def _refill(self):
+        now = self._clock()
+        if self._refilled_at is not None:
+            self._tokens = min(self.capacity, self._tokens + (now - self._refilled_at) * self.credits_per_second)
+        self._refilled_at = now
@@ -0,0 +1,248 @@
+import os
+import time
+import asyncio
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+
+DEFAULT_STORE_PATH = os.path.join(tempfile.gettempdir(), 'coinmarketcap_limits.sqlite')
+
+
+class SQLiteLimitStore(object):
+    """
+    Token buckets and counters in a SQLite file, shared by every process on the host that
+    opens the same path. Each operation is one IMMEDIATE transaction, so concurrent
+    processes are serialized by SQLite's file lock.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._transaction() as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value REAL NOT NULL)')
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections must not be shared between threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            # a failed COMMIT (e.g. SQLITE_BUSY) leaves the transaction open on this thread's connection
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+
+    def take(self, name: str, amount: float, rate: float, capacity: float,
+             min_level: Optional[float] = None, now: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Refills the bucket name at rate tokens per second (up to capacity), then takes amount
+        from it when it holds at least min_level, or unconditionally when min_level is None (the
+        bucket may go negative, a debt later takers wait out). A negative amount returns tokens.
+        A missing bucket starts full. Returns (taken, tokens left).
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE name = ?', (name,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + max(now - row[1], 0.0) * rate)
+            taken = min_level is None or tokens >= min_level
+            if taken:
+                tokens = min(capacity, tokens - amount)
+            conn.execute('INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)', (name, tokens, now))
+        return taken, tokens
+
+    def increment(self, name: str, amount: float) -> float:
+        """Adds amount to the counter name and returns its new value."""
+        with self._transaction() as conn:
+            conn.execute('INSERT INTO counters (name, value) VALUES (?, ?) '
+                         'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value', (name, amount))
+            return conn.execute('SELECT value FROM counters WHERE name = ?', (name,)).fetchone()[0]
+
+    def counter(self, name: str) -> float:
+        row = self._connection().execute('SELECT value FROM counters WHERE name = ?', (name,)).fetchone()
+        return row[0] if row else 0.0
+
+
+# KEYS[1] bucket hash; ARGV amount, rate, capacity, now, min_level ('' takes unconditionally)
+_REDIS_TAKE = """
+local amount, rate, capacity, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = capacity
+if state[1] then
+    tokens = math.min(capacity, tonumber(state[1]) + math.max(now - tonumber(state[2]), 0) * rate)
+end
+local taken = 0
+if ARGV[5] == '' or tokens >= tonumber(ARGV[5]) then
+    tokens = math.min(capacity, tokens - amount)
+    taken = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+return {taken, tostring(tokens)}
+"""
+
+
+class RedisLimitStore(object):
+    """
+    Same buckets and counters as SQLiteLimitStore, kept in Redis (or a Redis compatible
+    server) so processes on several hosts can share them. Buckets are updated by a Lua
+    script, atomically on the server.
+
+    Parameters:
+        client: A redis.Redis client. When None, one is created from url.
+        url (str): Server URL, used when no client is given.
+        prefix (str): Prefix of every key the store writes.
+    """
+
+    def __init__(self, client=None, url: str = 'redis://localhost:6379/0', prefix: str = 'coinmarketcap:limits:'):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError('The redis limit store requires redis. Install it with: pip install byteforge-coinmarketcap[redis]')
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._take_script = client.register_script(_REDIS_TAKE)
+
+    def take(self, name: str, amount: float, rate: float, capacity: float,
+             min_level: Optional[float] = None, now: Optional[float] = None) -> Tuple[bool, float]:
+        now = time.time() if now is None else now
+        taken, tokens = self._take_script(keys=[self.prefix + 'bucket:' + name],
+                                          args=[amount, rate, capacity, now, '' if min_level is None else min_level])
+        return bool(taken), float(tokens)
+
+    def increment(self, name: str, amount: float) -> float:
+        return float(self.client.incrbyfloat(self.prefix + 'counter:' + name, amount))
+
+    def counter(self, name: str) -> float:
+        value = self.client.get(self.prefix + 'counter:' + name)
+        return float(value) if value is not None else 0.0
+
+
+class SharedRateLimiter(object):
+    """
+    A requests-per-minute limit shared by every Market on the host (or cluster, with a
+    RedisLimitStore), instead of each process assuming it owns the whole limit.
+
+    Each request reserves its slot in a shared token bucket and then waits until the slot
+    comes up, so requests are served in the order they reached the store, whichever process
+    sent them, and nobody polls. Pass it to Market(rate_limiter=...), it is mounted on both
+    the plain and the caching session (cache hits never reach it), or to AsyncMarket.
+
+    Parameters:
+        per_minute (float): Requests per minute, for all processes together.
+        store: A SQLiteLimitStore (default, in the temp directory) or RedisLimitStore.
+        name (str): Bucket name, limiters sharing a name share the limit.
+        burst (int): Requests that may go out back to back after an idle period.
+        sleep (Callable[[float], None]): Sleep function, injectable for tests.
+
+    Example:
+        limiter = SharedRateLimiter(per_minute=30)
+        market = Market(api_key=key, rate_limiter=limiter)
+    """
+
+    def __init__(self, per_minute: float, store=None, name: str = 'requests', burst: int = 1,
+                 sleep: Callable[[float], None] = time.sleep):
+        if per_minute <= 0:
+            raise ValueError('per_minute must be positive')
+        if burst < 1:
+            raise ValueError('burst must be at least 1')
+
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.store = store if store is not None else SQLiteLimitStore()
+        self.name = name
+        self.sleep = sleep
+
+    def reserve(self, timeout: Optional[float] = None) -> float:
+        """
+        Reserves the next slot and returns the seconds to wait before using it.
+
+        Raises:
+            TimeoutError: If the slot is more than timeout seconds away, nothing is reserved then.
+        """
+        _, tokens = self.store.take(self.name, 1, self.rate, self.capacity)
+        wait = max(-tokens / self.rate, 0.0)
+        if timeout is not None and wait > timeout:
+            self.store.take(self.name, -1, self.rate, self.capacity)
+            raise TimeoutError(f'Next request slot is {wait:.1f}s away, more than the {timeout:.1f}s timeout')
+        return wait
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """Blocks until a request may be sent, returns the seconds waited."""
+        wait = self.reserve(timeout)
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    async def acquire_async(self, timeout: Optional[float] = None) -> float:
+        """
+        acquire for coroutines. The reservation (a SQLite transaction or a Redis round-trip, which
+        may block on other processes) runs on the default executor, the wait is an asyncio.sleep.
+        """
+        wait = await asyncio.get_running_loop().run_in_executor(None, self.reserve, timeout)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+class SharedCreditLedger(object):
+    """
+    Moves a CreditScheduler's credit bucket into a shared store, so all schedulers using the
+    ledger pace one budget together instead of each spending the whole of it, and keeps a
+    host-wide count of the credits spent per month.
+
+    Example:
+        ledger = SharedCreditLedger()
+        market = Market(api_key=key, credit_scheduler=CreditScheduler(ledger=ledger))
+        ...
+        print(ledger.spent())
+    """
+
+    def __init__(self, store=None, name: str = 'credits'):
+        self.store = store if store is not None else SQLiteLimitStore()
+        self.name = name
+
+    def take(self, credits: float, rate: float, capacity: float, min_level: Optional[float] = None) -> Tuple[bool, float]:
+        """Charges credits to the shared bucket, see SQLiteLimitStore.take. Returns (taken, tokens left)."""
+        taken, tokens = self.store.take(self.name, credits, rate, capacity, min_level)
+        if taken and credits:
+            self.store.increment(self._spent_key(), credits)
+        return taken, tokens
+
+    def spent(self, month: Optional[str] = None) -> float:
+        """Credits charged through the ledger in month ('YYYY-MM', UTC), by default the current one."""
+        return self.store.counter(self._spent_key(month))
+
+    def _spent_key(self, month: Optional[str] = None) -> str:
+        return f"{self.name}:spent:{month or datetime.now(timezone.utc).strftime('%Y-%m')}"
+
+
+class SharedLimiterAdapter(HTTPAdapter):
+    """requests transport adapter waiting for a SharedRateLimiter before sending each request."""
+
+    def __init__(self, limiter: SharedRateLimiter, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = limiter
+
+    def send(self, request, **kwargs):
+        self.limiter.acquire()
+        return super().send(request, **kwargs)
@@ -0,0 +1,55 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+def _flight_key(endpoint: str, params: Dict, no_cache: bool) -> Tuple:
+    """Identifies a request independently of param order and of int vs str param values."""
+    return (endpoint.strip('/'), no_cache, tuple(sorted((str(key), str(value)) for key, value in (params or {}).items())))
+
+
+class _Call(object):
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _SingleFlight(object):
+    """
+    Collapses concurrent calls made with the same key into one execution.
+
+    The first caller of a key runs fn; callers arriving with the same key while it is running
+    block and receive the same result (or exception) instead of running fn again. Once the
+    call completes the key is forgotten, so later calls run fn afresh.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Returns (result, shared), shared being True for callers that waited on another's call."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,168 @@
+import json
+import codecs
+from typing import Any, Dict, Iterable, Iterator, Sequence, Union
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _JsonArrayStream(object):
+    """
+    Incrementally decodes the items of one array nested inside a JSON document.
+
+    The document arrives as an iterable of byte (or str) chunks, e.g. requests'
+    response.iter_content(). Only the path to the array is walked: values of other keys on
+    the way are decoded and dropped, except the ones sitting next to the array itself, which
+    are kept in `siblings` (for a historical quotes summary that is id, name, symbol, ...).
+    Array items are decoded and yielded one at a time, so at most one item plus one chunk
+    is held in memory rather than the whole document.
+
+    Parameters:
+        chunks (Iterable[Union[bytes, str]]): The raw document.
+        path (Sequence[Union[str, int]]): Object keys (str) and array indexes (int) leading to
+                                          the array, e.g. ['data'] or ['data', '1', 'quotes'].
+
+    Raises:
+        ValueError: If the document is not valid JSON or the path does not lead to an array.
+    """
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]], path: Sequence[Union[str, int]]):
+        self.path = list(path)
+        self.siblings: Dict[str, Any] = {}
+        self._chunks = iter(chunks)
+        self._text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json_decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+        self._in_array = False
+
+    def __iter__(self) -> Iterator[Any]:
+        self._walk_to_array()
+        self._in_array = True
+
+        self._skip_whitespace()
+        if self._peek() == ']':
+            self._pos += 1
+        else:
+            while True:
+                yield self._decode_value()
+                if self._expect(',]') == ']':
+                    break
+
+        self._in_array = False
+
+    def finish(self) -> Dict[str, Any]:
+        """Reads the rest of the object holding the array, collecting siblings found after it."""
+        if self._in_array:
+            raise ValueError('The array must be fully consumed before calling finish()')
+
+        self._read_object_members(key_to_find=None, collect=True)
+        return self.siblings
+
+    # --- navigation -----------------------------------------------------------------------
+
+    def _walk_to_array(self):
+        for depth, step in enumerate(self.path):
+            collect = depth == len(self.path) - 1
+            self._skip_whitespace()
+            if isinstance(step, int):
+                self._expect('[')
+                for _ in range(step):
+                    self._decode_value()
+                    self._expect(',')
+            else:
+                self._expect('{')
+                if not self._read_object_members(key_to_find=step, collect=collect):
+                    raise ValueError(f"Key '{step}' not found while streaming the response")
+
+        self._skip_whitespace()
+        self._expect('[')
+
+    def _read_object_members(self, key_to_find, collect: bool) -> bool:
+        """
+        Reads 'key: value' members until key_to_find is reached (positioned on its value, True)
+        or the object ends (False). Skipped values are kept in siblings when collect is set.
+        """
+        self._skip_whitespace()
+        if self._peek() == '}':
+            self._pos += 1
+            return False
+        if self._peek() == ',':
+            self._pos += 1
+
+        while True:
+            self._skip_whitespace()
+            key = self._decode_value()
+            self._skip_whitespace()
+            self._expect(':')
+            self._skip_whitespace()
+
+            if key == key_to_find:
+                return True
+
+            value = self._decode_value()
+            if collect:
+                self.siblings[key] = value
+
+            if self._expect(',}') == '}':
+                return False
+
+    # --- low level buffer handling --------------------------------------------------------
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+
+        # drop what has already been consumed so the buffer never grows past one value + one chunk
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                chunk = self._text_decoder.decode(chunk)
+            if chunk:
+                self._buffer += chunk
+                return True
+
+        self._buffer += self._text_decoder.decode(b'', final=True)
+        self._eof = True
+        return False
+
+    def _peek(self) -> str:
+        while self._pos >= len(self._buffer):
+            if not self._fill():
+                raise ValueError('Unexpected end of JSON document while streaming the response')
+        return self._buffer[self._pos]
+
+    def _skip_whitespace(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _expect(self, allowed: str) -> str:
+        self._skip_whitespace()
+        char = self._peek()
+        if char not in allowed:
+            raise ValueError(f"Malformed JSON while streaming the response: expected one of '{allowed}', got '{char}'")
+        self._pos += 1
+        return char
+
+    def _decode_value(self) -> Any:
+        self._skip_whitespace()
+        while True:
+            try:
+                value, end = self._json_decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise ValueError('Malformed JSON while streaming the response')
+
+            # a number (or literal) touching the end of the buffer may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
@@ -0,0 +1,267 @@
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from crypto_commons.types.token_info import TokenInfo
+from coinmarketcap.pagination import MAX_PAGE_SIZE
+from coinmarketcap.v1.cryptocurrency.map_common import ListingStatus, MapAuxFields, MapSortOption
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS assets (
+    id INTEGER PRIMARY KEY,
+    rank INTEGER,
+    name TEXT,
+    symbol TEXT,
+    slug TEXT,
+    listing_status TEXT,
+    is_active INTEGER,
+    first_historical_data INTEGER,
+    last_historical_data INTEGER,
+    platform TEXT
+);
+CREATE TABLE IF NOT EXISTS refreshes (
+    listing_status TEXT PRIMARY KEY,
+    refreshed_at INTEGER NOT NULL
+);
+'''
+
+_ALL_STATUSES = (ListingStatus.ACTIVE, ListingStatus.INACTIVE, ListingStatus.UNTRACKED)
+
+_MAP_AUX_FIELDS = [MapAuxFields.PLATFORM, MapAuxFields.FIRST_HISTORICAL_DATA,
+                   MapAuxFields.LAST_HISTORICAL_DATA, MapAuxFields.IS_ACTIVE]
+
+
+def _normalize_address(address: str) -> str:
+    # EVM addresses are case-insensitive hex, other chains (e.g. Solana's base58) are not
+    address = address.strip()
+    return address.lower() if address[:2].lower() == '0x' else address
+
+
+def _to_unix(value) -> Optional[int]:
+    return int(value.timestamp()) if isinstance(value, datetime) else value
+
+
+def _from_unix(value) -> Optional[datetime]:
+    return datetime.fromtimestamp(value, tz=timezone.utc) if value is not None else None
+
+
+class SymbolIndex(object):
+    """
+    Persistent local index of the v1/cryptocurrency/map universe for offline id resolution.
+
+    Holds every active, inactive and untracked asset in SQLite and, once first used, in
+    in-memory dicts giving O(1) lookups by id, symbol, slug and platform token address.
+    Symbols are not unique on CoinMarketCap: by_symbol returns every match, active assets
+    first, then by cmc rank, and resolve picks the first of them.
+
+    The index loads lazily on the first lookup. refresh_if_stale re-pages a listing status
+    only when it is older than max_age, and a lookup missing from the index fetches just that
+    symbol, so a warm index costs no API calls.
+
+    Example:
+        index = SymbolIndex('/var/lib/cmc/symbols.sqlite')
+        market = Market(api_key=key, symbol_index=index)
+        market.quotes_historical_v3(ticker='ETH')  # sent as id=1027
+    """
+
+    def __init__(self, path: str = 'coinmarketcap_symbols.sqlite'):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+
+        self._loaded = False
+        self._by_id: Dict[int, TokenInfo] = {}
+        self._by_symbol: Dict[str, List[TokenInfo]] = {}
+        self._by_slug: Dict[str, TokenInfo] = {}
+        self._by_address: Dict[str, List[TokenInfo]] = {}
+        self._listing_status: Dict[int, str] = {}
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._by_id)
+
+    # --- lookups --------------------------------------------------------------------------
+
+    def by_id(self, id: int) -> Optional[TokenInfo]:
+        self._ensure_loaded()
+        return self._by_id.get(int(id))
+
+    def by_symbol(self, symbol: str) -> List[TokenInfo]:
+        """Every asset using symbol, active ones first, then by cmc rank."""
+        self._ensure_loaded()
+        return list(self._by_symbol.get(symbol.upper(), []))
+
+    def by_slug(self, slug: str) -> Optional[TokenInfo]:
+        self._ensure_loaded()
+        return self._by_slug.get(slug.lower())
+
+    def by_address(self, token_address: str) -> List[TokenInfo]:
+        """Assets whose platform token contract is token_address (one per chain it is deployed on)."""
+        self._ensure_loaded()
+        return list(self._by_address.get(_normalize_address(token_address), []))
+
+    def resolve(self, ticker: str, market=None) -> int:
+        """
+        Returns the CoinMarketCap id for a symbol, slug or token address.
+
+        When nothing matches and a market is given, the symbol is looked up with a single map
+        call across all listing statuses and the index is updated with the result.
+
+        Raises:
+            KeyError: If ticker cannot be resolved.
+        """
+        token_info = self._find(ticker)
+        if token_info is None and market is not None:
+            self.refresh_symbols(market, [ticker])
+            token_info = self._find(ticker)
+
+        if token_info is None:
+            raise KeyError(f"Unknown symbol, slug or token address '{ticker}'")
+
+        return token_info.id
+
+    def _find(self, ticker: str) -> Optional[TokenInfo]:
+        lst_matches = self.by_symbol(ticker)
+        if lst_matches:
+            return lst_matches[0]
+        return self.by_slug(ticker) or next(iter(self.by_address(ticker)), None)
+
+    # --- refreshing -----------------------------------------------------------------------
+
+    def refreshed_at(self, status: ListingStatus) -> Optional[int]:
+        with self._lock:
+            row = self._connection.execute('SELECT refreshed_at FROM refreshes WHERE listing_status = ?',
+                                           (status.value,)).fetchone()
+        return row[0] if row else None
+
+    def refresh(self, market, statuses: Iterable[ListingStatus] = _ALL_STATUSES, page_size: int = MAX_PAGE_SIZE) -> int:
+        """
+        Pages the full map for each listing status and upserts it. Returns the number of assets written.
+        """
+        from coinmarketcap.v1.cryptocurrency.map import _iter_map
+
+        written = 0
+        for status in statuses:
+            started_at = int(time.time())
+            lst_token_infos = list(_iter_map(market, status, page_size=page_size,
+                                             sort=MapSortOption.ID, aux_fields=_MAP_AUX_FIELDS))
+            self._upsert(lst_token_infos, status.value)
+            with self._lock, self._connection:
+                self._connection.execute('INSERT OR REPLACE INTO refreshes VALUES (?, ?)', (status.value, started_at))
+            written += len(lst_token_infos)
+
+        return written
+
+    def refresh_if_stale(self, market, max_age: int = 24*60*60, statuses: Iterable[ListingStatus] = _ALL_STATUSES) -> int:
+        """Refreshes only the listing statuses last refreshed more than max_age seconds ago."""
+        now = int(time.time())
+        lst_stale = [status for status in statuses
+                     if self.refreshed_at(status) is None or now - self.refreshed_at(status) > max_age]
+        return self.refresh(market, lst_stale) if lst_stale else 0
+
+    def refresh_symbols(self, market, symbols: List[str]) -> int:
+        # imported here, so a standalone index does not load Market and the map endpoint is loaded on first use
+        # imported here, core imports this module and the map endpoint is loaded on first use
+        from coinmarketcap.core import ServerException
+        from coinmarketcap.v1.cryptocurrency.map import _map_params, _parse_map
+
+        params = _map_params(symbols=[symbol.upper() for symbol in symbols], limit=MAX_PAGE_SIZE, aux_fields=_MAP_AUX_FIELDS)
+        params['listing_status'] = ','.join(status.value for status in _ALL_STATUSES)
+
+        try:
+            response = market._request('v1/cryptocurrency/map', params=params)
+        except ServerException as e:
+            # CoinMarketCap answers an unknown symbol with a 400 instead of an empty list
+            if e.status_code == 400:
+                return 0
+            raise
+
+        lst_token_infos = _parse_map(response)
+        self._upsert(lst_token_infos, None)
+        return len(lst_token_infos)
+
+    # --- storage --------------------------------------------------------------------------
+
+    def _upsert(self, lst_token_infos: List[TokenInfo], listing_status: Optional[str]):
+        lst_rows = []
+        for token_info in lst_token_infos:
+            status = listing_status or ('active' if token_info.is_active == 1 else 'inactive')
+            lst_rows.append((token_info.id, token_info.rank, token_info.name, token_info.symbol, token_info.slug,
+                             status, token_info.is_active,
+                             _to_unix(token_info.first_historical_data), _to_unix(token_info.last_historical_data),
+                             json.dumps(token_info.platform) if token_info.platform else None))
+
+        with self._lock:
+            with self._connection:
+                self._connection.executemany('INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', lst_rows)
+            if self._loaded:
+                # keep the in-memory index current without reloading all of it
+                for row in lst_rows:
+                    self._remove(row[0])
+                    self._add(self._row_to_token_info(row), row[5])
+                self._sort_symbols({row[3].upper() for row in lst_rows if row[3]})
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+
+        with self._lock:
+            if self._loaded:
+                return
+            for row in self._connection.execute('SELECT * FROM assets'):
+                self._add(self._row_to_token_info(row), row[5])
+            self._sort_symbols(self._by_symbol.keys())
+            self._loaded = True
+
+    def _add(self, token_info: TokenInfo, listing_status: str):
+        self._by_id[token_info.id] = token_info
+        self._listing_status[token_info.id] = listing_status
+        if token_info.symbol:
+            self._by_symbol.setdefault(token_info.symbol.upper(), []).append(token_info)
+        if token_info.slug:
+            self._by_slug[token_info.slug.lower()] = token_info
+        token_address = (token_info.platform or {}).get('token_address')
+        if token_address:
+            self._by_address.setdefault(_normalize_address(token_address), []).append(token_info)
+
+    def _remove(self, id: int):
+        token_info = self._by_id.pop(id, None)
+        if token_info is None:
+            return
+        del self._listing_status[id]
+        if token_info.symbol:
+            lst_matches = self._by_symbol.get(token_info.symbol.upper(), [])
+            lst_matches[:] = [match for match in lst_matches if match.id != id]
+        if token_info.slug and self._by_slug.get(token_info.slug.lower()) is token_info:
+            del self._by_slug[token_info.slug.lower()]
+        token_address = (token_info.platform or {}).get('token_address')
+        if token_address:
+            lst_matches = self._by_address.get(_normalize_address(token_address), [])
+            lst_matches[:] = [match for match in lst_matches if match.id != id]
+
+    def _sort_symbols(self, symbols: Iterable[str]):
+        for symbol in list(symbols):
+            self._by_symbol.get(symbol, []).sort(
+                key=lambda token_info: (self._listing_status[token_info.id] != 'active',
+                                        token_info.rank or float('inf'), token_info.id))
+
+    @staticmethod
+    def _row_to_token_info(row) -> TokenInfo:
+        return TokenInfo(id=row[0], rank=row[1], name=row[2], symbol=row[3], slug=row[4], status=None,
+                         is_active=row[6], first_historical_data=_from_unix(row[7]),
+                         last_historical_data=_from_unix(row[8]), platform=json.loads(row[9]) if row[9] else None)
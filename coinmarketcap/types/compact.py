@@ -0,0 +1,126 @@
+import dataclasses
+from types import MappingProxyType
+from typing import Any, Dict, Tuple
+
+from crypto_commons.types.quote import Quote
+from crypto_commons.types.token_state import TokenState
+
+_set = object.__setattr__
+
+
+def _defaults(dataclass_type) -> Dict[str, Any]:
+    return {f.name: f.default for f in dataclasses.fields(dataclass_type) if f.default is not dataclasses.MISSING}
+
+
+class _ReadOnlySlots(object):
+    """
+    Base of the compact result types: attributes live in __slots__ (no per-instance __dict__)
+    and cannot be changed once built. Field names, order and defaults mirror a crypto_commons
+    dataclass, so a compact object reads exactly like the dataclass it stands in for.
+
+    Subclasses set _dataclass. The slots are declared on a generated mutable base class: the
+    generated __new__ fills them with plain attribute stores and then switches the instance to
+    the read-only subclass, which is several times cheaper than object.__setattr__ per field.
+    """
+    __slots__ = ()
+
+    _dataclass = None
+    _fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if '__new__' not in cls.__dict__ and cls._fields:
+            cls.__new__ = _make_new(cls)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is read-only")
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{name}={getattr(self, name)!r}' for name in self._fields)})"
+
+    def __reduce__(self):
+        return (_restore, (type(self), self._values()))
+
+    def _values(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self._fields)
+
+
+def _slots_base(dataclass_type) -> type:
+    """The mutable class holding the slots of dataclass_type's fields, base of its compact type."""
+    fields = tuple(f.name for f in dataclasses.fields(dataclass_type))
+    return type(f'_{dataclass_type.__name__}Slots', (object,), {'__slots__': fields, '_fields': fields})
+
+
+def _make_new(cls):
+    # like dataclasses, generate the constructor source so fields are (positional or keyword)
+    # arguments with the dataclass defaults and missing or unexpected fields raise TypeError
+    storage = next(base for base in cls.__mro__ if '_fields' in base.__dict__ and base.__dict__.get('__slots__'))
+    defaults = _defaults(cls._dataclass)
+    lst_args = [f"{name}=_defaults['{name}']" if name in defaults else name for name in cls._fields]
+    lst_body = [f'    self.{name} = {name}' for name in cls._fields]
+    source = (f"def __new__(cls, {', '.join(lst_args)}):\n"
+              f"    self = _new(_storage)\n" + '\n'.join(lst_body) + '\n'
+              f"    _set(self, '__class__', cls)\n"
+              f"    return self\n")
+    namespace = {'_defaults': defaults, '_new': storage.__new__, '_storage': storage, '_set': _set}
+    exec(source, namespace)
+    namespace['__new__'].__qualname__ = f'{cls.__name__}.__new__'
+    return namespace['__new__']
+
+
+def _restore(cls, values: Tuple):
+    return cls(**dict(zip(cls._fields, values)))
+
+
+class CompactQuote(_slots_base(Quote), _ReadOnlySlots):
+    """Read-only, slotted stand-in for crypto_commons Quote, with the same attributes."""
+    __slots__ = ()
+    _dataclass = Quote
+
+    def to_quote(self) -> Quote:
+        """Returns an ordinary, mutable Quote with the same values."""
+        return Quote(**{name: getattr(self, name) for name in self._fields})
+
+
+class CompactTokenState(_slots_base(TokenState), _ReadOnlySlots):
+    """
+    Read-only, slotted stand-in for crypto_commons TokenState, with the same attributes.
+
+    quote_map is a read-only mapping of CompactQuote and tags a tuple, so nothing reachable
+    from the object can be modified in place.
+    """
+    __slots__ = ()
+    _dataclass = TokenState
+
+    def __hash__(self):
+        # quote_map is a mapping proxy, which is not hashable
+        return hash((self.id, self.timestamp))
+
+    def __reduce__(self):
+        values = tuple(dict(value) if name == 'quote_map' else value for name, value in zip(self._fields, self._values()))
+        return (_restore_token_state, (values,))
+
+    def to_token_state(self) -> TokenState:
+        """Returns an ordinary, mutable TokenState (with Quote objects) holding the same values."""
+        dct_values = {name: getattr(self, name) for name in self._fields}
+        dct_values['quote_map'] = {currency: quote.to_quote() for currency, quote in self.quote_map.items()}
+        if dct_values['tags'] is not None:
+            dct_values['tags'] = list(dct_values['tags'])
+        return TokenState(**dct_values)
+
+
+def _restore_token_state(values: Tuple) -> CompactTokenState:
+    dct_values = dict(zip(CompactTokenState._fields, values))
+    dct_values['quote_map'] = MappingProxyType(dct_values['quote_map'])
+    return CompactTokenState(**dct_values)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from functools import lru_cache
+
+# Number of distinct timestamp strings remembered, a listings page shares a handful of
+# 'last_updated' values while a historical page has one per point
+_MEMO_SIZE = 4096
+
+
+@lru_cache(maxsize=_MEMO_SIZE)
+def parse_cmc_datetime(value: str) -> datetime:
+    """
+    Parses a CoinMarketCap timestamp string into a timezone-aware datetime.
+
+    CoinMarketCap sends 'YYYY-MM-DDTHH:MM:SS.sssZ' (and occasionally the same without
+    milliseconds). Those go through datetime.fromisoformat, which is far cheaper than
+    dateutil. Anything else falls back to dateutil.parser.parse. Results are memoized,
+    since many quotes in one response share the same string.
+
+    Parameters:
+        value (str): The timestamp string from the API.
+
+    Returns:
+        datetime: The parsed datetime, in UTC for the 'Z' formats.
+    """
+    if len(value) in (20, 24) and value[-1] == 'Z' and value[10] == 'T':
+        try:
+            return datetime.fromisoformat(value[:-1] + '+00:00')
+        except ValueError:
+            pass
+
+    # dateutil is only imported for the odd format, it is slow to import
+    from dateutil import parser
+    return parser.parse(value)
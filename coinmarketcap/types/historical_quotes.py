@@ -0,0 +1,19 @@
+from typing import Iterable
+from crypto_commons.types.token_state import TokenState
+
+
+class HistoricalQuotes(list):
+    """
+    List of TokenState objects returned by a chunked historical quotes fetch.
+
+    Behaves exactly like the plain list returned by the non-chunked call, with two extra
+    attributes describing the work done to build it:
+
+        chunks (int): Number of API calls the time range was split into.
+        credits_used (int): Credits charged for those calls, cache hits count 0.
+    """
+
+    def __init__(self, token_states: Iterable[TokenState] = (), chunks: int = 0, credits_used: int = 0):
+        super().__init__(token_states)
+        self.chunks = chunks
+        self.credits_used = credits_used
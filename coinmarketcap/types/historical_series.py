@@ -0,0 +1,46 @@
+from dataclasses import dataclass, field
+from typing import Dict, Any
+
+# Per-currency quote fields kept by the columnar historical format
+SERIES_FIELDS = (
+    'price', 'volume_24h', 'market_cap', 'percent_change_1h',
+    'percent_change_24h', 'percent_change_7d', 'percent_change_30d'
+)
+
+@dataclass
+class HistoricalSeries:
+    """Struct-of-arrays view of a historical quotes response for one cryptocurrency.
+
+    timestamp holds the unix timestamps of the points as an int64 NumPy array. quotes maps each
+    convert currency to a dict of float64 NumPy arrays, one per name in SERIES_FIELDS, all aligned
+    with timestamp. Values missing from the response are NaN.
+    """
+
+    id: int
+    name: str
+    symbol: str
+    is_active: bool
+    is_fiat: bool
+    timestamp: Any
+    quotes: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def to_dataframe(self):
+        """
+        Returns the series as a pandas DataFrame indexed by UTC datetime, with one
+        '<CURRENCY>_<field>' column per currency and field. Requires pandas.
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError('HistoricalSeries.to_dataframe requires pandas. Install it with: pip install pandas')
+
+        columns = {
+            f'{currency}_{name}': values
+            for currency, dct_arrays in self.quotes.items()
+            for name, values in dct_arrays.items()
+        }
+        index = pd.to_datetime(self.timestamp, unit='s', utc=True)
+        return pd.DataFrame(columns, index=index.rename('timestamp'))
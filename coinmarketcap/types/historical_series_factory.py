@@ -0,0 +1,55 @@
+from typing import Dict, Optional
+
+from .historical_series import HistoricalSeries, SERIES_FIELDS
+from .datetime_parser import parse_cmc_datetime
+
+
+def _to_float(value) -> float:
+    return float('nan') if value is None else float(value)
+
+
+class HistoricalSeriesFactory:
+    @staticmethod
+    def from_quote_summary(dct_quote_summary: Dict, id: Optional[str] = None) -> HistoricalSeries:
+        """
+        Build a HistoricalSeries straight from one quote summary of a historical response
+        (the object holding id, name, symbol, ... and the 'quotes' list), without creating
+        a TokenState or Quote per point.
+        """
+        # numpy is imported on first use, most callers never ask for the columnar format
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError('The columnar historical format requires numpy. Install it with: pip install numpy')
+
+        try:
+            lst_quotes = dct_quote_summary['quotes']
+            series_id = int(id) if id else int(dct_quote_summary['id'])
+            name = dct_quote_summary['name']
+            symbol = dct_quote_summary['symbol']
+            is_active = dct_quote_summary['is_active'] == 1
+            is_fiat = dct_quote_summary['is_fiat'] == 1
+        except KeyError as e:
+            raise ValueError(f"Required field '{e}' is missing from API response. Response data might be malformed or incomplete.")
+
+        count = len(lst_quotes)
+        timestamps = np.empty(count, dtype=np.int64)
+
+        # currencies are discovered from the first point, then filled column by column
+        dct_columns = {}
+        if count:
+            for currency in lst_quotes[0]['quote']:
+                dct_columns[currency] = {name: np.full(count, np.nan) for name in SERIES_FIELDS}
+
+        for row, dct_quote_block in enumerate(lst_quotes):
+            timestamps[row] = int(parse_cmc_datetime(dct_quote_block['timestamp']).timestamp())
+            for currency, dct_quote_data in dct_quote_block['quote'].items():
+                dct_arrays = dct_columns.get(currency)
+                if dct_arrays is None:
+                    continue
+                for name in SERIES_FIELDS:
+                    if name in dct_quote_data:
+                        dct_arrays[name][row] = _to_float(dct_quote_data[name])
+
+        return HistoricalSeries(id=series_id, name=name, symbol=symbol, is_active=is_active,
+                                is_fiat=is_fiat, timestamp=timestamps, quotes=dct_columns)
@@ -2,12 +2,20 @@ from typing import Dict
 import dataclasses
 import json
 import logging
-from dateutil import parser
 from crypto_commons.types.quote import Quote
+from .datetime_parser import parse_cmc_datetime
+from .compact import CompactQuote
+
+# Fields the Quote constructor accepts, unknown response fields are dropped
+QUOTE_FIELDS = frozenset(f.name for f in dataclasses.fields(Quote))
 
 class QuoteFactory:
     @staticmethod
-    def from_dict(currency: str, dct_quote_data: Dict) -> 'Quote':
+    def from_dict(currency: str, dct_quote_data: Dict, compact: bool = False) -> 'Quote':
+        """
+        Create a Quote from one currency entry of a 'quote' object. With compact=True a
+        read-only, slotted CompactQuote is returned instead.
+        """
         if 'price' not in dct_quote_data:
             print(f"Payload: {json.dumps(dct_quote_data, indent=4)}")
             raise ValueError("Payload must contain 'price' field.")
@@ -34,10 +42,10 @@ class QuoteFactory:
         dct_quote_data.pop('last_updated', None)
         dct_quote_data.pop('timestamp', None)
 
-        last_updated = parser.parse(last_updated_str)
+        last_updated = parse_cmc_datetime(last_updated_str)
         
         # Filter out unknown fields to prevent crashes when CoinMarketCap adds new response fields
-        known_fields = {f.name for f in dataclasses.fields(Quote)}
-        filtered = {k: v for k, v in dct_quote_data.items() if k in known_fields}
+        filtered = {k: v for k, v in dct_quote_data.items() if k in QUOTE_FIELDS}
 
-        return Quote(base_currency=currency, last_updated=last_updated, **filtered)
+        quote_type = CompactQuote if compact else Quote
+        return quote_type(base_currency=currency, last_updated=last_updated, **filtered)
@@ -1,6 +1,6 @@
 from typing import Dict
-from datetime import datetime
 from crypto_commons.types.token_info import TokenInfo
+from .datetime_parser import parse_cmc_datetime
 
 class TokenInfoFactory:
     @staticmethod
@@ -14,7 +14,7 @@ class TokenInfoFactory:
             slug=data['slug'],
             is_active=data.get('is_active'),
             status=data.get('status'),
-            first_historical_data=datetime.fromisoformat(data['first_historical_data'].replace('Z', '+00:00')) if 'first_historical_data' in data else None,
-            last_historical_data=datetime.fromisoformat(data['last_historical_data'].replace('Z', '+00:00')) if 'last_historical_data' in data else None,
+            first_historical_data=parse_cmc_datetime(data['first_historical_data']) if 'first_historical_data' in data else None,
+            last_historical_data=parse_cmc_datetime(data['last_historical_data']) if 'last_historical_data' in data else None,
             platform=data.get('platform')
         ) 
\ No newline at end of file
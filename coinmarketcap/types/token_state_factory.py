@@ -1,6 +1,13 @@
-from typing import Dict
+import time
+import logging
+import dataclasses
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from types import MappingProxyType
 from crypto_commons.types.token_state import TokenState
-from .quote_factory import QuoteFactory
+from crypto_commons.types.quote import Quote
+from .quote_factory import QuoteFactory, QUOTE_FIELDS
+from .compact import CompactTokenState, CompactQuote
+from .datetime_parser import parse_cmc_datetime
 
 # Valid fields that TokenState accepts - filter API response to only these
 VALID_TOKEN_STATE_FIELDS = {
@@ -11,10 +18,21 @@ VALID_TOKEN_STATE_FIELDS = {
     'tvl_ratio', 'is_market_cap_included_in_calc', 'is_active', 'is_fiat'
 }
 
+# Optional attributes set to None when the API response does not include them
+OPTIONAL_TOKEN_STATE_FIELDS = (
+    'num_market_pairs', 'tags', 'max_supply', 'circulating_supply',
+    'total_supply', 'platform', 'cmc_rank', 'self_reported_circulating_supply',
+    'self_reported_market_cap', 'minted_market_cap', 'tvl_ratio', 'creation_date'
+)
+
 
 class TokenStateFactory:
     @staticmethod
-    def from_dict(data: Dict) -> 'TokenState':
+    def from_dict(data: Dict, compact: bool = False) -> 'TokenState':
+        """
+        Create a TokenState from one listings entry. With compact=True a read-only, slotted
+        CompactTokenState (holding CompactQuote objects) is returned instead.
+        """
         data = data.copy()
 
         # Convert 'is_market_cap_included_in_calc' from 0/1 to False/True
@@ -24,7 +42,7 @@ class TokenStateFactory:
         quote_map = {}
         dct_quote_data = data.pop('quote')
         for currency, dct_quote_data in dct_quote_data.items():
-            quote_map[currency] = QuoteFactory.from_dict(currency, dct_quote_data)
+            quote_map[currency] = QuoteFactory.from_dict(currency, dct_quote_data, compact=compact)
         data['quote_map'] = quote_map
 
         # Remap date_added to creation_date
@@ -32,13 +50,7 @@ class TokenStateFactory:
             data['creation_date'] = data.pop('date_added')
 
         # Set optional attributes to None if not present in the data
-        optional_fields = [
-            'num_market_pairs', 'tags', 'max_supply', 'circulating_supply',
-            'total_supply', 'platform', 'cmc_rank', 'self_reported_circulating_supply',
-            'self_reported_market_cap', 'minted_market_cap', 'tvl_ratio', 'creation_date'
-        ]
-
-        for attr_name in optional_fields:
+        for attr_name in OPTIONAL_TOKEN_STATE_FIELDS:
             if attr_name not in data:
                 data[attr_name] = None
 
@@ -46,4 +58,127 @@ class TokenStateFactory:
         # This prevents errors when CoinMarketCap adds new fields to their API
         data = {k: v for k, v in data.items() if k in VALID_TOKEN_STATE_FIELDS}
 
+        if compact:
+            data['quote_map'] = MappingProxyType(data['quote_map'])
+            if data['tags'] is not None:
+                data['tags'] = tuple(data['tags'])
+            return CompactTokenState(**data)
+
         return TokenState(**data)
+
+    @staticmethod
+    def from_list(lst_data: Iterable[Dict], timestamp: Optional[int] = None, compact: bool = False) -> List['TokenState']:
+        """
+        Create TokenStates from a whole listings 'data' array in one pass.
+
+        The result is the same as calling from_dict on every entry with 'timestamp' set to the
+        shared timestamp (default: now), but which keys to keep, rename or coerce is worked out
+        once per distinct key layout (normally once per page) instead of once per row, and the
+        entries are read without being copied or modified.
+        """
+        return list(map(_BatchBuilder(timestamp, compact).token_state, lst_data))
+
+    @staticmethod
+    def iter_from_list(data: Iterable[Dict], timestamp: Optional[int] = None, compact: bool = False) -> Iterator['TokenState']:
+        """Lazy variant of from_list, for entries that arrive one at a time (e.g. from a stream)."""
+        return map(_BatchBuilder(timestamp, compact).token_state, data)
+
+
+class _BatchBuilder(object):
+    """
+    Builds TokenStates (and their Quotes) from listings entries sharing one timestamp.
+
+    API responses repeat one key layout for every entry of a page, so per layout a builder
+    function is generated once (the way dataclasses generate __init__): it reads the present
+    keys straight into a positional constructor call, with renames, coercions and the
+    defaults of absent fields already resolved. Per row that leaves no intermediate dicts and
+    no keyword matching, which is slow for json-decoded keys (they are not interned).
+    """
+
+    def __init__(self, timestamp: Optional[int] = None, compact: bool = False):
+        self.timestamp = int(time.time()) if timestamp is None else timestamp
+        self.compact = compact
+        self._token_builders: Dict[Tuple[str, ...], Optional[Callable]] = {}
+        self._quote_builders: Dict[Tuple[str, ...], Optional[Callable]] = {}
+
+    def token_state(self, dct_token: Dict) -> TokenState:
+        keys = tuple(dct_token)
+        try:
+            build = self._token_builders[keys]
+        except KeyError:
+            build = self._token_builders[keys] = _token_state_builder(keys, self.compact)
+        if build is None:
+            # unusual payload, from_dict raises the appropriate error
+            return TokenStateFactory.from_dict({**dct_token, 'timestamp': self.timestamp}, compact=self.compact)
+
+        quote = self.quote
+        quote_map = {currency: quote(currency, dct_quote) for currency, dct_quote in dct_token['quote'].items()}
+        return build(dct_token, self.timestamp, MappingProxyType(quote_map) if self.compact else quote_map)
+
+    def quote(self, currency: str, dct_quote: Dict) -> Quote:
+        keys = tuple(dct_quote)
+        try:
+            build = self._quote_builders[keys]
+        except KeyError:
+            build = self._quote_builders[keys] = _quote_builder(keys, self.compact)
+        if build is not None:
+            try:
+                return build(currency, dct_quote)
+            except TypeError:
+                # e.g. a null market_cap, which from_dict logs and replaces
+                pass
+
+        # unusual payload, from_dict handles it or raises the appropriate error (it modifies its input, hence the copy)
+        return QuoteFactory.from_dict(currency, dict(dct_quote), compact=self.compact)
+
+
+def _generate_builder(dataclass_type, result_type, keys: Tuple[str, ...], arguments: str,
+                      dct_expressions: Dict[str, str], namespace: Dict) -> Optional[Callable]:
+    # one positional argument expression per dataclass field: given, read from the entry 'd'
+    # or the field's default. None when a required field is missing from keys
+    lst_values = []
+    namespace = dict(namespace, _type=result_type)
+    for field in dataclasses.fields(dataclass_type):
+        if field.name in dct_expressions:
+            lst_values.append(dct_expressions[field.name])
+        elif field.name in keys:
+            lst_values.append(f'd[{field.name!r}]')
+        elif field.default is not dataclasses.MISSING:
+            namespace[f'_default_{field.name}'] = field.default
+            lst_values.append(f'_default_{field.name}')
+        else:
+            return None
+
+    exec(f"def build({arguments}):\n    return _type({', '.join(lst_values)})\n", namespace)
+    return namespace['build']
+
+
+def _token_state_builder(keys: Tuple[str, ...], compact: bool) -> Optional[Callable]:
+    if 'quote' not in keys:
+        return None
+
+    dct_expressions = {'timestamp': 'timestamp', 'quote_map': 'quote_map'}
+    if 'date_added' in keys:
+        dct_expressions['creation_date'] = "d['date_added']"
+    if 'is_market_cap_included_in_calc' in keys:
+        dct_expressions['is_market_cap_included_in_calc'] = "bool(d['is_market_cap_included_in_calc'])"
+    if compact and 'tags' in keys:
+        dct_expressions['tags'] = "_tuple_or_none(d['tags'])"
+
+    return _generate_builder(TokenState, CompactTokenState if compact else TokenState, keys,
+                             'd, timestamp, quote_map', dct_expressions, {'_tuple_or_none': _tuple_or_none})
+
+
+def _quote_builder(keys: Tuple[str, ...], compact: bool) -> Optional[Callable]:
+    time_key = 'last_updated' if 'last_updated' in keys else 'timestamp' if 'timestamp' in keys else None
+    if 'price' not in keys or 'market_cap' not in keys or time_key is None:
+        return None
+
+    dct_expressions = {'base_currency': 'currency', 'price': "float(d['price'])",
+                       'market_cap': "float(d['market_cap'])", 'last_updated': f'_parse(d[{time_key!r}])'}
+    return _generate_builder(Quote, CompactQuote if compact else Quote, keys,
+                             'currency, d', dct_expressions, {'_parse': parse_cmc_datetime})
+
+
+def _tuple_or_none(value):
+    return tuple(value) if value is not None else None
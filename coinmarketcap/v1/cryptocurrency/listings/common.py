@@ -83,3 +83,35 @@ def _validate_interval(interval: str) -> None:
         # If not, raise a ValueError with a message about the invalid interval
         raise ValueError(f"Invalid interval: '{interval}'. Please provide a valid interval.")
 
+def _interval_seconds(interval: str, longest: bool = False) -> int:
+    """
+    Returns the (approximate) length in seconds of one step of a historical quotes interval.
+
+    Calendar intervals use their shortest possible length ('monthly' is 28 days, 'yearly' 365 days):
+    a window sized from a shorter step holds fewer points than it could, never more than expected.
+
+    Parameters:
+        interval (str): A supported interval, see _validate_interval.
+        longest (bool): Use the longest possible length instead ('monthly' is 31 days, 'yearly'
+                        366 days), e.g. to tell when a point can no longer change.
+
+    Returns:
+        int: Number of seconds between two consecutive data points.
+
+    Raises:
+        ValueError: If the provided interval is not in the list of supported formats.
+    """
+    _validate_interval(interval)
+
+    calendar_seconds = {
+        "hourly": (60*60, 60*60),
+        "daily": (60*60*24, 60*60*24),
+        "weekly": (60*60*24*7, 60*60*24*7),
+        "monthly": (60*60*24*28, 60*60*24*31),
+        "yearly": (60*60*24*365, 60*60*24*366)
+    }
+    if interval in calendar_seconds:
+        return calendar_seconds[interval][longest]
+
+    unit_seconds = {"m": 60, "h": 60*60, "d": 60*60*24}
+    return int(interval[:-1]) * unit_seconds[interval[-1]]
@@ -1,18 +1,18 @@
-from typing import List
+from typing import List, Dict, Iterator, Optional
 import time
 
 from crypto_commons.types.token_state import TokenState
 from .common import SortOption, AuxFields, SortDir, FilterOptions
 from coinmarketcap.types.token_state_factory import TokenStateFactory
+from coinmarketcap.pagination import _iter_pages
 
-def _listings_latest(market, 
-					sort_by: SortOption = SortOption.MARKET_CAP, 
+def _listings_latest_params(sort_by: SortOption = SortOption.MARKET_CAP, 
 					sort_dir: SortDir = SortDir.DESC, 
 					start: int = 1, 
 					limit: int = 100, 
 					convert: List[str] = ['USD'],
 					aux_fields: AuxFields = None, 
-					filters: FilterOptions = None) -> List[TokenState]:
+					filters: FilterOptions = None) -> Dict:
 		
 	params = {
 		'sort': sort_by.value,
@@ -21,10 +21,6 @@ def _listings_latest(market,
 		'limit': limit
 	}
 
-	# validate convert
-	if (len(convert) > 3):
-		raise ValueError('The convert list must have a maximum of 3 elements')
-		
 	if convert:
 		params['convert'] = ','.join(convert)
 
@@ -57,12 +53,61 @@ def _listings_latest(market,
 		if filters.tags:
 			params['tag'] = ','.join(filters.tags)
 
-	response = market._request('v1/cryptocurrency/listings/latest', params=params, no_cache=True)
+	return params
+
+
+def _parse_listings_latest(response: Dict, compact: bool = False) -> List[TokenState]:
+	# the API has no per-entry timestamp, every TokenState of the page shares the parse time
+	return TokenStateFactory.from_list(response['data'], timestamp=int(time.time()), compact=compact)
+
+
+def _listings_latest(market, 
+					sort_by: SortOption = SortOption.MARKET_CAP, 
+					sort_dir: SortDir = SortDir.DESC, 
+					start: int = 1, 
+					limit: int = 100, 
+					convert: List[str] = ['USD'],
+					aux_fields: AuxFields = None, 
+					filters: FilterOptions = None,
+					compact: bool = False) -> List[TokenState]:
+
+	params = _listings_latest_params(sort_by, sort_dir, start, limit, convert, aux_fields, filters)
+
+	return market._request_parsed('v1/cryptocurrency/listings/latest', params, _parse_listings_latest, compact=compact)
+
+
+def _iter_listings_latest(market,
+					sort_by: SortOption = SortOption.MARKET_CAP,
+					sort_dir: SortDir = SortDir.DESC,
+					start: int = 1,
+					page_size: int = 1000,
+					max_items: Optional[int] = None,
+					convert: List[str] = ['USD'],
+					aux_fields: AuxFields = None,
+					filters: FilterOptions = None,
+					prefetch: bool = False,
+					compact: bool = False) -> Iterator[TokenState]:
+
+	def fetch_page(page_start: int, page_limit: int) -> List[TokenState]:
+		return _listings_latest(market, sort_by, sort_dir, page_start, page_limit, convert, aux_fields, filters, compact)
+
+	return _iter_pages(fetch_page, start=start, page_size=page_size, max_items=max_items, prefetch=prefetch)
+
+
+def _stream_listings_latest(market,
+					sort_by: SortOption = SortOption.MARKET_CAP,
+					sort_dir: SortDir = SortDir.DESC,
+					start: int = 1,
+					limit: int = 100,
+					convert: List[str] = ['USD'],
+					aux_fields: AuxFields = None,
+					filters: FilterOptions = None,
+					compact: bool = False) -> Iterator[TokenState]:
+
+	params = _listings_latest_params(sort_by, sort_dir, start, limit, convert, aux_fields, filters)
 
-	token_states = []
-	for dct_token in response['data']:
-		# Add timestamp if not present (and not expected to be for this API)
-		dct_token['timestamp'] = int(time.time())
-		token_states.append(TokenStateFactory.from_dict(dct_token))
+	def generate() -> Iterator[TokenState]:
+		stream = market._request_stream('v1/cryptocurrency/listings/latest', params=params, path=['data'])
+		yield from TokenStateFactory.iter_from_list(stream, timestamp=int(time.time()), compact=compact)
 
-	return token_states
+	return generate()
@@ -1,23 +1,30 @@
-from typing import List
-from enum import Enum
+from typing import List, Dict, Iterator, Optional
 from crypto_commons.types.token_info import TokenInfo
 from coinmarketcap.types.token_info_factory import TokenInfoFactory
+from coinmarketcap.pagination import _iter_pages
+from coinmarketcap.v1.cryptocurrency.map_common import ListingStatus, MapSortOption, MapAuxFields
 
-class ListingStatus(Enum):
-    ACTIVE = "active"
-    INACTIVE = "inactive"
-    UNTRACKED = "untracked"
+def _map_params(status: ListingStatus = ListingStatus.ACTIVE,
+                start: int = 1,
+                limit: int = 100,
+                symbols: List[str] = None,
+                sort: MapSortOption = MapSortOption.ID,
+                aux_fields: List[MapAuxFields] = None) -> Dict:
 
-class MapSortOption(Enum):
-    ID = "id"
-    CMC_RANK = "cmc_rank"
+    params = dict()
+    params['listing_status'] = status.value
+    params['start'] = start
+    params['limit'] = limit
+    params['sort'] = sort.value
+    if symbols:
+        params['symbol'] = ','.join(symbols)
+    if aux_fields:
+        params['aux'] = ','.join([field.value for field in aux_fields])
 
+    return params
 
-class MapAuxFields(Enum):
-    PLATFORM = "platform"
-    FIRST_HISTORICAL_DATA = "first_historical_data"
-    LAST_HISTORICAL_DATA = "last_historical_data"
-    IS_ACTIVE = "is_active"
+def _parse_map(response: Dict) -> List[TokenInfo]:
+    return [TokenInfoFactory.from_dict(item) for item in response['data']]
 
 def _map(market, 
          status: ListingStatus = ListingStatus.ACTIVE, 
@@ -27,17 +34,38 @@ def _map(market,
          sort: MapSortOption = MapSortOption.ID, 
          aux_fields: List[MapAuxFields] = None):
 
-    # quick and dirty test
-    params = dict()
-    params['listing_status'] = status.value
-    params['start'] = start
-    params['limit'] = limit
-    params['sort'] = sort.value
-    if symbols:
-        params['symbol'] = ','.join(symbols)
-    if aux_fields:
-        params['aux'] = ','.join([field.value for field in aux_fields])
+    params = _map_params(status, start, limit, symbols, sort, aux_fields)
+
+    return market._request_parsed('v1/cryptocurrency/map', params, _parse_map)
+
+def _iter_map(market,
+              status: ListingStatus = ListingStatus.ACTIVE,
+              start: int = 1,
+              page_size: int = 1000,
+              max_items: Optional[int] = None,
+              symbols: List[str] = None,
+              sort: MapSortOption = MapSortOption.ID,
+              aux_fields: List[MapAuxFields] = None,
+              prefetch: bool = False) -> Iterator[TokenInfo]:
+
+    def fetch_page(page_start: int, page_limit: int) -> List[TokenInfo]:
+        return _map(market, status, page_start, page_limit, symbols, sort, aux_fields)
+
+    return _iter_pages(fetch_page, start=start, page_size=page_size, max_items=max_items, prefetch=prefetch)
+
+
+def _stream_map(market,
+                status: ListingStatus = ListingStatus.ACTIVE,
+                start: int = 1,
+                limit: int = 100,
+                symbols: List[str] = None,
+                sort: MapSortOption = MapSortOption.ID,
+                aux_fields: List[MapAuxFields] = None) -> Iterator[TokenInfo]:
+
+    params = _map_params(status, start, limit, symbols, sort, aux_fields)
+
+    def generate() -> Iterator[TokenInfo]:
+        for item in market._request_stream('v1/cryptocurrency/map', params=params, path=['data']):
+            yield TokenInfoFactory.from_dict(item)
 
-    response = market._request('v1/cryptocurrency/map', params=params)
-   
-    return [TokenInfoFactory.from_dict(item) for item in response['data']]
\ No newline at end of file
+    return generate()
@@ -0,0 +1,17 @@
+from enum import Enum
+
+class ListingStatus(Enum):
+    ACTIVE = "active"
+    INACTIVE = "inactive"
+    UNTRACKED = "untracked"
+
+class MapSortOption(Enum):
+    ID = "id"
+    CMC_RANK = "cmc_rank"
+
+
+class MapAuxFields(Enum):
+    PLATFORM = "platform"
+    FIRST_HISTORICAL_DATA = "first_historical_data"
+    LAST_HISTORICAL_DATA = "last_historical_data"
+    IS_ACTIVE = "is_active"
@@ -1,4 +1,4 @@
-from dateutil import parser  
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
 from datetime import datetime, timezone
 
 def _key_info(market):
@@ -33,8 +33,21 @@ def _safe_daily_call_limit(market):
              and days until the quota reset.
     """
     dct_response = market._request('v1/key/info', no_cache=True)
-    quota_reset_dt = parser.parse(dct_response['data']['plan']['credit_limit_monthly_reset_timestamp'])
-    monthly_calls_remaining = dct_response['data']['usage']['current_month']['credits_left']
+    return _parse_safe_daily_call_limit(dct_response['data'])
+
+
+def _parse_safe_daily_call_limit(dct_key_info):
+    """
+    Computes the safe daily call limit from an already retrieved v1/key/info payload.
+
+    Parameters:
+        dct_key_info (dict): The 'data' section of a v1/key/info response.
+
+    Returns:
+        int: Approximate number of API calls that can be safely made per day.
+    """
+    quota_reset_dt = parse_cmc_datetime(dct_key_info['plan']['credit_limit_monthly_reset_timestamp'])
+    monthly_calls_remaining = dct_key_info['usage']['current_month']['credits_left']
 
     # Ensure the current datetime is timezone-aware with UTC timezone
     now_datetime = datetime.now(timezone.utc)
@@ -6,9 +6,8 @@ from the CoinMarketCap API v2. It includes helpers for validating input paramete
 and functions for fetching and processing historical quotes data.
 """
 
-from typing import Optional, List
+from typing import Optional, List, Dict
 import json
-from dateutil import parser
 import time
 from pprint import pprint
 
@@ -16,39 +15,14 @@ from crypto_commons.types.token_state import TokenState
 from crypto_commons.types.quote import Quote
 from coinmarketcap.v1.cryptocurrency.listings.common import _validate_interval
 from coinmarketcap.types.quote_factory import QuoteFactory
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
 
-def _quotes_historical_v2(market,
-						  id: Optional[str] = None,
+def _quotes_historical_v2_params(id: Optional[str] = None,
 						  ticker: Optional[str] = None,
 						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
 						  timestamp_end: Optional[int] = int(time.time()),
 						  interval: str = 'hourly',
-						  convert: List[str] = ['USD']) -> List[TokenState]:
-	"""
-	Retrieves historical price quotes for a cryptocurrency from the CoinMarketCap API.
-	
-	This function fetches historical price data for a specified cryptocurrency, identified
-	either by its CoinMarketCap ID or by its ticker symbol. The data is returned as a list
-	of TokenState objects, each containing price and market data for a specific point in time.
-	
-	Parameters:
-		market: The CoinMarketCap API market client instance
-		id (Optional[str]): The CoinMarketCap ID of the cryptocurrency (either id or ticker must be provided)
-		ticker (Optional[str]): The ticker symbol of the cryptocurrency (either id or ticker must be provided)
-		timestamp_start (Optional[int]): Unix timestamp for the start of the data range (default: 24 hours ago)
-		timestamp_end (Optional[int]): Unix timestamp for the end of the data range (default: current time)
-		interval (str): Time interval between data points. See _validate_interval for supported values.
-						Default is 'hourly'.
-		convert (List[str]): List of currencies to convert values to (max 3). Default is ['USD'].
-	
-	Returns:
-		List[TokenState]: A list of TokenState objects containing historical price and market data
-						 for the requested cryptocurrency at each time interval.
-	
-	Raises:
-		ValueError: If neither id nor ticker is provided, if timestamps are invalid,
-					if the interval is invalid, or if more than 3 conversion currencies are specified.
-	"""
+						  convert: List[str] = ['USD']) -> Dict:
 	if not id and not ticker:
 		raise ValueError('Either id or ticker must be provided')
 
@@ -59,10 +33,6 @@ def _quotes_historical_v2(market,
 	# Check if the interval is valid
 	_validate_interval(interval)
 
-	# validate convert
-	if (len(convert) > 3):
-		raise ValueError('The convert list must have a maximum of 3 elements')
-
 	params = {
 		'time_start': timestamp_start,
 		'time_end': timestamp_end,
@@ -76,8 +46,10 @@ def _quotes_historical_v2(market,
 	else:
 		params['symbol'] = ticker
 		
-	response = market._request('v2/cryptocurrency/quotes/historical', params=params)
+	return params
+
 
+def _parse_quotes_historical_v2(response: Dict, id: Optional[str] = None, ticker: Optional[str] = None) -> List[TokenState]:
 	lst_token_states = []
 
 	if id:
@@ -114,7 +86,7 @@ def _quotes_historical_v2(market,
 	for dct_quote_block in lst_quotes:
 
 		# Parse the timestamp string into a datetime object
-		timestamp_dt = parser.parse(dct_quote_block['timestamp'])
+		timestamp_dt = parse_cmc_datetime(dct_quote_block['timestamp'])
 
 		# create a token state, the quotes are empty for now
 		token_state = TokenState(
@@ -135,3 +107,40 @@ def _quotes_historical_v2(market,
 		lst_token_states.append(token_state)
 
 	return lst_token_states
+
+
+def _quotes_historical_v2(market,
+						  id: Optional[str] = None,
+						  ticker: Optional[str] = None,
+						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
+						  timestamp_end: Optional[int] = int(time.time()),
+						  interval: str = 'hourly',
+						  convert: List[str] = ['USD']) -> List[TokenState]:
+	"""
+	Retrieves historical price quotes for a cryptocurrency from the CoinMarketCap API.
+	
+	This function fetches historical price data for a specified cryptocurrency, identified
+	either by its CoinMarketCap ID or by its ticker symbol. The data is returned as a list
+	of TokenState objects, each containing price and market data for a specific point in time.
+	
+	Parameters:
+		market: The CoinMarketCap API market client instance
+		id (Optional[str]): The CoinMarketCap ID of the cryptocurrency (either id or ticker must be provided)
+		ticker (Optional[str]): The ticker symbol of the cryptocurrency (either id or ticker must be provided)
+		timestamp_start (Optional[int]): Unix timestamp for the start of the data range (default: 24 hours ago)
+		timestamp_end (Optional[int]): Unix timestamp for the end of the data range (default: current time)
+		interval (str): Time interval between data points. See _validate_interval for supported values.
+						Default is 'hourly'.
+		convert (List[str]): List of currencies to convert values to. More than 3 are fetched in concurrent calls of 3 and merged. Default is ['USD'].
+	
+	Returns:
+		List[TokenState]: A list of TokenState objects containing historical price and market data
+						 for the requested cryptocurrency at each time interval.
+	
+	Raises:
+		ValueError: If neither id nor ticker is provided, if timestamps are invalid,
+					or if the interval is invalid.
+	"""
+	params = _quotes_historical_v2_params(id, ticker, timestamp_start, timestamp_end, interval, convert)
+
+	return market._request_parsed('v2/cryptocurrency/quotes/historical', params, _parse_quotes_historical_v2, id=id, ticker=ticker)
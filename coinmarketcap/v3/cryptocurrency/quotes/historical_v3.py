@@ -1,44 +1,24 @@
-from typing import Optional, List
+from typing import Optional, List, Dict, Union, Iterator
 import time
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dateutil import parser
 from crypto_commons.types.token_state import TokenState
 from crypto_commons.types.quote import Quote
 from coinmarketcap.v1.cryptocurrency.listings.common import _validate_interval
 from coinmarketcap.types.quote_factory import QuoteFactory
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
+from coinmarketcap.types.historical_series import HistoricalSeries
+from coinmarketcap.types.historical_series_factory import HistoricalSeriesFactory
+from coinmarketcap.types.compact import CompactTokenState
+from coinmarketcap.scheduler import _with_current_context
 
-def _quotes_historical_v3(market,
-						  id: Optional[str] = None,
+def _quotes_historical_v3_params(id: Optional[str] = None,
 						  ticker: Optional[str] = None,
 						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
 						  timestamp_end: Optional[int] = int(time.time()),
 						  interval: str = 'hourly',
-						  convert: List[str] = ['USD']) -> List[TokenState]:
-	"""
-	Retrieves historical price quotes for a cryptocurrency from the CoinMarketCap API.
-	
-	This function fetches historical price data for a specified cryptocurrency, identified
-	either by its CoinMarketCap ID or by its ticker symbol. The data is returned as a list
-	of TokenState objects, each containing price and market data for a specific point in time.
-	
-	Parameters:
-		market: The CoinMarketCap API market client instance
-		id (Optional[str]): The CoinMarketCap ID of the cryptocurrency (either id or ticker must be provided)
-		ticker (Optional[str]): The ticker symbol of the cryptocurrency (either id or ticker must be provided)
-		timestamp_start (Optional[int]): Unix timestamp for the start of the data range (default: 24 hours ago)
-		timestamp_end (Optional[int]): Unix timestamp for the end of the data range (default: current time)
-		interval (str): Time interval between data points. See _validate_interval for supported values.
-						Default is 'hourly'.
-		convert (List[str]): List of currencies to convert values to (max 3). Default is ['USD'].
-	
-	Returns:
-		List[TokenState]: A list of TokenState objects containing historical price and market data
-						 for the requested cryptocurrency at each time interval.
-	
-	Raises:
-		ValueError: If neither id nor ticker is provided, if timestamps are invalid,
-					if the interval is invalid, or if more than 3 conversion currencies are specified.
-	"""
+						  convert: List[str] = ['USD']) -> Dict:
 	if not id and not ticker:
 		raise ValueError('Either id or ticker must be provided')
 
@@ -49,10 +29,6 @@ def _quotes_historical_v3(market,
 	# Check if the interval is valid
 	_validate_interval(interval)
 
-	# validate convert
-	if (len(convert) > 3):
-		raise ValueError('The convert list must have a maximum of 3 elements')
-
 	params = {
 		'time_start': timestamp_start,
 		'time_end': timestamp_end,
@@ -66,20 +42,11 @@ def _quotes_historical_v3(market,
 	else:
 		params['symbol'] = ticker
 		
-	response = market._request('v3/cryptocurrency/quotes/historical', params=params)
+	return params
 
-	lst_token_states = []
 
-	if id:
-		# if we are querying by id, we get a simpler (although not completely simple)
-		# structure to parse
-		dct_quote_summary = response['data'][id]
-	else:
-		# if we query by ticker we get a differeint weird structure, we have to 
-		# drill down into the quotes object for our ticker, we call this the quote 
-	    # summary because it's the quotes, plus some extra
-		# meta data we can extract for the TokenState object
-		dct_quote_summary = response['data'][ticker][0]
+def _token_states_from_quote_summary(dct_quote_summary: Dict, id: Optional[str] = None, compact: bool = False) -> List[TokenState]:
+	lst_token_states = []
 
 	# and we also get some general meta-data that can go into the TokenState object
 	try:
@@ -103,26 +70,242 @@ def _quotes_historical_v3(market,
 
 	# for each quote block, we can create a token state
 	for dct_quote_block in lst_quotes:
-
-		# Parse the timestamp string into a datetime object
-		timestamp_dt = parser.parse(dct_quote_block['timestamp'])
-
-		# create a token state, the quotes are empty for now
-		token_state = TokenState(
-			id=int(id),
-			name=name,
-			symbol=symbol,
-			last_updated=timestamp_dt,
-			timestamp=int(timestamp_dt.timestamp()),
-			is_active=is_active,
-			quote_map={},
-			is_fiat=is_fiat)
-
-		# init each quote object and add it to the tokenstate
-		for base_currency, dct_quote_data in dct_quote_block['quote'].items():
-			quote = QuoteFactory.from_dict(base_currency, dct_quote_data)
-			token_state.quote_map[base_currency] = quote
-					
-		lst_token_states.append(token_state)
+		lst_token_states.append(_token_state_from_quote_block(dct_quote_block, id, name, symbol, is_active, is_fiat, compact))
 
 	return lst_token_states
+
+
+def _token_state_from_quote_block(dct_quote_block: Dict, id, name: str, symbol: str, is_active: bool, is_fiat: bool,
+								  compact: bool = False) -> TokenState:
+	# Parse the timestamp string into a datetime object
+	timestamp_dt = parse_cmc_datetime(dct_quote_block['timestamp'])
+
+	# init each quote object
+	quote_map = {}
+	for base_currency, dct_quote_data in dct_quote_block['quote'].items():
+		quote_map[base_currency] = QuoteFactory.from_dict(base_currency, dct_quote_data, compact=compact)
+
+	token_state_type = CompactTokenState if compact else TokenState
+	return token_state_type(
+		id=int(id),
+		name=name,
+		symbol=symbol,
+		last_updated=timestamp_dt,
+		timestamp=int(timestamp_dt.timestamp()),
+		is_active=is_active,
+		quote_map=MappingProxyType(quote_map) if compact else quote_map,
+		is_fiat=is_fiat)
+
+
+def _parse_quotes_historical_v3(response: Dict, id: Optional[str] = None, ticker: Optional[str] = None, compact: bool = False) -> List[TokenState]:
+	if id:
+		# if we are querying by id, we get a simpler (although not completely simple)
+		# structure to parse
+		dct_quote_summary = response['data'][id]
+	else:
+		# if we query by ticker we get a differeint weird structure, we have to 
+		# drill down into the quotes object for our ticker, we call this the quote 
+	    # summary because it's the quotes, plus some extra
+		# meta data we can extract for the TokenState object
+		dct_quote_summary = response['data'][ticker][0]
+
+	return _token_states_from_quote_summary(dct_quote_summary, id=id, compact=compact)
+
+
+def _parse_quotes_historical_v3_columnar(response: Dict, id: Optional[str] = None, ticker: Optional[str] = None) -> HistoricalSeries:
+	if id:
+		dct_quote_summary = response['data'][id]
+	else:
+		dct_quote_summary = response['data'][ticker][0]
+
+	return HistoricalSeriesFactory.from_quote_summary(dct_quote_summary, id=id)
+
+
+def _quotes_historical_v3(market,
+						  id: Optional[str] = None,
+						  ticker: Optional[str] = None,
+						  timestamp_start: Optional[int] = int(time.time()) - 60*60*24,
+						  timestamp_end: Optional[int] = int(time.time()),
+						  interval: str = 'hourly',
+						  convert: List[str] = ['USD'],
+						  compact: bool = False) -> List[TokenState]:
+	"""
+	Retrieves historical price quotes for a cryptocurrency from the CoinMarketCap API.
+	
+	This function fetches historical price data for a specified cryptocurrency, identified
+	either by its CoinMarketCap ID or by its ticker symbol. The data is returned as a list
+	of TokenState objects, each containing price and market data for a specific point in time.
+	
+	Parameters:
+		market: The CoinMarketCap API market client instance
+		id (Optional[str]): The CoinMarketCap ID of the cryptocurrency (either id or ticker must be provided)
+		ticker (Optional[str]): The ticker symbol of the cryptocurrency (either id or ticker must be provided)
+		timestamp_start (Optional[int]): Unix timestamp for the start of the data range (default: 24 hours ago)
+		timestamp_end (Optional[int]): Unix timestamp for the end of the data range (default: current time)
+		interval (str): Time interval between data points. See _validate_interval for supported values.
+						Default is 'hourly'.
+		convert (List[str]): List of currencies to convert values to. More than 3 are fetched in concurrent calls of 3 and merged. Default is ['USD'].
+		compact (bool): Return read-only CompactTokenState objects instead of TokenState.
+	
+	Returns:
+		List[TokenState]: A list of TokenState objects containing historical price and market data
+						 for the requested cryptocurrency at each time interval.
+	
+	Raises:
+		ValueError: If neither id nor ticker is provided, if timestamps are invalid,
+					or if the interval is invalid.
+	"""
+	params = _quotes_historical_v3_params(id, ticker, timestamp_start, timestamp_end, interval, convert)
+
+	return market._request_parsed('v3/cryptocurrency/quotes/historical', params, _parse_quotes_historical_v3, id=id, ticker=ticker, compact=compact)
+
+
+def _quotes_historical_v3_columnar(market,
+								  id: Optional[str] = None,
+								  ticker: Optional[str] = None,
+								  timestamp_start: Optional[int] = None,
+								  timestamp_end: Optional[int] = None,
+								  interval: str = 'hourly',
+								  convert: List[str] = ['USD']) -> HistoricalSeries:
+	"""
+	Retrieves historical price quotes like _quotes_historical_v3, but returns them as a single
+	HistoricalSeries of NumPy arrays instead of one TokenState per point.
+
+	Raises:
+		ImportError: If numpy is not installed.
+		ValueError: Same validations as _quotes_historical_v3.
+	"""
+	if timestamp_end is None:
+		timestamp_end = int(time.time())
+	if timestamp_start is None:
+		timestamp_start = timestamp_end - 60*60*24
+
+	params = _quotes_historical_v3_params(id, ticker, timestamp_start, timestamp_end, interval, convert)
+
+	return market._request_parsed('v3/cryptocurrency/quotes/historical', params, _parse_quotes_historical_v3_columnar, id=id, ticker=ticker)
+
+
+def _stream_quotes_historical_v3(market,
+								 id: Optional[str] = None,
+								 ticker: Optional[str] = None,
+								 timestamp_start: Optional[int] = None,
+								 timestamp_end: Optional[int] = None,
+								 interval: str = 'hourly',
+								 convert: List[str] = ['USD'],
+								 compact: bool = False) -> Iterator[TokenState]:
+	"""
+	Streaming variant of _quotes_historical_v3: quote blocks are decoded from the response
+	body as it arrives and yielded as TokenState objects, without ever holding the whole
+	document in memory. Arguments are validated before the request is sent.
+
+	Raises:
+		ValueError: Same validations as _quotes_historical_v3, or if the streamed body is malformed.
+	"""
+	if timestamp_end is None:
+		timestamp_end = int(time.time())
+	if timestamp_start is None:
+		timestamp_start = timestamp_end - 60*60*24
+
+	params = _quotes_historical_v3_params(id, ticker, timestamp_start, timestamp_end, interval, convert)
+	path = ['data', str(id), 'quotes'] if id else ['data', ticker, 0, 'quotes']
+
+	def generate() -> Iterator[TokenState]:
+		stream = market._request_stream('v3/cryptocurrency/quotes/historical', params=params, path=path)
+		lst_pending = []
+		meta = None
+
+		for dct_quote_block in stream:
+			if meta is None:
+				meta = _quote_summary_meta(stream.siblings, id)
+			if meta is None:
+				# the summary fields come after 'quotes' in this response, hold blocks until they are read
+				lst_pending.append(dct_quote_block)
+			else:
+				yield _token_state_from_quote_block(dct_quote_block, *meta, compact=compact)
+
+		if lst_pending:
+			meta = _quote_summary_meta(stream.finish(), id, required=True)
+			for dct_quote_block in lst_pending:
+				yield _token_state_from_quote_block(dct_quote_block, *meta, compact=compact)
+
+	return generate()
+
+
+def _quote_summary_meta(dct_summary: Dict, id: Optional[str] = None, required: bool = False):
+	try:
+		return (id or dct_summary['id'], dct_summary['name'], dct_summary['symbol'],
+				dct_summary['is_active'] == 1, dct_summary['is_fiat'] == 1)
+	except KeyError as e:
+		if required:
+			raise ValueError(f"Required field '{str(e)}' is missing from API response. Response data might be malformed or incomplete.")
+		return None
+
+
+def _quotes_historical_many(market,
+							ids: List[Union[int, str]],
+							timestamp_start: Optional[int] = None,
+							timestamp_end: Optional[int] = None,
+							interval: str = 'hourly',
+							convert: List[str] = ['USD'],
+							batch_size: int = 100,
+							max_workers: int = 4) -> Dict[int, List[TokenState]]:
+	"""
+	Retrieves historical price quotes for many cryptocurrencies, several ids per API call.
+
+	The v3 endpoint accepts a comma separated list of ids and returns 'data' keyed by id, so
+	ids are packed into batches of batch_size and the batches are fetched over a bounded
+	thread pool. Requests go through the market's sessions, so any configured rate limit
+	applies across all threads.
+
+	Parameters:
+		market: The CoinMarketCap API market client instance
+		ids (List[Union[int, str]]): CoinMarketCap ids of the cryptocurrencies to fetch
+		timestamp_start (Optional[int]): Unix timestamp for the start of the data range (default: 24 hours ago)
+		timestamp_end (Optional[int]): Unix timestamp for the end of the data range (default: current time)
+		interval (str): Time interval between data points. See _validate_interval for supported values.
+		convert (List[str]): List of currencies to convert values to. More than 3 are fetched in concurrent calls of 3 and merged. Default is ['USD'].
+		batch_size (int): Maximum number of ids per API call. Default is 100.
+		max_workers (int): Maximum number of batches in flight at once. Default is 4.
+
+	Returns:
+		Dict[int, List[TokenState]]: TokenState lists keyed by id, in the same order as ids.
+									 Ids the API returned no data for map to an empty list.
+
+	Raises:
+		ValueError: If no ids are given, batch_size or max_workers are lower than 1, or any
+					of the validations of _quotes_historical_v3 fail.
+	"""
+	if not ids:
+		raise ValueError('At least one id must be provided')
+
+	if batch_size < 1 or max_workers < 1:
+		raise ValueError('batch_size and max_workers must be at least 1')
+
+	if timestamp_end is None:
+		timestamp_end = int(time.time())
+	if timestamp_start is None:
+		timestamp_start = timestamp_end - 60*60*24
+
+	# dedupe while keeping the caller's order
+	lst_ids = list(dict.fromkeys(str(id) for id in ids))
+	lst_batches = [lst_ids[i:i + batch_size] for i in range(0, len(lst_ids), batch_size)]
+
+	# validates the shared arguments once, before anything is sent
+	_quotes_historical_v3_params(lst_ids[0], None, timestamp_start, timestamp_end, interval, convert)
+
+	def fetch_batch(lst_batch_ids: List[str]) -> Dict:
+		params = _quotes_historical_v3_params(','.join(lst_batch_ids), None, timestamp_start, timestamp_end, interval, convert)
+		return market._request('v3/cryptocurrency/quotes/historical', params=params)
+
+	if len(lst_batches) == 1:
+		lst_responses = [fetch_batch(lst_batches[0])]
+	else:
+		with ThreadPoolExecutor(max_workers=min(max_workers, len(lst_batches))) as executor:
+			lst_responses = list(executor.map(_with_current_context(fetch_batch), lst_batches))
+
+	dct_results = {int(id): [] for id in lst_ids}
+	for response in lst_responses:
+		for str_id, dct_quote_summary in response.get('data', {}).items():
+			dct_results[int(str_id)] = _token_states_from_quote_summary(dct_quote_summary, id=str_id)
+
+	return dct_results
@@ -0,0 +1,16 @@
+from enum import Enum
+
+# Most ids sent in one call, and longest comma separated id list, keeping URLs well below the
+# ~8 KB many proxies and servers accept
+DEX_MAX_BATCH_IDS = 100
+DEX_MAX_ID_CHARS = 2000
+
+# How long bulk lookups keep each DexInfo, DEX metadata (name, urls, launch date) rarely changes
+DEX_RECORD_TTL = 7*24*60*60
+
+class DexAuxFields(Enum):
+    URLS = "urls"
+    LOGO = "logo"
+    DESCRIPTION = "description"
+    DATE_LAUNCHED = "date_launched"
+    NOTICE = "notice"
@@ -1,14 +1,36 @@
-from typing import List, Optional, Union
-from enum import Enum
+import math
+from typing import List, Optional, Union, Dict, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from coinmarketcap.types.dex_info import DexInfo
 from coinmarketcap.types.dex_info_factory import DexInfoFactory
+from coinmarketcap.scheduler import _with_current_context
+from coinmarketcap.v4.dex.listings.common import DexAuxFields, DEX_MAX_BATCH_IDS, DEX_MAX_ID_CHARS, DEX_RECORD_TTL
 
-class DexAuxFields(Enum):
-    URLS = "urls"
-    LOGO = "logo"
-    DESCRIPTION = "description"
-    DATE_LAUNCHED = "date_launched"
-    NOTICE = "notice"
+def _dex_listings_info_params(ids: Union[int, List[int]],
+                              aux_fields: Optional[List[DexAuxFields]] = None) -> Dict:
+    if not ids:
+        raise ValueError("At least one DEX ID must be provided")
+
+    # Convert single ID to list
+    if isinstance(ids, int):
+        ids = [ids]
+
+    params = {
+        'id': ','.join(map(str, ids))
+    }
+
+    if aux_fields:
+        aux_field_values = [field.value for field in aux_fields]
+        params['aux'] = ','.join(aux_field_values)
+
+    return params
+
+def _parse_dex_listings_info(response: Dict) -> List[DexInfo]:
+    dex_list = []
+    for dex_data in response.get('data', []):
+        dex_list.append(DexInfoFactory.from_dict(dex_data))
+
+    return dex_list
 
 def _dex_listings_info(market,
                       ids: Union[int, List[int]],
@@ -31,25 +53,103 @@ def _dex_listings_info(market,
         ValueError: If no IDs are provided
     """
 
+    params = _dex_listings_info_params(ids, aux_fields)
+
+    return market._request_parsed('v4/dex/listings/info', params, _parse_dex_listings_info)
+
+
+def _dex_id_batches(ids: List[int], max_ids: int = DEX_MAX_BATCH_IDS, max_chars: int = DEX_MAX_ID_CHARS) -> List[List[int]]:
+    """
+    Splits ids into the fewest batches respecting max_ids and max_chars (the length of the
+    joined id list), sized evenly so no call is left with a handful of ids.
+    """
     if not ids:
+        return []
+
+    total_chars = sum(len(str(id)) + 1 for id in ids)
+    num_batches = max(math.ceil(len(ids) / max_ids), math.ceil(total_chars / max_chars))
+    target = math.ceil(len(ids) / num_batches)
+
+    lst_batches, lst_batch, batch_chars = [], [], 0
+    for id in ids:
+        id_chars = len(str(id)) + 1
+        if lst_batch and (len(lst_batch) >= target or batch_chars + id_chars > max_chars):
+            lst_batches.append(lst_batch)
+            lst_batch, batch_chars = [], 0
+        lst_batch.append(id)
+        batch_chars += id_chars
+    lst_batches.append(lst_batch)
+    return lst_batches
+
+def _dex_listings_info_bulk(market,
+                            ids: Iterable[int],
+                            aux_fields: Optional[List[DexAuxFields]] = None,
+                            batch_size: int = DEX_MAX_BATCH_IDS,
+                            max_workers: int = 4,
+                            ttl: float = DEX_RECORD_TTL) -> Dict[int, DexInfo]:
+    """
+    Get information about any number of DEXs, caching each record by id.
+
+    Ids already in the market's record cache (for the same aux_fields) are served from it.
+    The others are split into batches of at most batch_size ids, keeping each URL short,
+    and the batches are fetched concurrently on up to max_workers threads. Every DexInfo
+    received is cached on its own for ttl seconds, so later lookups of overlapping id sets
+    only request the ids they have not seen.
+
+    Args:
+        market: The Market instance
+        ids: DEX ids to retrieve, duplicates are looked up once
+        aux_fields: Additional fields to include (urls, logo, description, date_launched, notice)
+        batch_size: Maximum ids per API call
+        max_workers: Maximum concurrent API calls
+        ttl: Seconds each record stays cached
+
+    Returns:
+        DexInfo objects keyed by id, in the order of ids. Ids the API returned nothing for are left out.
+
+    Raises:
+        ValueError: If no IDs are provided, or batch_size or max_workers are lower than 1
+    """
+    # dedupe while keeping the caller's order
+    lst_ids = list(dict.fromkeys(int(id) for id in ids))
+    if not lst_ids:
         raise ValueError("At least one DEX ID must be provided")
 
-    # Convert single ID to list
-    if isinstance(ids, int):
-        ids = [ids]
+    if batch_size < 1 or max_workers < 1:
+        raise ValueError('batch_size and max_workers must be at least 1')
 
-    params = {
-        'id': ','.join(map(str, ids))
-    }
+    cache = market.record_cache
+    aux_key = tuple(sorted(field.value for field in aux_fields)) if aux_fields else ()
 
-    if aux_fields:
-        aux_field_values = [field.value for field in aux_fields]
-        params['aux'] = ','.join(aux_field_values)
+    def cache_key(id: int):
+        return ('v4/dex/listings/info', market.base_url, aux_key, id)
 
-    response = market._request('v4/dex/listings/info', params=params, no_cache=True)
+    dct_found = {}
+    lst_missing = []
+    for id in lst_ids:
+        dex_info = cache.get(cache_key(id))
+        if dex_info is None:
+            lst_missing.append(id)
+        else:
+            dct_found[id] = dex_info
 
-    dex_list = []
-    for dex_data in response.get('data', []):
-        dex_list.append(DexInfoFactory.from_dict(dex_data))
+    def fetch_batch(lst_batch_ids: List[int]) -> List[DexInfo]:
+        params = _dex_listings_info_params(lst_batch_ids, aux_fields)
+        # the records are cached one by one below, caching the whole body as well would only duplicate them
+        return market._request_parsed('v4/dex/listings/info', params, _parse_dex_listings_info, no_cache=True)
+
+    lst_batches = _dex_id_batches(lst_missing, max_ids=batch_size)
+    if len(lst_batches) == 1:
+        lst_results = [fetch_batch(lst_batches[0])]
+    elif lst_batches:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(lst_batches))) as executor:
+            lst_results = list(executor.map(_with_current_context(fetch_batch), lst_batches))
+    else:
+        lst_results = []
+
+    for lst_dex_info in lst_results:
+        for dex_info in lst_dex_info:
+            cache.set(cache_key(dex_info.id), dex_info, ttl)
+            dct_found[dex_info.id] = dex_info
 
-    return dex_list
\ No newline at end of file
+    return {id: dct_found[id] for id in lst_ids if id in dct_found}
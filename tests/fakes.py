@@ -0,0 +1,83 @@
+"""Fake transports, API payloads and clocks shared by the tests."""
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+
+MAP_RESPONSE = {
+    "status": {"error_code": 0, "credit_count": 1},
+    "data": [{"id": 1, "rank": 1, "name": "Bitcoin", "symbol": "BTC", "slug": "bitcoin", "is_active": 1},
+             {"id": 1027, "rank": 2, "name": "Ethereum", "symbol": "ETH", "slug": "ethereum", "is_active": 1}]
+}
+
+
+def key_info(credits_left, days_to_reset=30):
+    """The 'data' of a v1/key/info response."""
+    reset = datetime.now(timezone.utc) + timedelta(days=days_to_reset)
+    return {
+        "plan": {"credit_limit_monthly_reset_timestamp": reset.strftime('%Y-%m-%dT%H:%M:%S.000Z')},
+        "usage": {"current_month": {"credits_left": credits_left}}
+    }
+
+
+class FakeResponse(object):
+    """Stands in for a requests.Response, every json() call decodes a fresh copy."""
+
+    def __init__(self, status_code=200, payload=MAP_RESPONSE, headers=None, from_cache=False):
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+        self.content = self.text.encode('utf-8')
+        self.headers = headers or {}
+        self.from_cache = from_cache
+        self.elapsed = timedelta(milliseconds=20)
+
+    def json(self):
+        return json.loads(self.text)
+
+    def close(self):
+        pass
+
+
+class FakeSession(object):
+    """
+    Stands in for a requests session. respond(url, params, **kwargs) returns the response or the
+    exception to raise. The urls, params and threads of the calls are recorded.
+    """
+
+    def __init__(self, respond=None):
+        if respond is not None:
+            self.respond = respond
+        self.calls = []
+        self.params = []
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        with self._lock:
+            self.calls.append(url)
+            self.params.append(params)
+            self.threads.add(threading.get_ident())
+        outcome = self.respond(url, params, **kwargs)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+class ScriptedSession(FakeSession):
+    """Returns (or raises) the scripted outcomes in order."""
+
+    def __init__(self, *outcomes):
+        super().__init__()
+        self.outcomes = list(outcomes)
+
+    def respond(self, url, params, **kwargs):
+        return self.outcomes.pop(0)
+
+
+class Clock(object):
+    """A settable clock, for code taking a clock callable."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
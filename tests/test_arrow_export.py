@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from coinmarketcap import Market, ArrowExporter
+from coinmarketcap.arrow_export import _ColumnBuffer, _quote_columns, LISTING_COLUMNS, HISTORICAL_COLUMNS
+from coinmarketcap.streaming import _JsonArrayStream
+
+
+def _listing(id, price):
+    return {"id": id, "name": f"Coin {id}", "symbol": f"C{id}", "slug": f"coin-{id}", "cmc_rank": id,
+            "num_market_pairs": 10, "circulating_supply": 1000, "total_supply": 2000, "max_supply": None,
+            "infinite_supply": False, "date_added": "2020-01-01T00:00:00.000Z", "last_updated": "2024-03-01T12:00:00.000Z",
+            "tags": ["mineable"], "platform": {"id": 1027, "token_address": "0xabc"} if id % 2 else None,
+            "quote": {"USD": {"price": price, "volume_24h": 5, "market_cap": price * 1000,
+                              "last_updated": "2024-03-01T12:00:00.000Z"}}}
+
+
+class _StreamingApi(object):
+    """Serves listings pages and a historical response through _JsonArrayStream, like _request_stream."""
+
+    def __init__(self, total=5):
+        self.total = total
+        self.requests = []
+
+    def __call__(self, endpoint, params={}, path=('data',)):
+        self.requests.append(params)
+        if endpoint == 'v3/cryptocurrency/quotes/historical':
+            # summary fields after 'quotes', as CoinMarketCap sends them for some assets
+            body = {"data": {params['id']: {"quotes": [
+                {"timestamp": "2024-03-01T00:00:00.000Z", "quote": {"USD": {"price": 1.5}, "EUR": {"price": 1.4}}},
+                {"timestamp": "2024-03-01T01:00:00.000Z", "quote": {"USD": {"price": 1.6}}}],
+                "id": int(params['id']), "name": "Bitcoin", "symbol": "BTC", "is_active": 1, "is_fiat": 0}}}
+        else:
+            start, limit = params['start'], params['limit']
+            body = {"data": [_listing(id, float(id)) for id in range(start, min(start + limit, self.total + 1))]}
+        return _JsonArrayStream([json.dumps(body).encode('utf-8')], path)
+
+
+def test_items_are_flattened_per_convert_currency():
+    buffer = _ColumnBuffer(LISTING_COLUMNS + _quote_columns(['USD', 'EUR']))
+    buffer.append(_listing(1, 2.5))
+    buffer.append(_listing(2, 3.5))
+
+    dct_columns = {name: values for (name, _, _), values in zip(buffer.columns, buffer._values)}
+    assert dct_columns['usd_price'] == [2.5, 3.5]
+    assert dct_columns['usd_market_cap'] == [2500.0, 3500.0]
+    # EUR was not in the response, its columns are null rather than missing
+    assert dct_columns['eur_price'] == [None, None]
+    assert dct_columns['platform_id'] == [1027, None]
+    assert dct_columns['last_updated'][0] == 1709294400000
+    assert dct_columns['max_supply'] == [None, None]
+
+
+def test_historical_rows_take_the_summary_fields_after_quotes():
+    market = Market(api_key="test")
+    market._request_stream = _StreamingApi()
+    exporter = ArrowExporter(market)
+
+    buffer = _ColumnBuffer(HISTORICAL_COLUMNS)
+    assert [name for name, _, _ in buffer.columns] == ['id', 'name', 'symbol', 'timestamp']
+    pytest.importorskip('pyarrow')
+
+    batch = next(exporter.quotes_historical_v3([1], timestamp_start=0, timestamp_end=3600, convert=['USD', 'EUR']))
+    assert batch.column('symbol').to_pylist() == ['BTC', 'BTC']
+    assert batch.column('eur_price').to_pylist() == [1.4, None]
+
+
+def test_listings_are_written_one_row_group_per_page(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    market = Market(api_key="test")
+    market._request_stream = api = _StreamingApi(total=5)
+    exporter = ArrowExporter(market)
+
+    rows = exporter.write(exporter.listings_latest(convert=['USD'], page_size=2), str(tmp_path / 'listings.parquet'))
+
+    assert rows == 5
+    assert [params['start'] for params in api.requests] == [1, 3, 5]
+    parquet_file = pq.ParquetFile(str(tmp_path / 'listings.parquet'))
+    assert parquet_file.num_row_groups == 3
+    table = parquet_file.read()
+    assert table.column('usd_price').to_pylist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert str(table.schema.field('last_updated').type) == 'timestamp[ms, tz=UTC]'
+
+
+def test_unknown_format_is_rejected():
+    exporter = ArrowExporter(Market(api_key="test"))
+    with pytest.raises(ValueError):
+        exporter.write([], 'listings.csv')
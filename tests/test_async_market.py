@@ -0,0 +1,173 @@
+import asyncio
+import json
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from coinmarketcap import AsyncMarket, Market
+from crypto_commons.types.token_state import TokenState
+
+
+LISTINGS_RESPONSE = {
+    "status": {"error_code": 0, "credit_count": 1},
+    "data": [
+        {
+            "id": 1, "name": "Bitcoin", "symbol": "BTC", "slug": "bitcoin",
+            "cmc_rank": 1, "num_market_pairs": 11000, "circulating_supply": 19700000,
+            "total_supply": 19700000, "max_supply": 21000000, "infinite_supply": False,
+            "last_updated": "2024-06-01T12:00:00.000Z", "date_added": "2010-07-13T00:00:00.000Z",
+            "tags": ["mineable"], "platform": None,
+            "quote": {
+                "USD": {
+                    "price": 67000, "volume_24h": 25000000000.5, "volume_change_24h": 1.2,
+                    "percent_change_1h": 0.1, "percent_change_24h": 1.5, "percent_change_7d": 3.2,
+                    "percent_change_30d": 8.1, "market_cap": 1300000000000,
+                    "market_cap_dominance": 52.1, "fully_diluted_market_cap": 1400000000000,
+                    "last_updated": "2024-06-01T12:00:00.000Z"
+                }
+            }
+        }
+    ]
+}
+
+
+def _handler(request):
+    if request.url.path == '/v1/cryptocurrency/listings/latest':
+        return httpx.Response(200, json=LISTINGS_RESPONSE)
+    if request.url.path == '/v3/fear-and-greed/historical':
+        return httpx.Response(200, json={"data": [{"timestamp": "1717200000", "value": 70, "value_classification": "Greed"}]})
+    return httpx.Response(500, text="boom")
+
+
+def test_async_listings_latest_matches_sync_parsing(monkeypatch):
+    async def run():
+        async with AsyncMarket(api_key="test", transport=httpx.MockTransport(_handler)) as market:
+            return await market.listings_latest(limit=1)
+
+    token_states = asyncio.run(run())
+
+    sync_market = Market(api_key="test")
+    monkeypatch.setattr(sync_market, '_request', lambda *args, **kwargs: json.loads(json.dumps(LISTINGS_RESPONSE)))
+    expected = sync_market.listings_latest(limit=1)
+
+    assert len(token_states) == 1
+    assert isinstance(token_states[0], TokenState)
+    assert token_states[0].quote_map == expected[0].quote_map
+    assert token_states[0].creation_date == expected[0].creation_date
+
+
+def test_async_concurrency_is_bounded():
+    in_flight = 0
+    peak = 0
+
+    async def slow_handler(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return _handler(request)
+
+    async def run():
+        async with AsyncMarket(api_key="test", max_concurrency=3, transport=httpx.MockTransport(slow_handler)) as market:
+            return await asyncio.gather(*[market.fear_and_greed_historical(1, 1) for _ in range(12)])
+
+    results = asyncio.run(run())
+
+    assert len(results) == 12
+    assert results[0][0]['value'] == 70
+    assert peak <= 3
+
+
+def test_async_server_error_raises():
+    from coinmarketcap import ServerException
+
+    async def run():
+        async with AsyncMarket(api_key="test", transport=httpx.MockTransport(_handler)) as market:
+            await market.map()
+
+    with pytest.raises(ServerException):
+        asyncio.run(run())
+
+
+def test_async_identical_requests_are_coalesced():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=LISTINGS_RESPONSE)
+
+    async def run():
+        async with AsyncMarket(api_key="test", transport=httpx.MockTransport(handler)) as market:
+            return await asyncio.gather(*[market.listings_latest(limit=1) for _ in range(5)])
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(len(token_states) == 1 for token_states in results)
+
+
+def test_async_transient_errors_are_retried():
+    from coinmarketcap import RetryPolicy
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return httpx.Response(503, text="unavailable")
+        return httpx.Response(200, json=LISTINGS_RESPONSE)
+
+    policy = RetryPolicy(backoff_base=0.001)
+
+    async def run():
+        async with AsyncMarket(api_key="test", transport=httpx.MockTransport(handler), retry_policy=policy) as market:
+            return await market.listings_latest(limit=1)
+
+    assert len(asyncio.run(run())) == 1
+    assert len(calls) == 2
+    assert policy.metrics.recovered == 1
+
+
+def test_async_convert_lists_over_three_are_fanned_out():
+    converts = []
+
+    def handler(request):
+        lst_convert = request.url.params['convert'].split(',')
+        converts.append(lst_convert)
+        payload = json.loads(json.dumps(LISTINGS_RESPONSE))
+        usd = payload['data'][0]['quote']['USD']
+        payload['data'][0]['quote'] = {currency: dict(usd) for currency in lst_convert}
+        return httpx.Response(200, json=payload)
+
+    async def run():
+        async with AsyncMarket(api_key="test", transport=httpx.MockTransport(handler)) as market:
+            return await market.listings_latest(limit=1, convert=['USD', 'EUR', 'JPY', 'GBP'])
+
+    token_states = asyncio.run(run())
+
+    assert sorted(converts) == [['GBP'], ['USD', 'EUR', 'JPY']]
+    assert list(token_states[0].quote_map) == ['USD', 'EUR', 'JPY', 'GBP']
+
+
+def test_async_probe_is_released_when_it_ends_without_an_outcome():
+    from coinmarketcap import CircuitBreaker
+
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=lambda: clock[0])
+    breaker.record_failure()
+    clock[0] = 10
+
+    def handler(request):
+        raise RuntimeError('bug in the transport')
+
+    async def run():
+        async with AsyncMarket(api_key="test", transport=httpx.MockTransport(handler), circuit_breaker=breaker) as market:
+            with pytest.raises(RuntimeError):
+                await market.listings_latest(limit=1)
+
+    asyncio.run(run())
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,66 @@
+import copy
+
+import pytest
+
+from coinmarketcap.types.token_state_factory import TokenStateFactory
+
+QUOTE = {"price": 62000, "volume_24h": 3.1e10, "volume_change_24h": -2.5, "percent_change_1h": 0.1,
+         "percent_change_24h": 1.2, "percent_change_7d": 5.0, "percent_change_30d": 20.0, "market_cap": 1.2e12,
+         "tvl": None, "new_quote_field": 1, "last_updated": "2024-03-01T12:00:00.000Z"}
+
+LISTING = {
+    "id": 1, "name": "Bitcoin", "symbol": "BTC", "slug": "bitcoin", "cmc_rank": 1,
+    "num_market_pairs": 11000, "circulating_supply": 19000000, "infinite_supply": False,
+    "last_updated": "2024-03-01T12:00:00.000Z", "date_added": "2013-04-28T00:00:00.000Z",
+    "tags": ["mineable"], "is_market_cap_included_in_calc": 1, "new_listing_field": "ignored",
+    "quote": {"USD": QUOTE, "EUR": dict(QUOTE, price=57000.5)}
+}
+
+
+def _listings():
+    # a second layout: fewer keys, creation_date instead of date_added, 'timestamp' quotes
+    other = {"id": 2, "name": "Ethereum", "symbol": "ETH", "creation_date": "2015-08-07T00:00:00.000Z",
+             "quote": {"USD": {key: value for key, value in QUOTE.items() if key != 'last_updated'}}}
+    other['quote']['USD']['timestamp'] = "2024-03-01T12:05:00.000Z"
+    return [copy.deepcopy(LISTING), other, dict(copy.deepcopy(LISTING), id=3, symbol="WBTC")]
+
+
+def _from_dict_each(lst_data, timestamp, compact=False):
+    lst_data = copy.deepcopy(lst_data)
+    for dct_token in lst_data:
+        dct_token['timestamp'] = timestamp
+    return [TokenStateFactory.from_dict(dct_token, compact=compact) for dct_token in lst_data]
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_from_list_matches_from_dict(compact):
+    lst_data = _listings()
+    token_states = TokenStateFactory.from_list(lst_data, timestamp=1709294400, compact=compact)
+
+    assert token_states == _from_dict_each(_listings(), 1709294400, compact)
+    assert [token_state.timestamp for token_state in token_states] == [1709294400] * 3
+    assert token_states[0].creation_date == "2013-04-28T00:00:00.000Z"
+    assert token_states[0].is_market_cap_included_in_calc is True
+    assert token_states[0].quote_map['EUR'].price == 57000.5
+    assert isinstance(token_states[0].quote_map['USD'].price, float)
+    # entries are read, not modified
+    assert lst_data == _listings()
+
+
+def test_iter_from_list_shares_one_timestamp():
+    token_states = list(TokenStateFactory.iter_from_list(iter(_listings())))
+
+    assert len({token_state.timestamp for token_state in token_states}) == 1
+
+
+def test_unusual_quotes_fall_back_to_from_dict():
+    lst_data = _listings()
+    lst_data[0]['quote']['USD']['market_cap'] = None
+
+    token_state = TokenStateFactory.from_list(lst_data, timestamp=0)[0]
+    assert token_state.quote_map['USD'].market_cap == 0.0
+    assert token_state.quote_map['EUR'].market_cap == 1.2e12
+
+    del lst_data[1]['quote']['USD']['price']
+    with pytest.raises(ValueError, match="'price'"):
+        TokenStateFactory.from_list(lst_data, timestamp=0)
@@ -0,0 +1,17 @@
+import json
+
+from benchmarks.__main__ import main
+
+
+def test_benchmark_suite_smoke(tmp_path, capsys):
+    results_path = tmp_path / 'results.json'
+
+    assert main(['--scale', '0.01', '--repeat', '1', '--json', str(results_path)]) == 0
+
+    results = json.loads(results_path.read_text())['results']
+    assert results['Market.listings_latest']['rows'] == 50
+    assert results['Market.quotes_historical_v3']['rows'] == 100
+    assert all(result['rows_per_sec'] > 0 for result in results.values())
+
+    # comparing a run against itself never reports a regression beyond the tolerance
+    assert main(['--scale', '0.01', '--repeat', '1', '--compare', str(results_path), '--tolerance', '0.99']) == 0
@@ -0,0 +1,85 @@
+import json
+import time
+
+import pytest
+
+from coinmarketcap import Market, LRUMemoryCache, IMMUTABLE, NO_CACHE
+from coinmarketcap.cache_policy import _cache_expire_after, DEFAULT_CACHE_TTLS
+from coinmarketcap.cache_backends import _create_cache_backend
+from benchmarks.server import FixtureServer
+
+MAP_BODY = json.dumps({
+    "status": {"error_code": 0, "credit_count": 1},
+    "data": [{"id": 1, "rank": 1, "name": "Bitcoin", "symbol": "BTC", "slug": "bitcoin", "is_active": 1}]
+}).encode()
+
+KEY_INFO_BODY = json.dumps({
+    "status": {"error_code": 0},
+    "data": {"plan": {"credit_limit_monthly_reset_timestamp": "2099-01-01T00:00:00.000Z"},
+             "usage": {"current_month": {"credits_left": 3000}}}
+}).encode()
+
+
+def test_closed_historical_ranges_are_immutable():
+    now = int(time.time())
+    closed = {'time_start': now - 10 * 86400, 'time_end': now - 2 * 86400, 'interval': 'daily'}
+    still_open = {'time_start': now - 3600, 'time_end': now, 'interval': '5m'}
+
+    assert _cache_expire_after('v3/cryptocurrency/quotes/historical', closed, DEFAULT_CACHE_TTLS) == IMMUTABLE
+    assert _cache_expire_after('/v2/cryptocurrency/quotes/historical', closed, DEFAULT_CACHE_TTLS) == IMMUTABLE
+    assert _cache_expire_after('v3/cryptocurrency/quotes/historical', still_open, DEFAULT_CACHE_TTLS) == 5 * 60
+
+    # a month may last 31 days, one that ended 30 days ago can still change
+    recent_month = {'time_start': now - 90 * 86400, 'time_end': now - 30 * 86400, 'interval': 'monthly'}
+    assert _cache_expire_after('v3/cryptocurrency/quotes/historical', recent_month, DEFAULT_CACHE_TTLS) != IMMUTABLE
+
+
+def test_endpoint_ttls_and_overrides():
+    ttls = {**DEFAULT_CACHE_TTLS, 'v1/cryptocurrency/map': 30}
+
+    assert _cache_expire_after('v1/key/info', {}, ttls) == NO_CACHE
+    assert _cache_expire_after('v1/cryptocurrency/map', {}, ttls) == 30
+    assert _cache_expire_after('v9/unknown', {}, ttls) == 120
+
+
+def test_lru_memory_cache_evicts_least_recently_used():
+    cache = LRUMemoryCache(max_entries=2)
+    cache.responses['a'] = 1
+    cache.responses['b'] = 2
+    cache.responses['a']
+    cache.responses['c'] = 3
+
+    assert set(cache.responses.keys()) == {'a', 'c'}
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        _create_cache_backend('carrier-pigeon', 'cache')
+
+
+def test_market_uses_backend_and_policy():
+    bodies = {'v1/cryptocurrency/map': MAP_BODY, 'v1/key/info': KEY_INFO_BODY}
+    with FixtureServer(bodies) as server:
+        market = Market(api_key="test", base_url=server.base_url, cache_backend='memory',
+                        cache_options={'max_entries': 10})
+
+        assert isinstance(market.caching_session.cache, LRUMemoryCache)
+
+        market.map(limit=1)
+        market.map(limit=1)
+        assert server.request_count == 1
+
+        # key/info is never cached
+        market.safe_daily_call_limit()
+        market.safe_daily_call_limit()
+        assert server.request_count == 3
+
+
+def test_market_ttl_override_can_disable_caching():
+    with FixtureServer({'v1/cryptocurrency/map': MAP_BODY}) as server:
+        market = Market(api_key="test", base_url=server.base_url, cache_backend='memory',
+                        cache_ttls={'v1/cryptocurrency/map': NO_CACHE})
+        market.map(limit=1)
+        market.map(limit=1)
+
+        assert server.request_count == 2
@@ -0,0 +1,87 @@
+import threading
+from datetime import datetime, timezone
+import pytest
+
+from coinmarketcap import Market, HistoricalQuotes
+from coinmarketcap.chunking import _split_time_range, MAX_POINTS_PER_CALL
+from .fakes import FakeResponse, FakeSession
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+@pytest.fixture
+def chunk_market():
+    market = Market(api_key="test")
+    market.windows = []
+    market.cached_windows = set()
+    lock = threading.Lock()
+
+    def respond(url, params, **kwargs):
+        with lock:
+            market.windows.append((params['time_start'], params['time_end']))
+        # one point every 5 minutes, both ends inclusive like the API
+        first = -(-params['time_start'] // 300) * 300
+        quotes = [
+            {
+                "timestamp": _iso(ts),
+                "quote": {"USD": {"price": float(ts), "volume_24h": 1.0, "market_cap": 1.0,
+                                  "percent_change_1h": 0.0, "percent_change_24h": 0.0,
+                                  "percent_change_7d": 0.0, "percent_change_30d": 0.0,
+                                  "timestamp": _iso(ts)}}
+            }
+            for ts in range(first, params['time_end'] + 1, 300)
+        ]
+        summary = {"id": 1, "name": "Bitcoin", "symbol": "BTC", "is_active": 1, "is_fiat": 0, "quotes": quotes}
+        return FakeResponse(payload={"status": {"credit_count": 1}, "data": {params['id']: summary}},
+                            from_cache=params['time_start'] in market.cached_windows)
+
+    market._session = market._caching_session = FakeSession(respond)
+    return market
+
+
+def test_split_time_range_is_interval_aware():
+    windows = _split_time_range(0, 300 * 25, '5m', points_per_chunk=10)
+
+    assert windows == [(0, 3000), (3000, 6000), (6000, 7500)]
+    assert _split_time_range(0, 100, 'daily') == [(0, 100)]
+    # sized from the shortest month, so no window spans more than points_per_chunk months
+    assert _split_time_range(0, 86400 * 365, 'monthly', points_per_chunk=12) == [(0, 86400 * 336), (86400 * 336, 86400 * 365)]
+
+    with pytest.raises(ValueError):
+        _split_time_range(0, 100, '5m', points_per_chunk=MAX_POINTS_PER_CALL + 1)
+
+
+def test_chunked_quotes_are_deduped_and_ordered(chunk_market):
+    start = 1717200000
+    end = start + 300 * 100
+
+    history = chunk_market.quotes_historical_v3(id='1', timestamp_start=start, timestamp_end=end,
+                                                interval='5m', chunked=True, points_per_chunk=30)
+
+    assert isinstance(history, HistoricalQuotes)
+    assert history.chunks == 4
+    assert history.credits_used == 4
+    assert len(chunk_market.windows) == 4
+    timestamps = [token_state.timestamp for token_state in history]
+    assert timestamps == list(range(start, end + 1, 300))
+
+
+def test_unchunked_call_is_unchanged(chunk_market):
+    history = chunk_market.quotes_historical_v3(id='1', timestamp_start=1717200000,
+                                                timestamp_end=1717200000 + 900, interval='5m')
+
+    assert type(history) is list
+    assert len(history) == 4
+
+
+def test_cached_chunks_use_no_credits(chunk_market):
+    start = 1717200000
+    chunk_market.cached_windows.update({start, start + 300 * 30})
+
+    history = chunk_market.quotes_historical_v3(id='1', timestamp_start=start, timestamp_end=start + 300 * 100,
+                                                interval='5m', chunked=True, points_per_chunk=30)
+
+    assert history.chunks == 4
+    assert history.credits_used == 2
@@ -241,10 +241,3 @@ def test_quotes_historical_v3_implementation(coinmarketcap_instance):
             timestamp_start=timestamp_now,
             timestamp_end=timestamp_1_day_ago
         )
-    
-    with pytest.raises(ValueError, match="The convert list must have a maximum of 3 elements"):
-        _quotes_historical_v3(
-            market=coinmarketcap_instance,
-            id="1",
-            convert=['USD', 'BTC', 'EUR', 'JPY']
-        )
@@ -0,0 +1,100 @@
+import copy
+import pickle
+import dataclasses
+
+import pytest
+from crypto_commons.types.quote import Quote
+from crypto_commons.types.token_state import TokenState
+
+from coinmarketcap import Market, ParsedObjectCache, CompactTokenState, CompactQuote
+from coinmarketcap.types.token_state_factory import TokenStateFactory
+
+LISTING = {
+    "id": 1, "name": "Bitcoin", "symbol": "BTC", "slug": "bitcoin", "cmc_rank": 1,
+    "num_market_pairs": 11000, "circulating_supply": 19000000, "total_supply": 19000000,
+    "max_supply": 21000000, "infinite_supply": False, "last_updated": "2024-03-01T12:00:00.000Z",
+    "date_added": "2013-04-28T00:00:00.000Z", "tags": ["mineable", "pow"], "platform": None,
+    "timestamp": 1709294400, "some_new_api_field": "ignored",
+    "quote": {
+        "USD": {"price": 62000, "volume_24h": 3.1e10, "percent_change_1h": 0.1, "percent_change_24h": 1.2,
+                "percent_change_7d": 5.0, "percent_change_30d": 20.0, "market_cap": 1.2e12,
+                "last_updated": "2024-03-01T12:00:00.000Z"},
+        "EUR": {"price": 57000, "volume_24h": 2.9e10, "percent_change_1h": 0.1, "percent_change_24h": 1.1,
+                "percent_change_7d": 4.9, "percent_change_30d": 19.0, "market_cap": 1.1e12,
+                "last_updated": "2024-03-01T12:00:00.000Z"}
+    }
+}
+
+LISTINGS_RESPONSE = {
+    "status": {"error_code": 0, "credit_count": 1},
+    "data": [LISTING]
+}
+
+
+def test_compact_mirrors_the_dataclass():
+    token_state = TokenStateFactory.from_dict(copy.deepcopy(LISTING))
+    compact = TokenStateFactory.from_dict(copy.deepcopy(LISTING), compact=True)
+
+    assert isinstance(compact, CompactTokenState)
+    assert isinstance(compact.quote_map['USD'], CompactQuote)
+    assert not hasattr(compact, '__dict__') and not hasattr(compact.quote_map['USD'], '__dict__')
+    for field in dataclasses.fields(TokenState):
+        if field.name not in ('quote_map', 'tags'):
+            assert getattr(compact, field.name) == getattr(token_state, field.name)
+    for field in dataclasses.fields(Quote):
+        assert getattr(compact.quote_map['EUR'], field.name) == getattr(token_state.quote_map['EUR'], field.name)
+    assert compact.tags == ('mineable', 'pow')
+    assert compact.to_token_state() == token_state
+
+
+def test_compact_is_read_only():
+    compact = TokenStateFactory.from_dict(copy.deepcopy(LISTING), compact=True)
+
+    with pytest.raises(AttributeError):
+        compact.name = 'changed'
+    with pytest.raises(AttributeError):
+        del compact.symbol
+    with pytest.raises(AttributeError):
+        compact.quote_map['USD'].price = 0.0
+    with pytest.raises(TypeError):
+        compact.quote_map['BTC'] = compact.quote_map['USD']
+
+
+def test_compact_constructor_checks_fields():
+    with pytest.raises(TypeError):
+        CompactQuote(base_currency='USD', price=1.0)
+    with pytest.raises(TypeError):
+        CompactQuote(**dataclasses.asdict(Quote('USD', 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, None)), unknown=1)
+
+
+def test_compact_pickles_and_hashes():
+    compact = TokenStateFactory.from_dict(copy.deepcopy(LISTING), compact=True)
+    restored = pickle.loads(pickle.dumps(compact))
+
+    assert restored == compact
+    assert hash(restored) == hash(compact)
+    with pytest.raises(AttributeError):
+        restored.quote_map['USD'].price = 0.0
+    with pytest.raises(TypeError):
+        restored.quote_map['BTC'] = restored.quote_map['USD']
+
+
+def test_market_listings_latest_compact(monkeypatch):
+    market = Market(api_key="test", object_cache=ParsedObjectCache())
+    calls = []
+
+    def fake_request(endpoint, params={}, no_cache=False):
+        calls.append(endpoint)
+        return copy.deepcopy(LISTINGS_RESPONSE)
+
+    monkeypatch.setattr(market, '_request', fake_request)
+
+    compact = market.listings_latest(limit=1, convert=['USD', 'EUR'], compact=True)
+    cached = market.listings_latest(limit=1, convert=['USD', 'EUR'], compact=True)
+    regular = market.listings_latest(limit=1, convert=['USD', 'EUR'])
+
+    # compact and regular results are cached separately
+    assert len(calls) == 2
+    assert isinstance(compact[0], CompactTokenState) and cached == compact
+    assert isinstance(regular[0], TokenState)
+    assert compact[0].quote_map['USD'].price == regular[0].quote_map['USD'].price == 62000.0
@@ -0,0 +1,73 @@
+import pytest
+
+from coinmarketcap import Market
+from coinmarketcap.convert_fanout import _convert_fanout_params
+
+from .fakes import FakeResponse, FakeSession
+
+CURRENCIES = ['USD', 'EUR', 'JPY', 'GBP', 'CHF', 'CAD', 'AUD']
+
+
+def _quote(currency):
+    return {"price": float(CURRENCIES.index(currency) + 1), "volume_24h": 1.0, "market_cap": 2.0,
+            "percent_change_1h": 0.1, "percent_change_24h": 0.2, "percent_change_7d": 0.3, "percent_change_30d": 0.4,
+            "last_updated": "2024-06-01T12:00:00.000Z"}
+
+
+def _payload(path, params):
+    lst_convert = params['convert'].split(',')
+    quote = {currency: _quote(currency) for currency in lst_convert}
+    if path.endswith('listings/latest'):
+        data = [{"id": id, "name": f"Token {id}", "symbol": f"T{id}", "slug": f"token-{id}", "cmc_rank": id,
+                 "num_market_pairs": 1, "circulating_supply": 1, "total_supply": 1, "max_supply": None,
+                 "infinite_supply": False, "last_updated": "2024-06-01T12:00:00.000Z",
+                 "date_added": "2020-01-01T00:00:00.000Z", "tags": [], "platform": None,
+                 "quote": dict(quote)} for id in (1, 2)]
+    else:
+        data = {"1": {"id": 1, "name": "Bitcoin", "symbol": "BTC", "is_active": 1, "is_fiat": 0,
+                      "quotes": [{"timestamp": f"2024-06-01T0{hour}:00:00.000Z", "quote": dict(quote)}
+                                 for hour in range(2)]}}
+    return {"status": {"error_code": 0, "credit_count": 1}, "data": data}
+
+
+@pytest.fixture
+def market():
+    market = Market(api_key="test")
+    market._session = market._caching_session = FakeSession(lambda url, params, **kwargs: FakeResponse(payload=_payload(url, params)))
+    return market
+
+
+def test_fanout_params_split_in_groups_of_three():
+    assert _convert_fanout_params('v1/cryptocurrency/listings/latest', {'convert': 'USD,EUR,JPY'}) is None
+    assert _convert_fanout_params('v1/cryptocurrency/map', {'convert': ','.join(CURRENCIES)}) is None
+
+    lst_params = _convert_fanout_params('v3/cryptocurrency/quotes/historical', {'id': '1', 'convert': ','.join(CURRENCIES + ['USD'])})
+    assert [params['convert'] for params in lst_params] == ['USD,EUR,JPY', 'GBP,CHF,CAD', 'AUD']
+    assert all(params['id'] == '1' for params in lst_params)
+
+
+def test_listings_latest_merges_every_currency(market):
+    lst_token_states = market.listings_latest(limit=2, convert=CURRENCIES)
+
+    assert sorted(params['convert'] for params in market.session.params) == ['AUD', 'GBP,CHF,CAD', 'USD,EUR,JPY']
+    assert [token_state.id for token_state in lst_token_states] == [1, 2]
+    for token_state in lst_token_states:
+        assert list(token_state.quote_map) == CURRENCIES
+        assert token_state.quote_map['CAD'].price == 6.0
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_quotes_historical_v3_merges_every_currency(market, compact):
+    lst_token_states = market.quotes_historical_v3(id='1', timestamp_start=1717200000, timestamp_end=1717203600,
+                                                   convert=CURRENCIES, compact=compact)
+
+    assert len(market.session.calls) == 3
+    assert len(lst_token_states) == 2
+    assert all(list(token_state.quote_map) == CURRENCIES for token_state in lst_token_states)
+    assert lst_token_states[1].quote_map['AUD'].price == 7.0
+
+
+def test_streaming_rejects_more_than_three_currencies(market):
+    with pytest.raises(ValueError, match='at most 3 convert currencies'):
+        list(market.stream_listings_latest(limit=2, convert=CURRENCIES))
+    assert market.session.calls == []
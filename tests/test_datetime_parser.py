@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+from dateutil import parser
+
+from coinmarketcap.types.datetime_parser import parse_cmc_datetime
+
+
+def test_fast_path_matches_dateutil():
+    for value in ('2024-06-01T12:34:56.789Z', '2024-06-01T12:34:56Z', '2013-04-28T00:00:00.000Z'):
+        parsed = parse_cmc_datetime(value)
+        assert parsed == parser.parse(value)
+        assert parsed.utcoffset().total_seconds() == 0
+
+
+def test_unexpected_formats_fall_back_to_dateutil():
+    assert parse_cmc_datetime('2024-06-01 12:34:56+02:00') == datetime(2024, 6, 1, 10, 34, 56, tzinfo=timezone.utc)
+    assert parse_cmc_datetime('2024-06-01T12:34:56.789123Z') == parser.parse('2024-06-01T12:34:56.789123Z')
+
+
+def test_repeated_strings_are_memoized():
+    parse_cmc_datetime.cache_clear()
+    for _ in range(5):
+        parse_cmc_datetime('2024-06-01T00:00:00.000Z')
+
+    assert parse_cmc_datetime.cache_info().hits == 4
@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from coinmarketcap import Market, ParsedObjectCache
+from coinmarketcap.core import DexAuxFields
+from coinmarketcap.v4.dex.listings.info import _dex_id_batches
+
+
+class _DexApi(object):
+    """Answers v4/dex/listings/info for every id but 404, recording the ids of each call."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, endpoint, params={}, no_cache=False):
+        lst_ids = [int(id) for id in params['id'].split(',')]
+        with self.lock:
+            self.calls.append(lst_ids)
+        return {"status": {"error_code": 0, "credit_count": 1},
+                "data": [{"id": id, "name": f"DEX {id}", "slug": f"dex-{id}", "status": "active"}
+                         for id in lst_ids if id != 404]}
+
+
+def test_batches_are_even_and_fit_the_url():
+    lst_batches = _dex_id_batches(list(range(1, 251)), max_ids=100)
+    assert [len(batch) for batch in lst_batches] == [84, 84, 82]
+
+    # long ids run into the character budget before the id limit
+    lst_batches = _dex_id_batches([10**9 + i for i in range(100)], max_ids=100, max_chars=300)
+    assert all(sum(len(str(id)) + 1 for id in batch) <= 300 for batch in lst_batches)
+    assert sum(len(batch) for batch in lst_batches) == 100
+    assert _dex_id_batches([]) == []
+
+
+def test_bulk_fetches_only_uncached_ids_concurrently():
+    market = Market(api_key="test")
+    market._request = api = _DexApi()
+
+    dct_dex_info = market.dex_listings_info_bulk(list(range(1, 251)) + [3, 404], batch_size=100)
+    assert list(dct_dex_info)[:3] == [1, 2, 3] and len(dct_dex_info) == 250
+    assert 404 not in dct_dex_info
+    assert sorted(len(ids) for ids in api.calls) == [83, 84, 84]
+
+    # only the ids never seen are requested, 404 was not returned so it is asked again
+    api.calls.clear()
+    dct_dex_info = market.dex_listings_info_bulk([5, 260, 404, 1])
+    assert api.calls == [[260, 404]]
+    assert list(dct_dex_info) == [5, 260, 1]
+    assert dct_dex_info[260].name == "DEX 260"
+
+
+def test_records_are_cached_per_aux_fields_in_the_object_cache():
+    market = Market(api_key="test", object_cache=ParsedObjectCache())
+    market._request = api = _DexApi()
+    assert market.record_cache is market._object_cache
+
+    market.dex_listings_info_bulk([1, 2])
+    market.dex_listings_info_bulk([1, 2], aux_fields=[DexAuxFields.URLS])
+    market.dex_listings_info_bulk([2, 1], aux_fields=[DexAuxFields.URLS])
+    assert api.calls == [[1, 2], [1, 2]]
+
+    with pytest.raises(ValueError):
+        market.dex_listings_info_bulk([])
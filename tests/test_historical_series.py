@@ -0,0 +1,78 @@
+import copy
+import math
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from coinmarketcap import Market, HistoricalSeries
+
+
+RESPONSE = {
+    "status": {"credit_count": 1},
+    "data": {
+        "1": {
+            "id": 1, "name": "Bitcoin", "symbol": "BTC", "is_active": 1, "is_fiat": 0,
+            "quotes": [
+                {
+                    "timestamp": "2024-06-01T00:00:00.000Z",
+                    "quote": {
+                        "USD": {"price": 67000, "volume_24h": 1.5e10, "market_cap": 1.3e12,
+                                "percent_change_1h": 0.1, "percent_change_24h": 1.0,
+                                "percent_change_7d": 2.0, "percent_change_30d": 3.0,
+                                "timestamp": "2024-06-01T00:00:00.000Z"},
+                        "EUR": {"price": 61000.5, "volume_24h": 1.4e10, "market_cap": None,
+                                "percent_change_1h": 0.1, "percent_change_24h": 1.0,
+                                "percent_change_7d": 2.0, "percent_change_30d": 3.0,
+                                "timestamp": "2024-06-01T00:00:00.000Z"}
+                    }
+                },
+                {
+                    "timestamp": "2024-06-01T01:00:00.000Z",
+                    "quote": {
+                        "USD": {"price": 67100.25, "volume_24h": 1.6e10, "market_cap": 1.31e12,
+                                "percent_change_1h": 0.2, "percent_change_24h": 1.1,
+                                "percent_change_7d": 2.1, "percent_change_30d": 3.1,
+                                "timestamp": "2024-06-01T01:00:00.000Z"},
+                        "EUR": {"price": 61100.5, "volume_24h": 1.5e10, "market_cap": 1.2e12,
+                                "percent_change_1h": 0.2, "percent_change_24h": 1.1,
+                                "percent_change_7d": 2.1, "percent_change_30d": 3.1,
+                                "timestamp": "2024-06-01T01:00:00.000Z"}
+                    }
+                }
+            ]
+        }
+    }
+}
+
+
+@pytest.fixture
+def series_market(monkeypatch):
+    market = Market(api_key="test")
+    monkeypatch.setattr(market, '_request', lambda *args, **kwargs: copy.deepcopy(RESPONSE))
+    return market
+
+
+def test_columnar_matches_object_parsing(series_market):
+    series = series_market.quotes_historical_v3_columnar(id='1', timestamp_start=1717200000, timestamp_end=1717203600,
+                                                         convert=['USD', 'EUR'])
+    token_states = series_market.quotes_historical_v3(id='1', timestamp_start=1717200000, timestamp_end=1717203600,
+                                                      convert=['USD', 'EUR'])
+
+    assert isinstance(series, HistoricalSeries)
+    assert len(series) == 2
+    assert series.id == 1 and series.symbol == 'BTC'
+    assert series.timestamp.dtype == np.int64
+    assert list(series.timestamp) == [token_state.timestamp for token_state in token_states]
+    assert list(series.quotes['USD']['price']) == [67000.0, 67100.25]
+    assert math.isnan(series.quotes['EUR']['market_cap'][0])
+
+
+def test_to_dataframe(series_market):
+    pytest.importorskip("pandas")
+
+    df = series_market.quotes_historical_v3_columnar(id='1', timestamp_start=1717200000, timestamp_end=1717203600,
+                                                     convert=['USD', 'EUR']).to_dataframe()
+
+    assert len(df) == 2
+    assert df['USD_price'].iloc[1] == 67100.25
+    assert 'EUR_percent_change_30d' in df.columns
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+import pytest
+
+from coinmarketcap import Market, HistoryStore
+from coinmarketcap.history_store import _missing_ranges
+from .fakes import FakeResponse, FakeSession
+
+
+def _iso(timestamp):
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.000Z')
+
+
+@pytest.fixture
+def history_market():
+    market = Market(api_key="test")
+    market.requests = []
+
+    def respond(url, params, **kwargs):
+        market.requests.append((params['time_start'], params['time_end'], params['convert']))
+        first = -(-params['time_start'] // 3600) * 3600
+        quotes = [
+            {
+                "timestamp": _iso(ts),
+                "quote": {
+                    currency: {"price": float(ts), "volume_24h": 2.0, "market_cap": 3.0,
+                               "percent_change_1h": 0.1, "percent_change_24h": 0.2,
+                               "percent_change_7d": 0.3, "percent_change_30d": 0.4,
+                               "market_cap_dominance": 50.0, "timestamp": _iso(ts)}
+                    for currency in params['convert'].split(',')
+                }
+            }
+            for ts in range(first, params['time_end'] + 1, 3600)
+        ]
+        summary = {"id": 1, "name": "Bitcoin", "symbol": "BTC", "is_active": 1, "is_fiat": 0, "quotes": quotes}
+        return FakeResponse(payload={"status": {"credit_count": 1}, "data": {params['id']: summary}})
+
+    market._session = market._caching_session = FakeSession(respond)
+    return market
+
+
+def test_missing_ranges():
+    assert _missing_ranges([], 0, 10) == [(0, 10)]
+    assert _missing_ranges([(0, 4), (6, 8)], 0, 10) == [(4, 6), (8, 10)]
+    assert _missing_ranges([(0, 20)], 5, 10) == []
+
+
+def test_sync_only_fetches_gaps(history_market, tmp_path):
+    start = 1717200000
+    store = HistoryStore(str(tmp_path / 'history.sqlite'))
+
+    first = store.sync(history_market, id=1, timestamp_start=start, timestamp_end=start + 3600 * 10)
+    assert len(first) == 11
+    assert history_market.requests == [(start, start + 3600 * 10, 'USD')]
+
+    second = store.sync(history_market, id=1, timestamp_start=start + 3600 * 5, timestamp_end=start + 3600 * 20)
+    assert history_market.requests[1] == (start + 3600 * 10, start + 3600 * 20, 'USD')
+    assert [token_state.timestamp for token_state in second] == list(range(start + 3600 * 5, start + 3600 * 21, 3600))
+
+    # fully covered, no request at all
+    store.sync(history_market, id=1, timestamp_start=start, timestamp_end=start + 3600 * 20)
+    assert len(history_market.requests) == 2
+
+
+def test_store_round_trips_quotes(history_market, tmp_path):
+    start = 1717200000
+    path = str(tmp_path / 'history.sqlite')
+    fetched = history_market.quotes_historical_v3(id='1', timestamp_start=start, timestamp_end=start + 7200,
+                                                  convert=['USD', 'EUR'])
+
+    with HistoryStore(path) as store:
+        store.sync(history_market, id=1, timestamp_start=start, timestamp_end=start + 7200, convert=['USD', 'EUR'])
+
+    with HistoryStore(path) as store:
+        loaded = store.load(1, start, start + 7200, convert=['USD', 'EUR'])
+
+    assert len(loaded) == len(fetched) == 3
+    for expected, actual in zip(fetched, loaded):
+        assert actual.timestamp == expected.timestamp
+        assert actual.symbol == 'BTC'
+        assert actual.quote_map == expected.quote_map
@@ -0,0 +1,64 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Heavy or optional dependencies that must not be loaded until a feature needs them
+DEFERRED_MODULES = ('requests_cache', 'requests_ratelimiter', 'pyrate_limiter', 'numpy', 'pandas', 'dateutil', 'httpx',
+                    'sqlite3', 'asyncio', 'http.server')
+
+# Endpoint modules Market imports on the first call of a method using them
+ENDPOINT_MODULES = ('coinmarketcap.v1.cryptocurrency.map', 'coinmarketcap.v1.cryptocurrency.listings.latest',
+                    'coinmarketcap.v1.key.info', 'coinmarketcap.v2.cryptocurrency.quotes.historical',
+                    'coinmarketcap.v3.cryptocurrency.quotes.historical_v3', 'coinmarketcap.v3.fear_and_greed.historical',
+                    'coinmarketcap.v4.dex.listings.info')
+
+# Seconds "from coinmarketcap import Market" may take on top of importing requests
+IMPORT_BUDGET = 0.15
+
+
+def _run(code: str) -> dict:
+    output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+@pytest.mark.parametrize('statement', ['import coinmarketcap', 'from coinmarketcap import Market',
+                                       'from coinmarketcap import Market; Market(api_key="test")',
+                                       'from coinmarketcap import Market, Poller, ListingsTracker, HistoryStore'])
+def test_importing_does_not_load_deferred_dependencies(statement):
+    loaded = _run(f'import sys, json\n{statement}\n'
+                  f'print(json.dumps([name for name in {DEFERRED_MODULES!r} if name in sys.modules]))')
+    assert loaded == []
+
+
+@pytest.mark.parametrize('statement', ['import coinmarketcap', 'from coinmarketcap import Market; Market(api_key="test")'])
+def test_endpoint_modules_load_on_first_use(statement):
+    loaded = _run(f'import sys, json\n{statement}\n'
+                  f'print(json.dumps([name for name in {ENDPOINT_MODULES!r} if name in sys.modules]))')
+    assert loaded == []
+
+
+def test_import_time_budget():
+    # measures the package's own import work, requests is needed by any request anyway
+    timings = _run('import json, time\n'
+                   'import requests\n'
+                   'started = time.perf_counter()\n'
+                   'from coinmarketcap import Market\n'
+                   'Market(api_key="test")\n'
+                   'print(json.dumps([time.perf_counter() - started]))')
+    assert timings[0] < IMPORT_BUDGET, f'importing coinmarketcap took {timings[0]:.3f}s'
+
+
+def test_lazy_exports():
+    import coinmarketcap
+    import requests_cache
+    from coinmarketcap import cache_backends
+
+    assert 'Market' in dir(coinmarketcap)
+    assert coinmarketcap.LRUMemoryCache is cache_backends.LRUMemoryCache
+    with pytest.raises(AttributeError):
+        coinmarketcap.NoSuchThing
+    # spelled out in cache_policy to keep requests_cache out of the import
+    assert coinmarketcap.IMMUTABLE == requests_cache.NEVER_EXPIRE
+    assert coinmarketcap.NO_CACHE == requests_cache.DO_NOT_CACHE
@@ -0,0 +1,100 @@
+import json
+import urllib.request
+
+import pytest
+
+from coinmarketcap import Market, RetryPolicy, Hooks, MetricsCollector
+
+from .fakes import MAP_RESPONSE, FakeResponse, ScriptedSession
+
+
+def _market(*responses, **kwargs):
+    market = Market(api_key="test", **kwargs)
+    market._caching_session = ScriptedSession(*responses)
+    return market
+
+
+def test_collector_measures_phases_cache_bytes_and_credits():
+    metrics = MetricsCollector()
+    market = _market(FakeResponse(), FakeResponse(from_cache=True), hooks=[metrics])
+
+    market.map()
+    market.map()
+
+    snapshot = metrics.snapshot()['v1/cryptocurrency/map']
+    assert snapshot['requests'] == 2 and snapshot['cache_hits'] == 1
+    assert snapshot['bytes'] == 2 * len(json.dumps(MAP_RESPONSE))
+    # the cached response is free
+    assert snapshot['credits'] == 1
+    assert snapshot['rows'] == 4
+    assert {phase: count for phase, (count, _) in snapshot['phases'].items()} == \
+        {'connect': 2, 'transfer': 2, 'decode': 2, 'parse': 2}
+    # only the network request connects, the cache hit's stored elapsed is not counted again
+    assert snapshot['phases']['connect'][1] == pytest.approx(0.02)
+    assert metrics.cache_hit_ratio('v1/cryptocurrency/map') == 0.5
+    assert metrics.cache_hit_ratio('v1/key/info') is None
+
+
+def test_retries_and_errors_reach_the_hooks():
+    metrics = MetricsCollector()
+    policy = RetryPolicy(sleep=lambda delay: None)
+    market = _market(FakeResponse(503), FakeResponse(), hooks=[metrics], retry_policy=policy)
+
+    market.map()
+
+    assert metrics.snapshot()['v1/cryptocurrency/map']['retries'] == 1
+    text = metrics.to_prometheus()
+    assert 'coinmarketcap_retries_total{endpoint="v1/cryptocurrency/map",reason="http_503"} 1' in text
+    assert 'coinmarketcap_requests_total{endpoint="v1/cryptocurrency/map",status="200"} 1' in text
+    assert 'coinmarketcap_request_phase_seconds_bucket{endpoint="v1/cryptocurrency/map",phase="connect",le="0.025"} 1' in text
+    assert 'coinmarketcap_request_phase_seconds_bucket{endpoint="v1/cryptocurrency/map",phase="connect",le="+Inf"} 1' in text
+
+
+def test_prometheus_endpoint():
+    metrics = MetricsCollector(namespace='cmc')
+    _market(FakeResponse(), hooks=[metrics]).map()
+
+    server = metrics.serve(port=0)
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{server.server_port}/metrics', timeout=5) as response:
+            body = response.read().decode('utf-8')
+    finally:
+        server.shutdown()
+
+    assert '# TYPE cmc_request_phase_seconds histogram' in body
+    assert 'cmc_cache_misses_total{endpoint="v1/cryptocurrency/map"} 1' in body
+
+
+def test_debug_mode_prints_through_hooks_and_failing_hooks_are_ignored(capsys):
+    class _Broken(Hooks):
+        def on_response(self, event, response_json):
+            raise RuntimeError('boom')
+
+    market = _market(FakeResponse(), debug_mode=True, hooks=[_Broken()])
+    assert len(market.map()) == 2
+
+    out = capsys.readouterr().out
+    assert 'Request URL: https://pro-api.coinmarketcap.com/v1/cryptocurrency/map' in out
+    assert 'Response Code: 200' in out
+    assert '"symbol": "ETH"' in out
+
+
+def test_debug_mode_numbers_the_first_retry_one(capsys):
+    policy = RetryPolicy(sleep=lambda delay: None, jitter=False, backoff_base=0.0)
+    market = _market(FakeResponse(503), FakeResponse(), debug_mode=True, retry_policy=policy)
+
+    market.map()
+
+    assert 'Retrying v1/cryptocurrency/map in 0.00s (attempt 1, http_503)' in capsys.readouterr().out
+
+
+def test_hooks_work_with_the_object_cache():
+    from coinmarketcap import ParsedObjectCache
+
+    metrics = MetricsCollector()
+    market = _market(FakeResponse(), debug_mode=True, hooks=[metrics], object_cache=ParsedObjectCache())
+
+    first = market.map()
+    # the second call is answered by the object cache, the session has no response left
+    assert market.map() == first
+    assert metrics.snapshot()['v1/cryptocurrency/map']['phases']['parse'][0] == 1
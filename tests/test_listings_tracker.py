@@ -0,0 +1,90 @@
+import copy
+
+import pytest
+
+from coinmarketcap import Market, ListingsTracker, FieldChange, Threshold
+from coinmarketcap.v1.cryptocurrency.listings.latest import _parse_listings_latest
+
+
+def _listing(id, symbol, rank, price, eur_price=None):
+    dct_quote = {"USD": {"price": price, "volume_24h": 1e9, "percent_change_1h": 0.0, "percent_change_24h": 0.0,
+                         "percent_change_7d": 0.0, "percent_change_30d": 0.0, "market_cap": price * 1e6,
+                         "last_updated": "2024-03-01T12:00:00.000Z"}}
+    if eur_price is not None:
+        dct_quote["EUR"] = dict(dct_quote["USD"], price=eur_price)
+    return {"id": id, "name": symbol, "symbol": symbol, "cmc_rank": rank, "quote": dct_quote}
+
+
+def _response(*lst_listings):
+    return {"status": {"error_code": 0, "credit_count": 1}, "data": list(lst_listings)}
+
+
+class _Responses(object):
+    def __init__(self, *lst_responses):
+        self.lst_responses = list(lst_responses)
+        self.params = []
+
+    def __call__(self, endpoint, params={}, no_cache=False):
+        self.params.append(params)
+        return copy.deepcopy(self.lst_responses.pop(0))
+
+
+def test_poll_reports_added_changed_and_removed(monkeypatch):
+    market = Market(api_key="test")
+    responses = _Responses(
+        _response(_listing(1, "BTC", 1, 100.0), _listing(2, "ETH", 2, 10.0), _listing(3, "OLD", 3, 1.0)),
+        _response(_listing(1, "BTC", 1, 100.2), _listing(2, "ETH", 3, 10.0), _listing(4, "NEW", 2, 5.0)))
+    monkeypatch.setattr(market, '_request', responses)
+    tracker = ListingsTracker(market, limit=3)
+
+    first = tracker.poll()
+    assert [token_state.id for token_state in first.added] == [1, 2, 3]
+    assert not first.removed and not first.changes
+
+    second = tracker.poll()
+    assert [token_state.symbol for token_state in second.added] == ["NEW"]
+    assert [token_state.symbol for token_state in second.removed] == ["OLD"]
+    # BTC moved 0.2%, under the default 0.5% price threshold
+    assert second.changes == [FieldChange(2, "ETH", "cmc_rank", 2, 3)]
+    assert sorted(tracker.snapshot) == [1, 2, 4]
+    assert responses.params[0]['limit'] == 3
+
+
+def test_thresholds_measure_against_last_reported_value():
+    tracker = ListingsTracker(thresholds={'price': 0.01})
+    tracker.update(_parse([_listing(1, "BTC", 1, 100.0, eur_price=90.0)]))
+
+    # two 0.6% moves: neither is reported against the previous poll, the second adds up to 1.2%
+    assert not tracker.update(_parse([_listing(1, "BTC", 1, 100.6, eur_price=90.0)]))
+    delta = tracker.update(_parse([_listing(1, "BTC", 2, 101.2, eur_price=91.0)]))
+
+    assert delta.changes == [FieldChange(1, "BTC", "price", 100.0, 101.2, "USD"),
+                             FieldChange(1, "BTC", "price", 90.0, 91.0, "EUR")]
+    # cmc_rank is not tracked with these thresholds
+    assert len(delta) == 2
+
+
+def test_absolute_thresholds_and_none_values():
+    threshold = Threshold(absolute=5)
+    assert not threshold.exceeded(10, 14)
+    assert threshold.exceeded(10, 15)
+    assert threshold.exceeded(None, 1) and threshold.exceeded(1, None)
+    assert not threshold.exceeded(None, None)
+    assert Threshold(relative=0.1).exceeded(0, 0.001)
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError, match="prize"):
+        ListingsTracker(thresholds={'prize': 0.01})
+    with pytest.raises(ValueError):
+        ListingsTracker().poll()
+
+
+@pytest.mark.parametrize('name', ['name', 'symbol', 'tags', 'platform', 'last_updated', 'is_active', 'base_currency'])
+def test_non_numeric_field_is_rejected(name):
+    with pytest.raises(ValueError, match=name):
+        ListingsTracker(thresholds={name: 0.01})
+
+
+def _parse(lst_listings):
+    return _parse_listings_latest(_response(*copy.deepcopy(lst_listings)))
@@ -0,0 +1,92 @@
+import copy
+
+import pytest
+
+from coinmarketcap import Market, ParsedObjectCache, IMMUTABLE, NO_CACHE
+
+from .fakes import Clock
+
+# three assets, unlike fakes.MAP_RESPONSE
+MAP_RESPONSE = {
+    "status": {"error_code": 0},
+    "data": [{"id": i, "rank": i, "name": f"Token {i}", "symbol": f"T{i}", "slug": f"token-{i}", "is_active": 1}
+             for i in range(1, 4)]
+}
+
+
+def test_hits_return_private_copies():
+    cache = ParsedObjectCache()
+    cache.set('key', {'quotes': [1, 2]})
+
+    first = cache.get('key')
+    first['quotes'].append(3)
+
+    assert cache.get('key') == {'quotes': [1, 2]}
+    assert (cache.hits, cache.misses) == (2, 0)
+
+
+def test_entries_expire_after_ttl():
+    clock = Clock()
+    cache = ParsedObjectCache(clock=clock)
+    cache.set('short', 1, ttl=10)
+    cache.set('forever', 2, ttl=IMMUTABLE)
+    cache.set('never', 3, ttl=NO_CACHE)
+    cache.set('expired', 4, ttl=0)
+    assert 'expired' not in cache._entries
+
+    clock.now = 11
+    assert cache.get('short') is None
+    assert cache.get('forever') == 2
+    assert cache.get('never') is None
+    assert cache.get('expired') is None
+
+
+def test_evicts_least_recently_used_by_size():
+    value = 'x' * 1000
+    cache = ParsedObjectCache(max_bytes=2500)
+    cache.set('a', value)
+    cache.set('b', value)
+    cache.get('a')
+    cache.set('c', value)
+
+    assert cache.get('b') is None
+    assert cache.get('a') == value and cache.get('c') == value
+    assert cache.current_bytes <= 2500
+
+    cache.set('huge', 'x' * 5000)
+    assert cache.get('huge') is None
+
+
+def test_market_parses_once_per_ttl(monkeypatch):
+    market = Market(api_key="test", object_cache=ParsedObjectCache())
+    calls = []
+
+    def fake_request(endpoint, params={}, no_cache=False):
+        calls.append(endpoint)
+        return copy.deepcopy(MAP_RESPONSE)
+
+    monkeypatch.setattr(market, '_request', fake_request)
+
+    first = market.map(limit=3)
+    first[0].name = 'corrupted'
+    second = market.map(limit=3)
+    other = market.map(limit=2)
+
+    assert len(calls) == 2
+    assert second[0].name == 'Token 1'
+    assert [token_info.id for token_info in second] == [1, 2, 3]
+    assert len(other) == 3
+
+
+def test_object_cache_is_shared_between_markets(monkeypatch):
+    cache = ParsedObjectCache()
+    markets = [Market(api_key="test", object_cache=cache) for _ in range(2)]
+    calls = []
+    for market in markets:
+        monkeypatch.setattr(market, '_request',
+                            lambda endpoint, params={}, no_cache=False: calls.append(1) or copy.deepcopy(MAP_RESPONSE))
+
+    markets[0].map(limit=3)
+    markets[1].map(limit=3)
+
+    assert len(calls) == 1
@@ -0,0 +1,72 @@
+import threading
+import pytest
+
+from coinmarketcap import Market
+from coinmarketcap.pagination import _iter_pages
+
+
+def _make_map_response(start, limit, total):
+    end = min(start + limit - 1, total)
+    return {
+        "status": {"error_code": 0},
+        "data": [
+            {"id": i, "rank": i, "name": f"Token {i}", "symbol": f"T{i}", "slug": f"token-{i}", "is_active": 1}
+            for i in range(start, end + 1)
+        ]
+    }
+
+
+@pytest.fixture
+def paged_market(monkeypatch):
+    market = Market(api_key="test")
+    calls = []
+
+    def fake_request(endpoint, params={}, no_cache=False):
+        calls.append((params['start'], params['limit']))
+        return _make_map_response(params['start'], params['limit'], total=25)
+
+    monkeypatch.setattr(market, '_request', fake_request)
+    market.calls = calls
+    return market
+
+
+def test_iter_map_walks_all_pages(paged_market):
+    ids = [token.id for token in paged_market.iter_map(page_size=10)]
+
+    assert ids == list(range(1, 26))
+    assert paged_market.calls == [(1, 10), (11, 10), (21, 10)]
+
+
+def test_iter_map_is_lazy_and_respects_max_items(paged_market):
+    iterator = paged_market.iter_map(page_size=10, max_items=12)
+    assert paged_market.calls == []
+
+    ids = [token.id for token in iterator]
+    assert ids == list(range(1, 13))
+    assert paged_market.calls == [(1, 10), (11, 2)]
+
+
+def test_iter_map_with_prefetch(paged_market):
+    ids = [token.id for token in paged_market.iter_map(page_size=7, prefetch=True)]
+
+    assert ids == list(range(1, 26))
+    assert len(paged_market.calls) == 4
+
+
+def test_prefetch_fetches_next_page_in_background():
+    fetched = threading.Event()
+
+    def fetch_page(start, limit):
+        if start > 1:
+            fetched.set()
+        return list(range(start, start + limit)) if start < 20 else []
+
+    iterator = _iter_pages(fetch_page, page_size=10, prefetch=True)
+    assert next(iterator) == 1
+    assert fetched.wait(timeout=5)
+    iterator.close()
+
+
+def test_invalid_page_size_raises_immediately(paged_market):
+    with pytest.raises(ValueError):
+        paged_market.iter_map(page_size=0)
@@ -0,0 +1,123 @@
+import asyncio
+import copy
+import threading
+
+import pytest
+
+from coinmarketcap import Market, Poller
+
+from .fakes import Clock, key_info
+
+
+def _listings(price, last_updated="2024-03-01T12:00:00.000Z"):
+    return {"status": {"error_code": 0, "credit_count": 1}, "data": [
+        {"id": 1, "name": "Bitcoin", "symbol": "BTC", "cmc_rank": 1, "last_updated": last_updated,
+         "quote": {"USD": {"price": price, "volume_24h": 1e9, "percent_change_1h": 0.0, "percent_change_24h": 0.0,
+                           "percent_change_7d": 0.0, "percent_change_30d": 0.0, "market_cap": price * 1e6,
+                           "last_updated": last_updated}}}]}
+
+
+class _FakeApi(object):
+    def __init__(self, credits_left=30 * 86400):
+        self.credits_left = credits_left
+        self.listings = [_listings(100.0)]
+        self.calls = []
+
+    def __call__(self, endpoint, params={}, no_cache=False):
+        self.calls.append(endpoint)
+        if endpoint == 'v1/key/info':
+            return {"data": key_info(self.credits_left)}
+        if endpoint == 'v3/fear-and-greed/historical':
+            return {"data": [{"timestamp": "1709294400", "value": 70, "value_classification": "Greed"}]}
+        return copy.deepcopy(self.listings[0] if len(self.listings) == 1 else self.listings.pop(0))
+
+
+def _poller(api, **kwargs):
+    market = Market(api_key="test")
+    market._request = api
+    clock = Clock(1000.0)
+    return Poller(market, clock=clock, **kwargs), clock
+
+
+def test_jobs_run_on_independent_intervals_and_dedupe():
+    api = _FakeApi()
+    api.listings = [_listings(100.0), _listings(100.0), _listings(101.0, "2024-03-01T12:01:00.000Z")]
+    poller, clock = _poller(api)
+    poller.add_listings_latest(interval=60)
+    poller.add_fear_and_greed(interval=3600)
+    received = []
+    poller.subscribe('listings_latest', lambda name, token_states: received.append(token_states[0].quote_map['USD'].price))
+    poller.subscribe('fear_and_greed', lambda name, data: received.append(data[0]['value']))
+
+    assert poller.run_pending() == 60
+    clock.now += 60
+    poller.run_pending()
+    clock.now += 60
+    poller.run_pending()
+
+    # the second listings result was unchanged and not published
+    assert received == [100.0, 70, 101.0]
+    assert api.calls.count('v3/fear-and-greed/historical') == 1
+    assert api.calls.count('v1/cryptocurrency/listings/latest') == 3
+    assert api.calls.count('v1/key/info') == 1
+
+
+def test_intervals_stretch_to_the_credit_budget():
+    # one credit per 4 seconds, the jobs would spend one per second
+    api = _FakeApi(credits_left=30 * 86400 // 4)
+    poller, clock = _poller(api)
+    poller.add('a', lambda: 1, interval=2, credits=1)
+    poller.add('b', lambda: 2, interval=2, credits=1, max_interval=5)
+    assert poller.interval('a') == 2
+
+    poller.run_pending()
+
+    # b is capped at 5s (0.2 credits/s), a gets the remaining 0.05 credits/s
+    assert poller.interval('b') == 5
+    assert poller.interval('a') == pytest.approx(20, rel=0.01)
+    poller.remove('b')
+    assert poller.interval('a') == pytest.approx(4, rel=0.01)
+
+
+def test_failing_jobs_and_subscribers_do_not_stop_polling():
+    poller, clock = _poller(_FakeApi())
+    results = []
+
+    def flaky():
+        results.append('run')
+        if len(results) == 1:
+            raise RuntimeError('boom')
+        return len(results)
+
+    poller.add('flaky', flaky, interval=1, digest=None)
+    poller.subscribe('flaky', lambda name, result: 1 / 0)
+    poller.subscribe('flaky', lambda name, result: results.append(result))
+    poller.run_pending()
+    clock.now += 1
+    poller.run_pending()
+
+    assert results == ['run', 'run', 2]
+    with pytest.raises(ValueError):
+        poller.add('flaky', flaky, interval=1)
+    with pytest.raises(ValueError):
+        poller.subscribe('flaky')
+
+
+def test_asyncio_queue_subscriber_and_background_thread():
+    api = _FakeApi()
+    market = Market(api_key="test")
+    market._request = api
+    poller = Poller(market)
+    poller.add_fear_and_greed(interval=3600)
+
+    async def consume():
+        queue = asyncio.Queue()
+        unsubscribe = poller.subscribe('fear_and_greed', queue=queue)
+        with poller:
+            name, data = await asyncio.wait_for(queue.get(), timeout=5)
+        unsubscribe()
+        return name, data
+
+    name, data = asyncio.run(consume())
+    assert name == 'fear_and_greed' and data[0]['value'] == 70
+    assert not any(thread.name == 'coinmarketcap-poller' for thread in threading.enumerate())
@@ -0,0 +1,73 @@
+import threading
+import pytest
+
+from coinmarketcap import Market
+
+
+def _quote_summary(id):
+    return {
+        "id": int(id), "name": f"Token {id}", "symbol": f"T{id}", "is_active": 1, "is_fiat": 0,
+        "quotes": [
+            {
+                "timestamp": f"2024-06-01T0{hour}:00:00.000Z",
+                "quote": {
+                    "USD": {
+                        "price": 100.0 + hour, "volume_24h": 1000.0, "market_cap": 5000.0,
+                        "percent_change_1h": 0.1, "percent_change_24h": 0.2, "percent_change_7d": 0.3,
+                        "percent_change_30d": 0.4, "timestamp": f"2024-06-01T0{hour}:00:00.000Z"
+                    }
+                }
+            }
+            for hour in range(3)
+        ]
+    }
+
+
+@pytest.fixture
+def history_market(monkeypatch):
+    market = Market(api_key="test")
+    market.requested_batches = []
+    lock = threading.Lock()
+
+    def fake_request(endpoint, params={}, no_cache=False):
+        lst_ids = params['id'].split(',')
+        with lock:
+            market.requested_batches.append(lst_ids)
+        # unknown ids are simply absent from the response
+        return {"data": {id: _quote_summary(id) for id in lst_ids if id != '999'}}
+
+    monkeypatch.setattr(market, '_request', fake_request)
+    return market
+
+
+def test_quotes_historical_many_batches_ids(history_market):
+    ids = list(range(1, 11))
+
+    results = history_market.quotes_historical_many(ids=ids, timestamp_start=1717200000,
+                                                   timestamp_end=1717210800, batch_size=4)
+
+    assert list(results.keys()) == ids
+    assert sorted(len(batch) for batch in history_market.requested_batches) == [2, 4, 4]
+    for id, token_states in results.items():
+        assert len(token_states) == 3
+        assert all(token_state.id == id for token_state in token_states)
+        assert token_states[1].quote_map['USD'].price == 101.0
+
+
+def test_quotes_historical_many_missing_and_duplicate_ids(history_market):
+    results = history_market.quotes_historical_many(ids=[1, '1', 999], timestamp_start=1717200000,
+                                                   timestamp_end=1717210800)
+
+    assert history_market.requested_batches == [['1', '999']]
+    assert results[999] == []
+    assert len(results[1]) == 3
+
+
+def test_quotes_historical_many_validates_before_requesting(history_market):
+    with pytest.raises(ValueError):
+        history_market.quotes_historical_many(ids=[1, 2], interval='fortnightly')
+
+    with pytest.raises(ValueError):
+        history_market.quotes_historical_many(ids=[])
+
+    assert history_market.requested_batches == []
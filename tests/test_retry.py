@@ -0,0 +1,146 @@
+import pytest
+import requests
+
+from coinmarketcap import Market, ServerException, CircuitOpenError, RetryPolicy, CircuitBreaker
+
+from .fakes import FakeResponse, ScriptedSession
+
+
+def _rate_limited(error_code, retry_after=None):
+    payload = {"status": {"error_code": error_code, "error_message": "rate limited"}}
+    return FakeResponse(429, payload, {'Retry-After': retry_after} if retry_after else None)
+
+
+def _fetch(market):
+    return market._request('v1/cryptocurrency/map', params={'start': 1}, no_cache=True)['data']
+
+
+def _market(session, **kwargs):
+    delays = []
+    policy = RetryPolicy(sleep=delays.append, **kwargs)
+    market = Market(api_key="test", retry_policy=policy)
+    market._session = session
+    return market, delays
+
+
+def test_transient_errors_are_retried_with_growing_backoff():
+    session = ScriptedSession(FakeResponse(503), requests.ConnectTimeout(), FakeResponse(502), FakeResponse())
+    market, delays = _market(session, jitter=False, backoff_base=1.0)
+
+    assert _fetch(market)[0]['symbol'] == "BTC"
+    assert len(session.calls) == 4
+    assert delays == [1.0, 2.0, 4.0]
+    snapshot = market.retry_policy.metrics.snapshot()
+    assert snapshot['retries'] == 3 and snapshot['recovered'] == 1
+    assert snapshot['by_reason'] == {'http_503': 1, 'connect_timeout': 1, 'http_502': 1}
+
+
+def test_rate_limit_honours_retry_after_and_quota_is_not_retried():
+    session = ScriptedSession(_rate_limited(1008, retry_after='7'), FakeResponse(), _rate_limited(1009))
+    market, delays = _market(session)
+
+    _fetch(market)
+    assert delays[0] >= 7
+
+    # the daily quota will not clear by waiting
+    with pytest.raises(ServerException):
+        _fetch(market)
+    assert len(delays) == 1 and len(session.calls) == 3
+
+
+def test_retries_are_bounded():
+    session = ScriptedSession(*[FakeResponse(500)] * 3)
+    market, delays = _market(session, max_retries=2)
+
+    with pytest.raises(ServerException):
+        _fetch(market)
+    assert len(session.calls) == 3
+    assert market.retry_policy.metrics.gave_up == 1
+    # a long Retry-After is not waited out
+    assert RetryPolicy(max_retry_after=60).next_delay(0, response=_rate_limited(1008, retry_after='300')) is None
+
+
+def test_read_timeouts_are_only_retried_for_idempotent_methods():
+    policy = RetryPolicy()
+    assert policy.retry_reason('GET', exception=requests.ReadTimeout()) == 'timeout'
+    assert policy.retry_reason('POST', exception=requests.ReadTimeout()) is None
+    assert policy.retry_reason('POST', exception=requests.ConnectTimeout()) == 'connect_timeout'
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=10, clock=lambda: clock[0])
+    session = ScriptedSession(FakeResponse(500), FakeResponse(500), FakeResponse(500), FakeResponse())
+    market = Market(api_key="test", circuit_breaker=breaker)
+    market._session = session
+
+    for _ in range(2):
+        with pytest.raises(ServerException):
+            _fetch(market)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        _fetch(market)
+    assert exc_info.value.retry_after == 10
+    assert len(session.calls) == 2
+
+    # the failed probe opens the circuit again, the next one closes it
+    clock[0] = 10
+    with pytest.raises(ServerException):
+        _fetch(market)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] = 20
+    assert _fetch(market)[0]['id'] == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_probe_that_ends_without_an_outcome_is_released():
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=lambda: clock[0])
+    session = ScriptedSession(FakeResponse(500), RuntimeError('bug in a transport adapter'), FakeResponse())
+    market = Market(api_key="test", circuit_breaker=breaker)
+    market._session = session
+
+    with pytest.raises(ServerException):
+        _fetch(market)
+    clock[0] = 10
+
+    # the probe fails before it is sent, e.g. the credit budget is spent
+    def exhausted(endpoint, params):
+        raise RuntimeError('credit budget exhausted')
+
+    market._schedule = exhausted
+    with pytest.raises(RuntimeError):
+        _fetch(market)
+    assert breaker.allow_request()
+    breaker.release_probe()
+    del market._schedule
+
+    # the probe is sent but fails with something the breaker does not count
+    with pytest.raises(RuntimeError):
+        _fetch(market)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert _fetch(market)[0]['id'] == 1
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_request_admitted_while_closed_does_not_release_anothers_probe():
+    clock = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=10, clock=lambda: clock[0])
+    market = Market(api_key="test", circuit_breaker=breaker)
+    market._session = ScriptedSession()
+
+    def interleaved(endpoint, params):
+        # while this request (admitted closed) waits for the scheduler the circuit opens, and
+        # once the recovery timeout passed another request takes the probe
+        breaker.record_failure()
+        clock[0] = 10
+        assert breaker.admit() == CircuitBreaker.HALF_OPEN
+        raise RuntimeError('credit budget exhausted')
+
+    market._schedule = interleaved
+    with pytest.raises(RuntimeError):
+        _fetch(market)
+
+    # the probe is still out, a third request must not get in
+    assert not breaker.allow_request()
@@ -0,0 +1,113 @@
+import time
+import threading
+
+import pytest
+
+from coinmarketcap import Market, CreditScheduler, CreditBudgetExhausted, Priority
+from coinmarketcap.scheduler import _estimate_credits, _current_priority
+
+from .fakes import FakeResponse, FakeSession, key_info
+
+
+def test_estimate_credits_follows_cmc_rules():
+    assert _estimate_credits('v1/key/info', {}) == 0
+    assert _estimate_credits('v1/cryptocurrency/map', {'limit': 5000}) == 1
+    assert _estimate_credits('v1/cryptocurrency/listings/latest', {'limit': 5000, 'convert': 'USD,BTC,EUR'}) == 27
+    assert _estimate_credits('v1/cryptocurrency/listings/latest', {'limit': 100, 'convert': 'USD'}) == 1
+    # 289 five minute points over one day, for two ids
+    params = {'time_start': 0, 'time_end': 86400, 'interval': '5m', 'id': '1,1027', 'convert': 'USD'}
+    assert _estimate_credits('v3/cryptocurrency/quotes/historical', params) == 6
+    assert _estimate_credits('/v9/unknown', {}) == 1
+
+
+def test_update_paces_credits_over_the_billing_period():
+    scheduler = CreditScheduler(burst_seconds=100)
+    scheduler.update(key_info(credits_left=30 * 86400, days_to_reset=30))
+
+    assert scheduler.credits_per_second == pytest.approx(1.0, rel=0.01)
+    assert scheduler.capacity == pytest.approx(100, rel=0.01)
+
+
+def test_acquire_times_out_when_bucket_is_empty():
+    scheduler = CreditScheduler(burst_seconds=10)
+    scheduler.update(key_info(credits_left=30 * 86400))
+    scheduler.acquire(10)
+
+    with pytest.raises(CreditBudgetExhausted):
+        scheduler.acquire(5, timeout=0.05)
+
+
+def test_critical_skips_the_queue_and_may_use_the_reserve():
+    scheduler = CreditScheduler(reserve=50)
+    scheduler.update(key_info(credits_left=60))
+
+    with pytest.raises(CreditBudgetExhausted):
+        scheduler.acquire(20, Priority.NORMAL)
+
+    scheduler.acquire(20, Priority.CRITICAL)
+    assert scheduler.credits_left == 40
+
+
+def test_higher_priority_waiter_is_served_first():
+    # 10 credits/s, bucket overdrawn so waiters queue for ~0.3s
+    scheduler = CreditScheduler(burst_seconds=1)
+    scheduler.update(key_info(credits_left=10 * 30 * 86400))
+    scheduler.acquire(12, Priority.CRITICAL)
+
+    order = []
+
+    def worker(priority):
+        scheduler.acquire(1, priority)
+        order.append(priority)
+
+    backfill = threading.Thread(target=worker, args=(Priority.BACKFILL,))
+    backfill.start()
+    while not scheduler._waiters:
+        time.sleep(0.001)
+
+    normal = threading.Thread(target=worker, args=(Priority.NORMAL,))
+    normal.start()
+    backfill.join(5)
+    normal.join(5)
+
+    assert order == [Priority.NORMAL, Priority.BACKFILL]
+
+
+def _respond(url, params, only_if_cached=False, **kwargs):
+    if only_if_cached:
+        return FakeResponse(504, {})
+    if url.endswith('v1/key/info'):
+        return FakeResponse(payload={"status": {"credit_count": 0}, "data": key_info(credits_left=100000)})
+    data = {} if 'quotes/historical' in url else []
+    return FakeResponse(payload={"status": {"credit_count": 3}, "data": data})
+
+
+def test_market_refreshes_key_info_and_reconciles_credit_count():
+    scheduler = CreditScheduler()
+    market = Market(api_key="test", credit_scheduler=scheduler)
+    session = FakeSession(_respond)
+    market._session = session
+    market._caching_session = session
+
+    market.map(limit=10)
+
+    # the first map call only asks the cache, the key info is fetched before map is sent
+    assert [url.split('.com/')[1] for url in session.calls] == ['v1/cryptocurrency/map', 'v1/key/info', 'v1/cryptocurrency/map']
+    # map is estimated at 1 credit, the response reported 3
+    assert scheduler.credits_left == 100000 - 3
+
+
+def test_market_priority_context_reaches_the_scheduler(monkeypatch):
+    market = Market(api_key="test", credit_scheduler=CreditScheduler())
+    seen = []
+    monkeypatch.setattr(market.credit_scheduler, 'needs_refresh', lambda: False)
+    monkeypatch.setattr(market.credit_scheduler, 'acquire', lambda credits: seen.append(_current_priority.get()))
+    monkeypatch.setattr(market, '_caching_session', FakeSession(_respond))
+
+    with market.priority(Priority.BACKFILL):
+        market.map(limit=10)
+        # batches run on worker threads, the priority has to follow them
+        market.quotes_historical_many(ids=[1, 2, 3], timestamp_start=0, timestamp_end=3600, batch_size=1)
+    market.map(limit=10)
+
+    assert seen == [Priority.BACKFILL] * 4 + [Priority.NORMAL]
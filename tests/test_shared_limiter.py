@@ -0,0 +1,128 @@
+import asyncio
+import sqlite3
+import threading
+import multiprocessing
+
+import pytest
+
+from coinmarketcap import (Market, CreditScheduler, CreditBudgetExhausted, SharedRateLimiter, SharedCreditLedger,
+                           SQLiteLimitStore)
+from coinmarketcap.shared_limiter import SharedLimiterAdapter
+
+from .fakes import key_info
+
+
+def _reserve_slots(path, count):
+    # runs in a worker process, with its own connection to the store
+    limiter = SharedRateLimiter(per_minute=600, store=SQLiteLimitStore(path))
+    return [limiter.reserve() for _ in range(count)]
+
+
+def test_processes_share_one_limit(tmp_path):
+    path = str(tmp_path / 'limits.sqlite')
+    SQLiteLimitStore(path)
+
+    with multiprocessing.get_context('fork').Pool(2) as pool:
+        lst_waits = sorted(wait for waits in pool.starmap(_reserve_slots, [(path, 5), (path, 5)]) for wait in waits)
+
+    # 10 requests per second between both processes: the ten slots are a tenth of a second apart
+    assert lst_waits[0] == pytest.approx(0.0, abs=0.05)
+    for previous, wait in zip(lst_waits, lst_waits[1:]):
+        assert wait - previous == pytest.approx(0.1, abs=0.05)
+
+
+def test_bucket_refills_and_refunds(tmp_path):
+    store = SQLiteLimitStore(str(tmp_path / 'limits.sqlite'))
+
+    assert store.take('b', 3, rate=1, capacity=4, now=100) == (True, 1)
+    assert store.take('b', 3, rate=1, capacity=4, min_level=3, now=101) == (False, 2)
+    assert store.take('b', 3, rate=1, capacity=4, now=101) == (True, -1)
+    # a refund never fills the bucket past its capacity
+    assert store.take('b', -10, rate=1, capacity=4, now=110) == (True, 4)
+    assert store.increment('c', 2) == 2 and store.increment('c', 3) == 5 and store.counter('missing') == 0
+
+
+class _FailingCommit(object):
+    """Wraps a sqlite3 connection, the first COMMIT fails like a busy database would."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.failed = False
+
+    def execute(self, sql, *args):
+        if sql == 'COMMIT' and not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError('database is locked')
+        return self.conn.execute(sql, *args)
+
+    @property
+    def in_transaction(self):
+        return self.conn.in_transaction
+
+
+def test_failed_commit_is_rolled_back(tmp_path):
+    store = SQLiteLimitStore(str(tmp_path / 'limits.sqlite'))
+    store._local.conn = _FailingCommit(store._connection())
+
+    with pytest.raises(sqlite3.OperationalError):
+        store.take('b', 3, rate=1, capacity=4, now=100)
+
+    # the take was rolled back and the connection can start the next transaction
+    assert not store._local.conn.in_transaction
+    assert store.take('b', 3, rate=1, capacity=4, now=100) == (True, 1)
+
+
+def test_timeout_does_not_keep_the_reservation(tmp_path):
+    limiter = SharedRateLimiter(per_minute=60, store=SQLiteLimitStore(str(tmp_path / 'limits.sqlite')))
+    assert limiter.reserve() == 0
+    with pytest.raises(TimeoutError):
+        limiter.reserve(timeout=0.5)
+    assert limiter.reserve() == pytest.approx(1.0, abs=0.05)
+
+
+def test_async_acquire_reserves_off_the_event_loop(tmp_path):
+    store = SQLiteLimitStore(str(tmp_path / 'limits.sqlite'))
+    threads = []
+
+    class _RecordingStore(object):
+        def take(self, *args, **kwargs):
+            threads.append(threading.get_ident())
+            return store.take(*args, **kwargs)
+
+    limiter = SharedRateLimiter(per_minute=600, store=_RecordingStore())
+
+    async def run():
+        return threading.get_ident(), await limiter.acquire_async(), await limiter.acquire_async()
+
+    loop_thread, first, second = asyncio.run(run())
+
+    assert first == 0 and second == pytest.approx(0.1, abs=0.05)
+    assert threads and loop_thread not in threads
+
+
+def test_market_mounts_the_limiter_on_both_sessions(tmp_path):
+    limiter = SharedRateLimiter(per_minute=30, store=SQLiteLimitStore(str(tmp_path / 'limits.sqlite')))
+    market = Market(api_key="test", rate_limiter=limiter, cache_backend='memory')
+
+    for session in (market.session, market.caching_session):
+        adapter = session.get_adapter('https://pro-api.coinmarketcap.com/v1/key/info')
+        assert isinstance(adapter, SharedLimiterAdapter) and adapter.limiter is limiter
+    with pytest.raises(ValueError):
+        Market(api_key="test", rate_limiter=limiter, rate_limit_per_minute=30)
+
+
+def test_schedulers_share_the_credit_bucket(tmp_path):
+    store = SQLiteLimitStore(str(tmp_path / 'limits.sqlite'))
+    # two workers, each reading the same key info: together they get one 10 credit bucket
+    lst_schedulers = [CreditScheduler(burst_seconds=10, ledger=SharedCreditLedger(store)) for _ in range(2)]
+    for scheduler in lst_schedulers:
+        scheduler.update(key_info(credits_left=30 * 86400))
+
+    lst_schedulers[0].acquire(8)
+    with pytest.raises(CreditBudgetExhausted):
+        lst_schedulers[1].acquire(5, timeout=0.05)
+
+    # a cached response refunds its estimate to the shared bucket
+    lst_schedulers[0].settle(8, 0)
+    lst_schedulers[1].acquire(5, timeout=0.05)
+    assert lst_schedulers[1].ledger.spent() == pytest.approx(5)
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+
+from coinmarketcap import Market, ServerException
+from coinmarketcap.singleflight import _SingleFlight, _flight_key
+
+from .fakes import MAP_RESPONSE, FakeResponse
+
+
+class _BlockingSession(object):
+    """Holds every request until released, so concurrent callers overlap for sure."""
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.release = threading.Event()
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        with self.lock:
+            self.calls += 1
+        self.release.wait(5)
+        return FakeResponse(self.status_code)
+
+
+def _run_concurrently(fn, count=5):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+@pytest.mark.parametrize('no_cache', [False, True])
+def test_identical_concurrent_requests_share_one_round_trip(no_cache):
+    market = Market(api_key="test")
+    session = _BlockingSession()
+    market._session = session
+    market._caching_session = session
+
+    threads, results, errors = _run_concurrently(
+        lambda: market._request('v1/cryptocurrency/map', params={'start': 1, 'limit': 10}, no_cache=no_cache))
+    time.sleep(0.1)
+    session.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert errors == []
+    assert session.calls == 1
+    assert all(result == MAP_RESPONSE for result in results)
+    # every caller gets its own dicts, the parsers modify them in place
+    assert len({id(result) for result in results}) == 5
+
+
+def test_different_params_are_not_coalesced():
+    market = Market(api_key="test")
+    session = _BlockingSession()
+    session.release.set()
+    market._caching_session = session
+
+    market.map(limit=10)
+    market.map(limit=11)
+
+    assert session.calls == 2
+
+
+def test_errors_are_shared_with_waiters():
+    market = Market(api_key="test")
+    session = _BlockingSession(status_code=500)
+    market._caching_session = session
+
+    threads, results, errors = _run_concurrently(lambda: market.map(limit=10), count=3)
+    time.sleep(0.1)
+    session.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert session.calls == 1
+    assert len(errors) == 3 and all(isinstance(e, ServerException) for e in errors)
+
+
+def test_coalescing_can_be_disabled():
+    market = Market(api_key="test", coalesce_requests=False)
+    session = _BlockingSession()
+    market._caching_session = session
+
+    threads, results, errors = _run_concurrently(lambda: market.map(limit=10), count=3)
+    time.sleep(0.1)
+    session.release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert session.calls == 3
+
+
+def test_flight_key_ignores_param_order_and_types():
+    assert _flight_key('/v1/cryptocurrency/map', {'start': 1, 'limit': 10}, False) == \
+        _flight_key('v1/cryptocurrency/map', {'limit': '10', 'start': '1'}, False)
+    assert _flight_key('v1/cryptocurrency/map', {}, False) != _flight_key('v1/cryptocurrency/map', {}, True)
+
+
+def test_single_flight_forgets_completed_calls():
+    flight = _SingleFlight()
+
+    assert flight.do('key', lambda: 1) == (1, False)
+    assert flight.do('key', lambda: 2) == (2, False)
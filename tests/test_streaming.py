@@ -0,0 +1,118 @@
+import json
+import pytest
+
+from coinmarketcap import Market
+from coinmarketcap.streaming import _JsonArrayStream
+
+
+def _byte_chunks(document, size):
+    raw = json.dumps(document, ensure_ascii=False).encode('utf-8')
+    return [raw[i:i + size] for i in range(0, len(raw), size)]
+
+
+def _quote_block(timestamp):
+    return {
+        "timestamp": timestamp,
+        "quote": {"USD": {"price": 123456.789, "volume_24h": 1e10, "market_cap": 2.5e12,
+                          "percent_change_1h": -0.5, "percent_change_24h": 1.25, "percent_change_7d": 3.0,
+                          "percent_change_30d": 10.0, "total_supply": 21000000, "circulating_supply": 19700000,
+                          "timestamp": timestamp}}
+    }
+
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 64, 100000])
+def test_stream_yields_array_items_across_chunk_boundaries(chunk_size):
+    document = {
+        "status": {"error_code": 0, "notice": "naïve ✓"},
+        "data": [{"id": i, "name": f"Tökén {i}", "price": 1234.5678 * i, "big": 12345678901234567890} for i in range(20)]
+    }
+
+    items = list(_JsonArrayStream(_byte_chunks(document, chunk_size), ['data']))
+
+    assert items == document['data']
+
+
+def test_stream_follows_nested_path_and_collects_siblings():
+    document = {"data": {"2": {"id": 2}, "1": {"id": 1, "name": "Bitcoin", "quotes": [1, 2, 3], "is_fiat": 0}}}
+    stream = _JsonArrayStream(_byte_chunks(document, 5), ['data', '1', 'quotes'])
+
+    assert list(stream) == [1, 2, 3]
+    assert stream.siblings == {"id": 1, "name": "Bitcoin"}
+    assert stream.finish() == {"id": 1, "name": "Bitcoin", "is_fiat": 0}
+
+
+def test_stream_follows_array_indexes_and_empty_arrays():
+    document = {"data": {"BTC": [{"quotes": []}, {"quotes": [1]}]}}
+
+    assert list(_JsonArrayStream(_byte_chunks(document, 4), ['data', 'BTC', 0, 'quotes'])) == []
+    assert list(_JsonArrayStream(_byte_chunks(document, 4), ['data', 'BTC', 1, 'quotes'])) == [1]
+
+
+def test_stream_raises_on_missing_key_and_malformed_body():
+    with pytest.raises(ValueError):
+        list(_JsonArrayStream([b'{"status": {}}'], ['data']))
+
+    with pytest.raises(ValueError):
+        list(_JsonArrayStream([b'{"data": [{"id": 1}, {"id": '], ['data']))
+
+
+def _market_streaming(monkeypatch, document, chunk_size=11):
+    market = Market(api_key="test")
+    calls = []
+
+    def fake_request_stream(endpoint, params={}, path=('data',)):
+        calls.append((endpoint, params, list(path)))
+        return _JsonArrayStream(_byte_chunks(document, chunk_size), path)
+
+    monkeypatch.setattr(market, '_request_stream', fake_request_stream)
+    market.calls = calls
+    return market
+
+
+def test_stream_map(monkeypatch):
+    document = {"status": {}, "data": [{"id": i, "rank": i, "name": f"Token {i}", "symbol": f"T{i}",
+                                        "slug": f"token-{i}", "is_active": 1} for i in range(1, 6)]}
+    market = _market_streaming(monkeypatch, document)
+
+    token_infos = market.stream_map(limit=5)
+    assert market.calls == []
+
+    assert [token_info.id for token_info in token_infos] == [1, 2, 3, 4, 5]
+    assert market.calls[0][0] == 'v1/cryptocurrency/map'
+
+
+def test_stream_quotes_historical_v3_meta_after_quotes(monkeypatch):
+    timestamps = ["2024-06-01T00:00:00.000Z", "2024-06-01T01:00:00.000Z"]
+    # 'quotes' comes before the summary fields, so blocks have to wait for them
+    document = {"status": {}, "data": {"1": {"quotes": [_quote_block(ts) for ts in timestamps],
+                                             "id": 1, "name": "Bitcoin", "symbol": "BTC",
+                                             "is_active": 1, "is_fiat": 0}}}
+    market = _market_streaming(monkeypatch, document)
+
+    token_states = list(market.stream_quotes_historical_v3(id=1, timestamp_start=1717200000,
+                                                           timestamp_end=1717210000))
+
+    assert [token_state.timestamp for token_state in token_states] == [1717200000, 1717203600]
+    assert token_states[0].symbol == 'BTC'
+    assert token_states[0].quote_map['USD'].price == 123456.789
+    assert market.calls[0][2] == ['data', '1', 'quotes']
+
+
+def test_stream_quotes_historical_v3_by_ticker(monkeypatch):
+    document = {"data": {"BTC": [{"id": 1, "name": "Bitcoin", "symbol": "BTC", "is_active": 1, "is_fiat": 0,
+                                  "quotes": [_quote_block("2024-06-01T00:00:00.000Z")]}]}}
+    market = _market_streaming(monkeypatch, document, chunk_size=2)
+
+    token_states = list(market.stream_quotes_historical_v3(ticker='BTC', timestamp_start=1717200000,
+                                                           timestamp_end=1717210000))
+
+    assert len(token_states) == 1
+    assert token_states[0].id == 1
+
+
+def test_stream_validates_before_request(monkeypatch):
+    market = _market_streaming(monkeypatch, {"data": []})
+
+    with pytest.raises(ValueError):
+        market.stream_quotes_historical_v3(id=1, interval='fortnightly')
+    assert market.calls == []
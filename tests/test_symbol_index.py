@@ -0,0 +1,97 @@
+import pytest
+
+from coinmarketcap import Market, SymbolIndex
+from coinmarketcap.v1.cryptocurrency.map import ListingStatus
+
+UNIVERSE = {
+    'active': [
+        {"id": 1, "rank": 1, "name": "Bitcoin", "symbol": "BTC", "slug": "bitcoin", "is_active": 1, "platform": None},
+        {"id": 1027, "rank": 2, "name": "Ethereum", "symbol": "ETH", "slug": "ethereum", "is_active": 1, "platform": None},
+        {"id": 3794, "rank": 900, "name": "Ethereum Fake", "symbol": "ETH", "slug": "eth-fake", "is_active": 1, "platform": None},
+        {"id": 3408, "rank": 6, "name": "USDC", "symbol": "USDC", "slug": "usd-coin", "is_active": 1,
+         "platform": {"id": 1027, "name": "Ethereum", "symbol": "ETH", "slug": "ethereum",
+                      "token_address": "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48"}},
+    ],
+    'inactive': [
+        {"id": 9999, "rank": None, "name": "Old Ether", "symbol": "ETH", "slug": "old-ether", "is_active": 0, "platform": None},
+    ],
+    'untracked': [],
+}
+
+EXTRA = {"id": 5426, "rank": 5, "name": "Solana", "symbol": "SOL", "slug": "solana", "is_active": 1, "platform": None}
+
+
+@pytest.fixture
+def market(monkeypatch):
+    market = Market(api_key="test")
+    market.calls = []
+
+    def fake_request(endpoint, params={}, no_cache=False):
+        market.calls.append(dict(params))
+        if 'symbol' in params:
+            return {"data": [EXTRA] if params['symbol'] == 'SOL' else []}
+        rows = UNIVERSE[params['listing_status']]
+        start = params['start'] - 1
+        return {"data": [dict(row) for row in rows[start:start + params['limit']]]}
+
+    monkeypatch.setattr(market, '_request', fake_request)
+    return market
+
+
+def test_refresh_builds_all_lookups(tmp_path, market):
+    index = SymbolIndex(str(tmp_path / 'symbols.sqlite'))
+
+    assert index.refresh(market, page_size=2) == 5
+
+    assert index.by_id(1027).name == 'Ethereum'
+    # collisions: active assets first, by rank, inactive last
+    assert [token_info.id for token_info in index.by_symbol('eth')] == [1027, 3794, 9999]
+    assert index.by_slug('usd-coin').id == 3408
+    assert index.by_address('0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48')[0].id == 3408
+    assert index.resolve('ETH') == 1027
+
+
+def test_index_persists_and_loads_lazily(tmp_path, market):
+    path = str(tmp_path / 'symbols.sqlite')
+    with SymbolIndex(path) as index:
+        index.refresh(market)
+
+    reopened = SymbolIndex(path)
+    assert reopened._loaded is False
+    assert reopened.resolve('bitcoin') == 1
+    assert reopened.refreshed_at(ListingStatus.ACTIVE) is not None
+
+
+def test_refresh_if_stale_skips_fresh_statuses(tmp_path, market):
+    index = SymbolIndex(str(tmp_path / 'symbols.sqlite'))
+    index.refresh(market)
+    calls = len(market.calls)
+
+    assert index.refresh_if_stale(market, max_age=3600) == 0
+    assert len(market.calls) == calls
+
+
+def test_unknown_symbol_is_fetched_once_then_served_locally(tmp_path, market):
+    index = SymbolIndex(str(tmp_path / 'symbols.sqlite'))
+    index.refresh(market)
+
+    assert index.resolve('SOL', market) == 5426
+    assert index.resolve('SOL', market) == 5426
+    assert len([call for call in market.calls if 'symbol' in call]) == 1
+
+    with pytest.raises(KeyError):
+        index.resolve('NOPE', market)
+
+
+def test_market_resolves_tickers_to_ids(tmp_path, market):
+    index = SymbolIndex(str(tmp_path / 'symbols.sqlite'))
+    index.refresh(market)
+    market._symbol_index = index
+    market.calls.clear()
+
+    historical_response = {"data": {"1027": {"id": 1027, "name": "Ethereum", "symbol": "ETH", "is_active": 1,
+                                             "is_fiat": 0, "quotes": []}}}
+    market._request = lambda endpoint, params={}, no_cache=False: market.calls.append(params) or historical_response
+
+    assert market.quotes_historical_v3(ticker='ETH', timestamp_start=0, timestamp_end=3600) == []
+    assert market.calls[0]['id'] == '1027' and 'symbol' not in market.calls[0]